@@ -5,11 +5,21 @@ This replaces Django's built-in auth with MongoDB-based backend API
 import requests
 from django.conf import settings
 from datetime import datetime, timedelta
+from .api_client import get_api_client
+import base64
 import json
+import threading
+import time
 
 # Backend API base URL
 BACKEND_API_URL = getattr(settings, 'BACKEND_API_URL', 'http://localhost:8001/api')
 
+# Refresh the access token only when it expires within this many seconds
+TOKEN_REFRESH_LEEWAY_SECONDS = getattr(settings, 'TOKEN_REFRESH_LEEWAY_SECONDS', 60)
+
+# How long a finished refresh is reused by requests still holding the old refresh token
+TOKEN_REFRESH_REUSE_SECONDS = getattr(settings, 'TOKEN_REFRESH_REUSE_SECONDS', 30)
+
 
 class APIAuthBackend:
     """
@@ -18,6 +28,7 @@ class APIAuthBackend:
     
     def __init__(self):
         self.api_url = BACKEND_API_URL
+        self.client = get_api_client()
     
     def register(self, username, email, password, first_name='', last_name=''):
         """
@@ -33,8 +44,8 @@ class APIAuthBackend:
             print(f"🌐 Backend API URL: {self.api_url}/users/register/")
             print(f"📤 Sending POST request...")
             
-            response = requests.post(
-                f'{self.api_url}/users/register/',
+            response = self.client.post(
+                '/users/register/',
                 json={
                     'username': username,
                     'email': email,
@@ -108,8 +119,8 @@ class APIAuthBackend:
             print(f"🌐 Backend API URL: {self.api_url}/users/login/")
             print(f"📤 Sending POST request...")
             
-            response = requests.post(
-                f'{self.api_url}/users/login/',
+            response = self.client.post(
+                '/users/login/',
                 json={
                     'email': login_email,
                     'password': password
@@ -149,8 +160,8 @@ class APIAuthBackend:
         Returns: (success, message)
         """
         try:
-            response = requests.post(
-                f'{self.api_url}/users/logout/',
+            response = self.client.post(
+                '/users/logout/',
                 json={'refresh_token': refresh_token},
                 timeout=10
             )
@@ -171,9 +182,9 @@ class APIAuthBackend:
         Returns: (success, user_data/error_message)
         """
         try:
-            response = requests.get(
-                f'{self.api_url}/users/profile/',
-                headers={'Authorization': f'Bearer {access_token}'},
+            response = self.client.get(
+                '/users/profile/',
+                token=access_token,
                 timeout=10
             )
             
@@ -192,9 +203,9 @@ class APIAuthBackend:
         Returns: (success, user_data/error_message)
         """
         try:
-            response = requests.put(
-                f'{self.api_url}/users/profile/',
-                headers={'Authorization': f'Bearer {access_token}'},
+            response = self.client.put(
+                '/users/profile/',
+                token=access_token,
                 json=kwargs,
                 timeout=10
             )
@@ -215,9 +226,9 @@ class APIAuthBackend:
         Returns: (success, message)
         """
         try:
-            response = requests.post(
-                f'{self.api_url}/users/change-password/',
-                headers={'Authorization': f'Bearer {access_token}'},
+            response = self.client.post(
+                '/users/change-password/',
+                token=access_token,
                 json={
                     'old_password': old_password,
                     'new_password': new_password,
@@ -241,8 +252,8 @@ class APIAuthBackend:
         Returns: (success, message)
         """
         try:
-            response = requests.post(
-                f'{self.api_url}/users/forgot-password/',
+            response = self.client.post(
+                '/users/forgot-password/',
                 json={'email': email},
                 timeout=10
             )
@@ -263,8 +274,8 @@ class APIAuthBackend:
         Returns: (success, message)
         """
         try:
-            response = requests.post(
-                f'{self.api_url}/users/reset-password/',
+            response = self.client.post(
+                '/users/reset-password/',
                 json={
                     'token': token,
                     'new_password': new_password,
@@ -282,27 +293,41 @@ class APIAuthBackend:
         except Exception as e:
             return False, f'Password reset error: {str(e)}'
     
-    def refresh_access_token(self, refresh_token):
+    def refresh_tokens(self, refresh_token):
         """
-        Refresh access token using refresh token
-        Returns: (success, new_access_token/error_message)
+        Refresh tokens using refresh token
+        Returns: (success, tokens/error_message)
+        The backend rotates refresh tokens, so tokens may contain a new 'refresh'
         """
         try:
-            response = requests.post(
-                f'{self.api_url}/token/refresh/',
+            response = self.client.post(
+                '/token/refresh/',
                 json={'refresh': refresh_token},
                 timeout=10
             )
             
             if response.status_code == 200:
                 data = response.json()
-                return True, data.get('access')
+                return True, {
+                    'access': data.get('access'),
+                    'refresh': data.get('refresh', refresh_token)
+                }
             else:
                 return False, 'Failed to refresh token'
                 
         except Exception as e:
             return False, f'Token refresh error: {str(e)}'
     
+    def refresh_access_token(self, refresh_token):
+        """
+        Refresh access token using refresh token
+        Returns: (success, new_access_token/error_message)
+        """
+        success, result = self.refresh_tokens(refresh_token)
+        if success:
+            return True, result['access']
+        return False, result
+    
     # Two-Factor Authentication (2FA) methods
     
     def setup_2fa(self, access_token):
@@ -311,9 +336,9 @@ class APIAuthBackend:
         Returns: (success, data/error_message)
         """
         try:
-            response = requests.post(
-                f'{self.api_url}/users/2fa/setup/',
-                headers={'Authorization': f'Bearer {access_token}'},
+            response = self.client.post(
+                '/users/2fa/setup/',
+                token=access_token,
                 timeout=10
             )
             
@@ -332,9 +357,9 @@ class APIAuthBackend:
         Returns: (success, message)
         """
         try:
-            response = requests.post(
-                f'{self.api_url}/users/2fa/verify-setup/',
-                headers={'Authorization': f'Bearer {access_token}'},
+            response = self.client.post(
+                '/users/2fa/verify-setup/',
+                token=access_token,
                 json={'secret': secret, 'code': code},
                 timeout=10
             )
@@ -354,9 +379,9 @@ class APIAuthBackend:
         Returns: (success, message)
         """
         try:
-            response = requests.post(
-                f'{self.api_url}/users/2fa/disable/',
-                headers={'Authorization': f'Bearer {access_token}'},
+            response = self.client.post(
+                '/users/2fa/disable/',
+                token=access_token,
                 json={'password': password},
                 timeout=10
             )
@@ -376,9 +401,9 @@ class APIAuthBackend:
         Returns: (success, is_enabled/error_message)
         """
         try:
-            response = requests.get(
-                f'{self.api_url}/users/2fa/status/',
-                headers={'Authorization': f'Bearer {access_token}'},
+            response = self.client.get(
+                '/users/2fa/status/',
+                token=access_token,
                 timeout=10
             )
             
@@ -430,6 +455,85 @@ def get_refresh_token(request):
     return request.session.get('refresh_token')
 
 
+def get_token_expiry(token):
+    """
+    Read the 'exp' claim of a JWT without verifying it
+    The token came from our own backend and only lives in the server-side session,
+    so this is only used to decide when to refresh, never to trust the token.
+    Returns: expiry as a unix timestamp, or None if the token can't be decoded
+    """
+    try:
+        payload_segment = token.split('.')[1]
+        padded = payload_segment + '=' * (-len(payload_segment) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        return int(payload['exp'])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def token_needs_refresh(access_token, leeway=None):
+    """Check if access token is expired or about to expire"""
+    if leeway is None:
+        leeway = TOKEN_REFRESH_LEEWAY_SECONDS
+    expires_at = get_token_expiry(access_token)
+    if expires_at is None:
+        return True
+    return expires_at - time.time() <= leeway
+
+
+# Single-flight token refresh
+# Requests of the same session carry the same refresh token, so it is used as the key.
+# The first request refreshes against the backend, concurrent ones wait for its result,
+# and the result is reused for a short while by requests that loaded the old session.
+
+_refresh_guard = threading.Lock()
+_refresh_flights = {}
+
+
+class _RefreshFlight:
+    """A refresh in progress (or recently finished) for one refresh token"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = (False, 'Token refresh did not complete')
+        self.finished_at = None
+
+
+def refresh_tokens_once(refresh_token):
+    """
+    Refresh tokens, coalescing concurrent refreshes of the same refresh token
+    Returns: (success, tokens/error_message)
+    """
+    now = time.monotonic()
+    with _refresh_guard:
+        # Drop finished flights that are too old to be reused
+        for key in [k for k, f in _refresh_flights.items()
+                    if f.finished_at is not None and now - f.finished_at > TOKEN_REFRESH_REUSE_SECONDS]:
+            del _refresh_flights[key]
+        
+        flight = _refresh_flights.get(refresh_token)
+        is_leader = flight is None
+        if is_leader:
+            flight = _RefreshFlight()
+            _refresh_flights[refresh_token] = flight
+    
+    if is_leader:
+        try:
+            flight.result = APIAuthBackend().refresh_tokens(refresh_token)
+        finally:
+            with _refresh_guard:
+                if flight.result[0]:
+                    flight.finished_at = time.monotonic()
+                else:
+                    # Don't keep failures around, the next request may retry
+                    _refresh_flights.pop(refresh_token, None)
+            flight.done.set()
+    elif not flight.done.wait(timeout=15):
+        return False, 'Token refresh timeout'
+    
+    return flight.result
+
+
 def ensure_valid_token(request):
     """
     Ensure access token is valid, refresh if needed
@@ -441,14 +545,17 @@ def ensure_valid_token(request):
     if not access_token or not refresh_token:
         return False, 'Not authenticated'
     
-    # Try to refresh token
-    backend = APIAuthBackend()
-    success, new_access_token = backend.refresh_access_token(refresh_token)
+    # Token still valid for a while - no backend call needed
+    if not token_needs_refresh(access_token):
+        return True, access_token
+    
+    success, tokens = refresh_tokens_once(refresh_token)
     
     if success:
-        request.session['access_token'] = new_access_token
+        request.session['access_token'] = tokens['access']
+        request.session['refresh_token'] = tokens['refresh']
         request.session.modified = True
-        return True, new_access_token
+        return True, tokens['access']
     else:
         # Refresh failed, user needs to login again
         clear_user_session(request)
@@ -0,0 +1,232 @@
+"""
+Shared HTTP client for calls from the Learner frontend to the Backend API
+Keeps one pooled keep-alive session per worker process, applies default
+timeouts, retries idempotent GETs and records per-endpoint latency/errors.
+GET responses carrying an ETag or Last-Modified are kept (bounded LRU) and
+revalidated with If-None-Match / If-Modified-Since; a 304 from the backend
+hands back the stored response without re-downloading the body.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.conf import settings
+
+# Backend API base URL
+BACKEND_API_URL = getattr(settings, 'BACKEND_API_URL', 'http://localhost:8001/api')
+
+# (connect, read) timeout in seconds used when a call doesn't pass its own
+BACKEND_API_TIMEOUT = getattr(settings, 'BACKEND_API_TIMEOUT', (3.05, 10))
+
+# Connection pool size per worker and retry budget for GET requests
+BACKEND_API_POOL_SIZE = getattr(settings, 'BACKEND_API_POOL_SIZE', 20)
+BACKEND_API_GET_RETRIES = getattr(settings, 'BACKEND_API_GET_RETRIES', 2)
+
+# Max GET responses kept per worker for conditional revalidation (0 disables)
+BACKEND_API_CONDITIONAL_CACHE_SIZE = getattr(settings, 'BACKEND_API_CONDITIONAL_CACHE_SIZE', 256)
+
+# Path segments that look like ids are folded so stats are grouped per endpoint
+_ID_SEGMENT = re.compile(r'/(?:[0-9a-fA-F]{24}|\d+)(?=/|$)')
+
+
+class BackendAPIClient:
+    """
+    Pooled client for the Backend API
+    Methods return the requests.Response; connection errors and timeouts are raised
+    as requests exceptions, same as calling requests directly.
+    """
+
+    def __init__(self, base_url=None, timeout=None, pool_size=None, get_retries=None):
+        self.base_url = (base_url or BACKEND_API_URL).rstrip('/')
+        self.timeout = timeout or BACKEND_API_TIMEOUT
+        self.pool_size = pool_size or BACKEND_API_POOL_SIZE
+        self.get_retries = BACKEND_API_GET_RETRIES if get_retries is None else get_retries
+        self._session = None
+        self._session_pid = None
+        self._session_lock = threading.Lock()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        self._validated = OrderedDict()
+        self._validated_lock = threading.Lock()
+
+    def _build_session(self):
+        """Create a session with a keep-alive pool and GET-only retries"""
+        session = requests.Session()
+        retry = Retry(
+            total=self.get_retries,
+            connect=self.get_retries,
+            read=self.get_retries,
+            status=self.get_retries,
+            backoff_factor=0.2,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def get_session(self):
+        """Get the pooled session for this process (rebuilt after a fork)"""
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._session_lock:
+                if self._session is None or self._session_pid != pid:
+                    self._session = self._build_session()
+                    self._session_pid = pid
+                    with self._stats_lock:
+                        self._stats = {}
+        return self._session
+
+    def build_url(self, path):
+        """Build full backend URL from a path relative to the API root"""
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f'{self.base_url}/{path.lstrip("/")}'
+
+    @staticmethod
+    def endpoint_name(method, path):
+        """Stats key for a request, e.g. 'GET /courses/<id>/modules/'"""
+        path = path.split('?', 1)[0]
+        return f'{method} {_ID_SEGMENT.sub("/<id>", path)}'
+
+    def _record(self, endpoint, elapsed_ms, error):
+        """Record one call in the per-endpoint counters"""
+        with self._stats_lock:
+            entry = self._stats.get(endpoint)
+            if entry is None:
+                entry = self._stats[endpoint] = {
+                    'count': 0,
+                    'errors': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                }
+            entry['count'] += 1
+            entry['total_ms'] += elapsed_ms
+            if elapsed_ms > entry['max_ms']:
+                entry['max_ms'] = elapsed_ms
+            if error:
+                entry['errors'] += 1
+
+    def request(self, method, path, token=None, headers=None, timeout=None, **kwargs):
+        """Send a request to the backend"""
+        method = method.upper()
+        request_headers = dict(headers or {})
+        if token:
+            request_headers['Authorization'] = f'Bearer {token}'
+
+        endpoint = self.endpoint_name(method, path)
+        session = self.get_session()
+        started = time.perf_counter()
+        try:
+            response = session.request(
+                method,
+                self.build_url(path),
+                headers=request_headers,
+                timeout=timeout or self.timeout,
+                **kwargs
+            )
+        except requests.exceptions.RequestException:
+            self._record(endpoint, (time.perf_counter() - started) * 1000, error=True)
+            raise
+
+        self._record(endpoint, (time.perf_counter() - started) * 1000, error=response.status_code >= 500)
+        return response
+
+    def _validated_key(self, path, token, params):
+        """Stored-response key: URL, query params and caller (token hashed)"""
+        if isinstance(params, dict):
+            params = sorted((str(name), str(value)) for name, value in params.items())
+        token_hash = hashlib.sha256(token.encode()).hexdigest() if token else None
+        return (self.build_url(path), repr(params), token_hash)
+
+    def get(self, path, token=None, **kwargs):
+        """GET, revalidating a stored response when the backend sent validators"""
+        if BACKEND_API_CONDITIONAL_CACHE_SIZE <= 0 or kwargs.get('headers'):
+            return self.request('GET', path, token=token, **kwargs)
+        kwargs.pop('headers', None)
+
+        key = self._validated_key(path, token, kwargs.get('params'))
+        with self._validated_lock:
+            stored = self._validated.get(key)
+
+        headers = {}
+        if stored is not None:
+            if stored.headers.get('ETag'):
+                headers['If-None-Match'] = stored.headers['ETag']
+            if stored.headers.get('Last-Modified'):
+                headers['If-Modified-Since'] = stored.headers['Last-Modified']
+
+        response = self.request('GET', path, token=token, headers=headers, **kwargs)
+
+        if response.status_code == 304 and stored is not None:
+            with self._validated_lock:
+                if key in self._validated:
+                    self._validated.move_to_end(key)
+            return stored
+
+        with self._validated_lock:
+            if response.status_code == 200 and (
+                response.headers.get('ETag') or response.headers.get('Last-Modified')
+            ):
+                self._validated[key] = response
+                self._validated.move_to_end(key)
+                while len(self._validated) > BACKEND_API_CONDITIONAL_CACHE_SIZE:
+                    self._validated.popitem(last=False)
+            else:
+                self._validated.pop(key, None)
+        return response
+
+    def post(self, path, token=None, **kwargs):
+        return self.request('POST', path, token=token, **kwargs)
+
+    def put(self, path, token=None, **kwargs):
+        return self.request('PUT', path, token=token, **kwargs)
+
+    def delete(self, path, token=None, **kwargs):
+        return self.request('DELETE', path, token=token, **kwargs)
+
+    def get_stats(self):
+        """Per-endpoint counters with average latency"""
+        with self._stats_lock:
+            stats = {endpoint: dict(entry) for endpoint, entry in self._stats.items()}
+        for entry in stats.values():
+            entry['avg_ms'] = round(entry['total_ms'] / entry['count'], 2) if entry['count'] else 0.0
+            entry['total_ms'] = round(entry['total_ms'], 2)
+            entry['max_ms'] = round(entry['max_ms'], 2)
+        return stats
+
+    def reset_stats(self):
+        """Clear the per-endpoint counters"""
+        with self._stats_lock:
+            self._stats = {}
+
+    def clear_validated(self):
+        """Forget stored GET responses (next GETs are unconditional)"""
+        with self._validated_lock:
+            self._validated.clear()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_api_client():
+    """Get the shared Backend API client singleton"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = BackendAPIClient()
+    return _client
@@ -64,7 +64,6 @@ urlpatterns = [
     path('instructor/submission/<str:submission_id>/grade/', views.grade_submission_view, name='grade_submission'),
     
     # Progress & Feedback URLs
-    path('my-progress/', views.my_progress_view, name='my_progress'),
     path('course/<str:course_id>/progress/', views.course_progress_view, name='course_progress'),
     path('course/<str:course_id>/review/', views.submit_course_review_view, name='submit_course_review'),
     path('instructor/<str:instructor_id>/course/<str:course_id>/review/', views.submit_instructor_review_view, name='submit_instructor_review'),
@@ -14,7 +14,9 @@ from .api_auth import (
     get_access_token,
     api_login_required
 )
+from .api_client import get_api_client
 from .forms import RegisterForm, LoginForm
+from urllib.parse import urlencode
 import time
 
 
@@ -28,84 +30,110 @@ def about(request):
     """About page view"""
     return render(request, 'learner/about.html')
 
+# Catalog filters passed through to the backend, with their sidebar titles
+CATALOG_FACETS = [
+    ('category', 'Category'),
+    ('level', 'Level'),
+    ('price_band', 'Price'),
+    ('rating_band', 'Rating'),
+]
+PRICE_BAND_LABELS = {'free': 'Free', 'under_50': 'Under $50', '50_to_100': '$50 - $100', '100_plus': '$100+'}
+
+
+def catalog_facet_groups(facets, filters):
+    """Sidebar facet groups with a link per value that keeps the other filters"""
+    groups = []
+    for name, title in CATALOG_FACETS:
+        others = {key: value for key, value in filters.items() if key != name}
+        options = [{
+            'label': 'All',
+            'url': '?' + urlencode(others),
+            'selected': not filters.get(name),
+            'count': None,
+        }]
+        for facet in facets.get(name, []):
+            if name == 'price_band':
+                label = PRICE_BAND_LABELS.get(facet['value'], facet['value'])
+            elif name == 'rating_band':
+                label = f"{facet['value']} & up"
+            else:
+                label = facet['value']
+            options.append({
+                'label': label,
+                'url': '?' + urlencode({**others, name: facet['value']}),
+                'selected': filters.get(name) == facet['value'],
+                'count': facet['count'],
+            })
+        groups.append({'title': title, 'options': options})
+    return groups
+
+
 def courses(request):
-    """Courses listing page view"""
-    import requests
+    """Courses listing page view (faceted catalog)"""
+    api = get_api_client()
+    
+    filters = {
+        name: request.GET[name]
+        for name in ['search'] + [facet for facet, _ in CATALOG_FACETS]
+        if request.GET.get(name)
+    }
+    cursor = request.GET.get('cursor')
     
     courses_list = []
+    facets = {}
+    total = 0
+    next_cursor = None
     try:
-        # Fetch published courses from backend API
-        response = requests.get('http://localhost:8001/api/courses/')
+        # Fetch one page of published courses and the facet counts from backend API
+        params = dict(filters, cursor=cursor) if cursor else filters
+        response = api.get('/courses/catalog/', params=params)
         
         if response.status_code == 200:
             data = response.json()
             courses_list = data.get('courses', [])
+            facets = data.get('facets', {})
+            total = data.get('total', len(courses_list))
+            next_cursor = data.get('next_cursor')
     except Exception as e:
         print(f"Error fetching courses: {str(e)}")
     
     context = {
         'courses': courses_list,
-        'total_count': len(courses_list)
+        'total_count': total,
+        'facet_groups': catalog_facet_groups(facets, filters),
+        'search': filters.get('search', ''),
+        'first_page_url': '?' + urlencode(filters),
+        'next_page_url': '?' + urlencode(dict(filters, cursor=next_cursor)) if next_cursor else None,
+        'is_first_page': not cursor
     }
     
     return render(request, 'learner/courses.html', context)
 
 def course_detail(request, course_id):
     """Course detail page view - shows course overview without content access"""
-    import requests
+    api = get_api_client()
     
     course = None
     modules = []
     is_enrolled = False
     enrollment_progress = 0
+    access_token = get_access_token(request) if api_is_authenticated(request) else None
     
     try:
-        # Fetch course details from backend API
-        response = requests.get(f'http://localhost:8001/api/courses/{course_id}/')
+        # Course, curriculum and (if logged in) enrollment/progress in one backend call
+        response = api.get(f'/courses/{course_id}/page/', token=access_token)
         
         if response.status_code == 200:
             data = response.json()
             course = data.get('course')
+            modules = data.get('modules', [])
+            is_enrolled = data.get('is_enrolled', False)
             
-            # Fetch course modules (curriculum overview only)
-            modules_response = requests.get(f'http://localhost:8001/api/courses/{course_id}/modules/')
-            if modules_response.status_code == 200:
-                modules_data = modules_response.json()
-                modules = modules_data.get('modules', [])
-                
-                # Fetch lessons for each module
-                for module in modules:
-                    module_id = module.get('id')
-                    lessons_response = requests.get(f'http://localhost:8001/api/courses/module/{module_id}/lessons/')
-                    if lessons_response.status_code == 200:
-                        lessons_data = lessons_response.json()
-                        module['lessons'] = lessons_data.get('lessons', [])
-                    else:
-                        module['lessons'] = []
-            
-            # Check if user is enrolled and get progress (if logged in)
-            if api_is_authenticated(request):
-                access_token = get_access_token(request)
-                enrollment_response = requests.get(
-                    f'http://localhost:8001/api/courses/{course_id}/enrollment/check/',
-                    headers={'Authorization': f'Bearer {access_token}'}
-                )
-                if enrollment_response.status_code == 200:
-                    enrollment_data = enrollment_response.json()
-                    is_enrolled = enrollment_data.get('is_enrolled', False)
-                    
-                    # If enrolled, fetch progress details
-                    if is_enrolled:
-                        progress_response = requests.get(
-                            f'http://localhost:8001/api/courses/{course_id}/progress/details/',
-                            headers={'Authorization': f'Bearer {access_token}'}
-                        )
-                        if progress_response.status_code == 200:
-                            progress_data = progress_response.json()
-                            progress_info = progress_data.get('progress', {})
-                            enrollment_progress = progress_info.get('completion_percentage', 0)
-                        else:
-                            print(f"Failed to fetch progress: {progress_response.status_code}")
+            if is_enrolled:
+                progress_info = data.get('progress') or {}
+                enrollment_progress = progress_info.get('completion_percentage', 0)
+        else:
+            print(f"Failed to fetch course page: {response.status_code}")
     
     except Exception as e:
         print(f"Error fetching course details: {str(e)}")
@@ -492,7 +520,7 @@ def disable_2fa(request):
 @api_login_required
 def my_learning_view(request):
     """Student dashboard - My enrolled courses"""
-    import requests
+    api = get_api_client()
     
     user = get_current_user(request)
     enrolled_courses = []
@@ -502,56 +530,36 @@ def my_learning_view(request):
     
     if user:
         try:
-            # Fetch enrolled courses from backend API
+            # Whole dashboard from the materialized learning summary (one read)
             access_token = get_access_token(request)
-            response = requests.get(
-                'http://localhost:8001/api/courses/my/enrollments/',
-                headers={'Authorization': f'Bearer {access_token}'}
+            response = api.get(
+                '/courses/progress/summary/',
+                token=access_token
             )
             
             if response.status_code == 200:
                 data = response.json()
-                enrollments = data.get('enrollments', [])
                 
-                # Fetch course details for each enrollment
-                for enrollment in enrollments:
-                    course_id = enrollment.get('course_id')
-                    course_response = requests.get(f'http://localhost:8001/api/courses/{course_id}/')
-                    if course_response.status_code == 200:
-                        course_data = course_response.json()
-                        course = course_data.get('course')
-                        if course:
-                            course['progress'] = enrollment.get('progress', 0)
-                            course['enrollment_date'] = enrollment.get('enrolled_at')
-                            
-                            # Fetch detailed progress info for richer dashboard data
-                            progress_info = None
-                            try:
-                                progress_resp = requests.get(
-                                    f'http://localhost:8001/api/courses/{course_id}/progress/details/',
-                                    headers={'Authorization': f'Bearer {access_token}'}
-                                )
-                                if progress_resp.status_code == 200:
-                                    progress_payload = progress_resp.json()
-                                    progress_info = progress_payload.get('progress')
-                            except Exception as progress_error:
-                                print(f"Error fetching progress details for course {course_id}: {progress_error}")
-                            
-                            if progress_info:
-                                course['progress_info'] = progress_info
-                                completion_percentage = progress_info.get('completion_percentage', 0) or 0
-                            else:
-                                completion_percentage = course.get('progress', 0) or 0
-                            
-                            if enrollment.get('completed') or completion_percentage >= 100:
-                                completed_courses += 1
-                            elif completion_percentage > 0:
-                                in_progress_courses += 1
-                            
-                            if enrollment.get('certificate_issued'):
-                                certificates_earned += 1
-                            
-                            enrolled_courses.append(course)
+                for entry in data.get('progress', []) or []:
+                    course = entry.get('course')
+                    # Summaries also hold progress of courses without an enrollment
+                    if not course or not entry.get('enrollment_id'):
+                        continue
+                    
+                    completion_percentage = entry.get('completion_percentage', 0) or 0
+                    course['progress'] = completion_percentage
+                    course['enrollment_date'] = entry.get('enrolled_at')
+                    course['progress_info'] = entry
+                    
+                    if entry.get('completed') or completion_percentage >= 100:
+                        completed_courses += 1
+                    elif completion_percentage > 0:
+                        in_progress_courses += 1
+                    
+                    if entry.get('certificate_issued'):
+                        certificates_earned += 1
+                    
+                    enrolled_courses.append(course)
                             
         except Exception as e:
             print(f"Error fetching enrollments: {str(e)}")
@@ -570,7 +578,7 @@ def my_learning_view(request):
 @api_login_required
 def my_progress_view(request):
     """Student progress tracking"""
-    import requests
+    api = get_api_client()
 
     access_token = get_access_token(request)
     progress_entries = []
@@ -581,77 +589,28 @@ def my_progress_view(request):
     average_percentage = 0
 
     try:
-        response = requests.get(
-            'http://localhost:8001/api/courses/progress/my/',
-            headers={'Authorization': f'Bearer {access_token}'}
+        # Entries and totals come from the materialized learning summary
+        response = api.get(
+            '/courses/progress/summary/',
+            token=access_token
         )
 
         if response.status_code == 200:
             payload = response.json()
-            api_entries = payload.get('progress', []) or []
-
-            enriched_entries = []
-            for entry in api_entries:
-                lessons = entry.get('lessons_completed') or []
-                quizzes = entry.get('quizzes_completed') or []
-                assignments = entry.get('assignments_completed') or []
-
-                minutes_raw = entry.get('time_spent_minutes', 0)
-                try:
-                    minutes = float(minutes_raw) if minutes_raw is not None else 0
-                except (TypeError, ValueError):
-                    minutes = 0
-
-                completion_raw = entry.get('completion_percentage', 0)
-                try:
-                    completion = float(completion_raw) if completion_raw is not None else 0
-                except (TypeError, ValueError):
-                    completion = 0
-
-                course_id = entry.get('course_id')
-                if isinstance(course_id, dict) and course_id.get('$oid'):
-                    course_id = course_id['$oid']
-
-                course_title = 'Course'
-                course_thumbnail = '/static/img/education/courses-3.webp'
-                try:
-                    if course_id:
-                        course_resp = requests.get(
-                            f'http://localhost:8001/api/courses/{course_id}/',
-                            headers={'Authorization': f'Bearer {access_token}'}
-                        )
-                        if course_resp.status_code == 200:
-                            course_payload = course_resp.json().get('course', {})
-                            course_title = course_payload.get('title') or course_title
-                            course_thumbnail = course_payload.get('thumbnail_url') or course_payload.get('thumbnail') or course_thumbnail
-                except Exception as course_error:
-                    print(f"Error fetching course {course_id} details: {course_error}")
-
-                total_minutes += minutes
-                total_lessons += len(lessons)
-                total_quizzes += len(quizzes)
-                total_assignments += len(assignments)
-                average_percentage += completion
-
-                enriched_entries.append({
+            totals = payload.get('totals') or {}
+
+            progress_entries = [
+                {
                     **entry,
-                    'course_id': course_id,
-                    'course_title': course_title,
-                    'course_thumbnail': course_thumbnail,
-                    'lessons_completed_count': len(lessons),
-                    'quizzes_completed_count': len(quizzes),
-                    'assignments_completed_count': len(assignments),
-                    'time_spent_minutes': minutes,
-                    'completion_percentage': completion,
-                    'lessons_completed': lessons,
-                    'quizzes_completed': quizzes,
-                    'assignments_completed': assignments
-                })
-
-            progress_entries = enriched_entries
-
-            if progress_entries:
-                average_percentage = round(average_percentage / len(progress_entries), 1)
+                    'course_thumbnail': entry.get('course_thumbnail') or '/static/img/education/courses-3.webp',
+                }
+                for entry in payload.get('progress', []) or []
+            ]
+            total_minutes = totals.get('time_spent_minutes', 0) or 0
+            total_lessons = totals.get('lessons_completed', 0)
+            total_quizzes = totals.get('quizzes_completed', 0)
+            total_assignments = totals.get('assignments_completed', 0)
+            average_percentage = totals.get('average_completion_percentage', 0)
     except Exception as e:
         print(f"Error fetching progress data: {str(e)}")
 
@@ -715,7 +674,7 @@ def instructor_dashboard_view(request):
     backend = APIAuthBackend()
     access_token = get_access_token(request)
     
-    import requests
+    api = get_api_client()
     courses = []
     stats = {
         'total_courses': 0,
@@ -726,9 +685,9 @@ def instructor_dashboard_view(request):
     }
     
     try:
-        response = requests.get(
-            'http://localhost:8001/api/courses/instructor/my-courses/',
-            headers={'Authorization': f'Bearer {access_token}'}
+        response = api.get(
+            '/courses/instructor/my-courses/',
+            token=access_token
         )
         
         if response.status_code == 200:
@@ -775,11 +734,11 @@ def instructor_courses_view(request):
     backend = APIAuthBackend()
     access_token = get_access_token(request)
     
-    import requests
+    api = get_api_client()
     try:
-        response = requests.get(
-            'http://localhost:8001/api/courses/instructor/my-courses/',
-            headers={'Authorization': f'Bearer {access_token}'}
+        response = api.get(
+            '/courses/instructor/my-courses/',
+            token=access_token
         )
         
         if response.status_code == 200:
@@ -855,7 +814,7 @@ def create_course_view(request):
         backend = APIAuthBackend()
         access_token = get_access_token(request)
         
-        import requests
+        api = get_api_client()
         try:
             # Prepare course data
             course_data = {
@@ -868,10 +827,10 @@ def create_course_view(request):
                 'preview_video': request.POST.get('preview_video', ''),
             }
             
-            response = requests.post(
-                'http://localhost:8001/api/courses/instructor/create/',
+            response = api.post(
+                '/courses/instructor/create/',
                 json=course_data,
-                headers={'Authorization': f'Bearer {access_token}'}
+                token=access_token
             )
             
             if response.status_code == 201:
@@ -908,7 +867,7 @@ def edit_course_view(request, course_id):
     backend = APIAuthBackend()
     access_token = get_access_token(request)
     
-    import requests
+    api = get_api_client()
     
     if request.method == 'POST':
         try:
@@ -926,10 +885,10 @@ def edit_course_view(request, course_id):
             if 'published' in request.POST:
                 update_data['published'] = request.POST.get('published') == 'true'
             
-            response = requests.put(
-                f'http://localhost:8001/api/courses/instructor/course/{course_id}/',
+            response = api.put(
+                f'/courses/instructor/course/{course_id}/',
                 json=update_data,
-                headers={'Authorization': f'Bearer {access_token}'}
+                token=access_token
             )
             
             if response.status_code == 200:
@@ -942,9 +901,9 @@ def edit_course_view(request, course_id):
     
     # Fetch course data
     try:
-        response = requests.get(
-            f'http://localhost:8001/api/courses/instructor/course/{course_id}/',
-            headers={'Authorization': f'Bearer {access_token}'}
+        response = api.get(
+            f'/courses/instructor/course/{course_id}/',
+            token=access_token
         )
         
         if response.status_code == 200:
@@ -952,9 +911,9 @@ def edit_course_view(request, course_id):
             course = data.get('course', {})
             
             # Fetch modules for this course
-            modules_response = requests.get(
-                f'http://localhost:8001/api/courses/instructor/course/{course_id}/modules/',
-                headers={'Authorization': f'Bearer {access_token}'}
+            modules_response = api.get(
+                f'/courses/instructor/course/{course_id}/modules/',
+                token=access_token
             )
             
             if modules_response.status_code == 200:
@@ -985,7 +944,7 @@ def edit_course_view(request, course_id):
 @api_login_required
 def create_quiz_view(request, lesson_id):
     """Create quiz for a lesson (Instructor only)"""
-    import requests
+    api = get_api_client()
     
     # Get lesson and course details
     access_token = get_access_token(request)
@@ -993,9 +952,9 @@ def create_quiz_view(request, lesson_id):
     course_id = None
     
     try:
-        lesson_response = requests.get(
-            f'http://localhost:8001/api/courses/lesson/{lesson_id}/',
-            headers={'Authorization': f'Bearer {access_token}'}
+        lesson_response = api.get(
+            f'/courses/lesson/{lesson_id}/',
+            token=access_token
         )
         if lesson_response.status_code == 200:
             lesson_data = lesson_response.json()
@@ -1018,16 +977,16 @@ def create_quiz_view(request, lesson_id):
 @api_login_required
 def take_quiz_view(request, quiz_id):
     """Take a quiz (Student)"""
-    import requests
+    api = get_api_client()
     import json
     
     access_token = get_access_token(request)
     quiz = None
     
     try:
-        quiz_response = requests.get(
-            f'http://localhost:8001/api/courses/quiz/{quiz_id}/',
-            headers={'Authorization': f'Bearer {access_token}'}
+        quiz_response = api.get(
+            f'/courses/quiz/{quiz_id}/',
+            token=access_token
         )
         if quiz_response.status_code == 200:
             quiz = quiz_response.json()
@@ -1049,16 +1008,16 @@ def take_quiz_view(request, quiz_id):
 @api_login_required
 def create_assignment_view(request, course_id):
     """Create assignment for a course (Instructor only)"""
-    import requests
+    api = get_api_client()
     
     # Get course details
     access_token = get_access_token(request)
     course = None
     
     try:
-        course_response = requests.get(
-            f'http://localhost:8001/api/courses/{course_id}/',
-            headers={'Authorization': f'Bearer {access_token}'}
+        course_response = api.get(
+            f'/courses/{course_id}/',
+            token=access_token
         )
         if course_response.status_code == 200:
             course_data = course_response.json()
@@ -1079,16 +1038,16 @@ def create_assignment_view(request, course_id):
 @api_login_required
 def take_assignment_view(request, assignment_id):
     """Take an assignment (Student)"""
-    import requests
+    api = get_api_client()
     import json
     
     access_token = get_access_token(request)
     assignment = None
     
     try:
-        assignment_response = requests.get(
-            f'http://localhost:8001/api/courses/assignment/{assignment_id}/',
-            headers={'Authorization': f'Bearer {access_token}'}
+        assignment_response = api.get(
+            f'/courses/assignment/{assignment_id}/',
+            token=access_token
         )
         if assignment_response.status_code == 200:
             assignment = assignment_response.json()
@@ -1122,16 +1081,16 @@ def manage_assignments_view(request):
 @api_login_required
 def grade_submission_view(request, submission_id):
     """Grade a student submission (Instructor)"""
-    import requests
+    api = get_api_client()
     import json
     
     access_token = get_access_token(request)
     submission = None
     
     try:
-        submission_response = requests.get(
-            f'http://localhost:8001/api/courses/submission/{submission_id}/',
-            headers={'Authorization': f'Bearer {access_token}'}
+        submission_response = api.get(
+            f'/courses/submission/{submission_id}/',
+            token=access_token
         )
         if submission_response.status_code == 200:
             submission = submission_response.json()
@@ -1148,24 +1107,18 @@ def grade_submission_view(request, submission_id):
     return render(request, 'learner/grade_submission.html', context)
 
 
-@api_login_required
-def my_progress_view(request):
-    """View student's progress across all courses"""
-    return render(request, 'learner/my_progress.html')
-
-
 @api_login_required
 def course_progress_view(request, course_id):
     """View detailed progress for a specific course"""
-    import requests
+    api = get_api_client()
     
     access_token = get_access_token(request)
     course = None
     
     try:
-        course_response = requests.get(
-            f'http://localhost:8001/api/courses/{course_id}/',
-            headers={'Authorization': f'Bearer {access_token}'}
+        course_response = api.get(
+            f'/courses/{course_id}/',
+            token=access_token
         )
         if course_response.status_code == 200:
             course = course_response.json()
@@ -1183,15 +1136,15 @@ def course_progress_view(request, course_id):
 @api_login_required
 def submit_course_review_view(request, course_id):
     """Submit a review for a course"""
-    import requests
+    api = get_api_client()
     
     access_token = get_access_token(request)
     course = None
     
     try:
-        course_response = requests.get(
-            f'http://localhost:8001/api/courses/{course_id}/',
-            headers={'Authorization': f'Bearer {access_token}'}
+        course_response = api.get(
+            f'/courses/{course_id}/',
+            token=access_token
         )
         if course_response.status_code == 200:
             course = course_response.json()
@@ -1210,24 +1163,24 @@ def submit_course_review_view(request, course_id):
 @api_login_required
 def submit_instructor_review_view(request, instructor_id, course_id):
     """Submit a review for an instructor"""
-    import requests
+    api = get_api_client()
     
     access_token = get_access_token(request)
     course = None
     instructor = None
     
     try:
-        course_response = requests.get(
-            f'http://localhost:8001/api/courses/{course_id}/',
-            headers={'Authorization': f'Bearer {access_token}'}
+        course_response = api.get(
+            f'/courses/{course_id}/',
+            token=access_token
         )
         if course_response.status_code == 200:
             course = course_response.json()
             
         # Get instructor info from users API
-        instructor_response = requests.get(
-            f'http://localhost:8001/api/users/{instructor_id}/',
-            headers={'Authorization': f'Bearer {access_token}'}
+        instructor_response = api.get(
+            f'/users/{instructor_id}/',
+            token=access_token
         )
         if instructor_response.status_code == 200:
             instructor = instructor_response.json()
@@ -1248,7 +1201,7 @@ def submit_instructor_review_view(request, instructor_id, course_id):
 @api_login_required
 def course_learning_view(request, course_id):
     """Main course learning page with lesson player and progress tracking"""
-    import requests
+    api = get_api_client()
     
     access_token = get_access_token(request)
     course = None
@@ -1257,57 +1210,23 @@ def course_learning_view(request, course_id):
     progress = None
     
     try:
-        # Check if user is enrolled in this course
-        enrollment_response = requests.get(
-            'http://localhost:8001/api/courses/my/enrollments/',
-            headers={'Authorization': f'Bearer {access_token}'}
-        )
+        # Course, modules with lessons, enrollment and progress in one backend call
+        response = api.get(f'/courses/{course_id}/page/', token=access_token)
         
-        if enrollment_response.status_code == 200:
-            enrollments = enrollment_response.json().get('enrollments', [])
-            enrolled_course_ids = [str(e.get('course_id')) for e in enrollments]
-            
-            if course_id not in enrolled_course_ids:
-                messages.error(request, 'You must be enrolled in this course to access the learning materials.')
-                return redirect('course_detail', course_id=course_id)
-        else:
+        if response.status_code != 200:
             messages.error(request, 'Unable to verify enrollment status.')
             return redirect('course_detail', course_id=course_id)
         
-        # Fetch course details
-        course_response = requests.get(
-            f'http://localhost:8001/api/courses/{course_id}/',
-            headers={'Authorization': f'Bearer {access_token}'}
-        )
-        if course_response.status_code == 200:
-            course = course_response.json().get('course')
+        data = response.json()
         
-        # Fetch modules and lessons
-        modules_response = requests.get(
-            f'http://localhost:8001/api/courses/{course_id}/modules/',
-            headers={'Authorization': f'Bearer {access_token}'}
-        )
-        if modules_response.status_code == 200:
-            modules = modules_response.json().get('modules', [])
-            
-            # Fetch lessons for each module
-            for module in modules:
-                lessons_response = requests.get(
-                    f'http://localhost:8001/api/courses/module/{module["id"]}/lessons/',
-                    headers={'Authorization': f'Bearer {access_token}'}
-                )
-                if lessons_response.status_code == 200:
-                    module['lessons'] = lessons_response.json().get('lessons', [])
-                else:
-                    module['lessons'] = []
+        # Check if user is enrolled in this course
+        if not data.get('is_enrolled'):
+            messages.error(request, 'You must be enrolled in this course to access the learning materials.')
+            return redirect('course_detail', course_id=course_id)
         
-        # Fetch student progress
-        progress_response = requests.get(
-            f'http://localhost:8001/api/courses/{course_id}/progress/details/',
-            headers={'Authorization': f'Bearer {access_token}'}
-        )
-        if progress_response.status_code == 200:
-            progress = progress_response.json().get('progress', {})
+        course = data.get('course')
+        modules = data.get('modules', [])
+        progress = data.get('progress') or {}
         
         # Determine current lesson (first incomplete lesson or first lesson)
         completed_lessons = progress.get('lessons_completed', []) if progress else []
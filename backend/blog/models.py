@@ -2,14 +2,26 @@
 Blog post models for MongoDB
 """
 from datetime import datetime
-from bson import ObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING
 from config.mongodb import get_collection
+from config.ids import to_object_id, id_filter, normalize_ids
+from config.pagination import paginate
+from config.counters import increment_counter
 
 
 class BlogPost:
     """Blog post model"""
     
     COLLECTION_NAME = 'blog_posts'
+    OBJECT_ID_FIELDS = ('author_id',)
+    INDEXES = [
+        IndexModel([('slug', ASCENDING), ('is_published', ASCENDING)]),
+        IndexModel([('is_published', ASCENDING), ('published_at', DESCENDING), ('_id', DESCENDING)]),
+        IndexModel([('category', ASCENDING), ('published_at', DESCENDING), ('_id', DESCENDING)]),
+        IndexModel([('tags', ASCENDING)]),
+        IndexModel([('author_id', ASCENDING), ('created_at', DESCENDING)]),
+        IndexModel([('is_featured', ASCENDING), ('is_published', ASCENDING)]),
+    ]
     
     CATEGORIES = ['Technology', 'Education', 'Career', 'Tips & Tricks', 
                   'News', 'Student Life', 'Industry Insights']
@@ -49,6 +61,7 @@ class BlogPost:
         
         if kwargs.get('is_published') and not kwargs.get('published_at'):
             kwargs['published_at'] = datetime.utcnow()
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
@@ -58,9 +71,7 @@ class BlogPost:
     def find_by_id(cls, post_id):
         """Find post by ID"""
         collection = cls.get_collection()
-        if isinstance(post_id, str):
-            post_id = ObjectId(post_id)
-        post_data = collection.find_one({'_id': post_id})
+        post_data = collection.find_one({'_id': to_object_id(post_id)})
         return cls(**post_data) if post_data else None
     
     @classmethod
@@ -71,20 +82,34 @@ class BlogPost:
         return cls(**post_data) if post_data else None
     
     @classmethod
-    def find_all(cls, filters=None, skip=0, limit=10):
-        """Find all posts with filters"""
-        collection = cls.get_collection()
-        query = filters or {'is_published': True}
-        posts_data = collection.find(query).skip(skip).limit(limit).sort('published_at', -1)
-        return [cls(**post) for post in posts_data]
+    def find_version_by_slug(cls, slug):
+        """_id and updated_at of a published post (None if not found)"""
+        return cls.get_collection().find_one(
+            {'slug': slug, 'is_published': True},
+            {'updated_at': 1}
+        )
+    
+    @classmethod
+    def find_all(cls, filters=None, limit=10, cursor=None):
+        """Find all posts with filters (one page, latest first)"""
+        return cls.find_page(filters, limit, cursor)[0]
+    
+    @classmethod
+    def find_page(cls, filters=None, limit=10, cursor=None):
+        """
+        One page of posts, latest first
+        Returns (posts, next_cursor); next_cursor is None on the last page
+        """
+        posts_data, next_cursor = paginate(
+            cls.get_collection(), filters or {'is_published': True}, 'published_at', DESCENDING, limit, cursor
+        )
+        return [cls(**post) for post in posts_data], next_cursor
     
     @classmethod
     def find_by_author(cls, author_id):
         """Find posts by author"""
         collection = cls.get_collection()
-        if isinstance(author_id, str):
-            author_id = ObjectId(author_id)
-        posts_data = collection.find({'author_id': author_id}).sort('created_at', -1)
+        posts_data = collection.find({'author_id': id_filter(author_id)}).sort('created_at', -1)
         return [cls(**post) for post in posts_data]
     
     @classmethod
@@ -108,11 +133,15 @@ class BlogPost:
             setattr(self, key, value)
     
     def increment_views(self):
-        """Increment view count"""
-        collection = self.get_collection()
-        collection.update_one({'_id': self.id}, {'$inc': {'views_count': 1}})
+        """Increment view count (write-behind)"""
+        increment_counter(self.COLLECTION_NAME, self.id, 'views_count')
         self.views_count += 1
     
+    def increment_comments(self, amount=1):
+        """Increment or decrement comment count (write-behind)"""
+        increment_counter(self.COLLECTION_NAME, self.id, 'comments_count', amount)
+        self.comments_count += amount
+    
     def delete(self):
         """Delete post"""
         collection = self.get_collection()
@@ -145,6 +174,10 @@ class BlogComment:
     """Blog comment model"""
     
     COLLECTION_NAME = 'blog_comments'
+    OBJECT_ID_FIELDS = ('post_id', 'user_id', 'parent_id')
+    INDEXES = [
+        IndexModel([('post_id', ASCENDING), ('created_at', DESCENDING)]),
+    ]
     
     def __init__(self, **kwargs):
         self.id = kwargs.get('_id')
@@ -165,6 +198,7 @@ class BlogComment:
         collection = cls.get_collection()
         kwargs['created_at'] = datetime.utcnow()
         kwargs['updated_at'] = datetime.utcnow()
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
@@ -174,11 +208,16 @@ class BlogComment:
     def find_by_post(cls, post_id):
         """Find comments by post"""
         collection = cls.get_collection()
-        if isinstance(post_id, str):
-            post_id = ObjectId(post_id)
-        comments_data = collection.find({'post_id': post_id}).sort('created_at', -1)
+        comments_data = collection.find({'post_id': id_filter(post_id)}).sort('created_at', -1)
         return [cls(**comment) for comment in comments_data]
     
+    @classmethod
+    def find_latest(cls, post_id):
+        """_id and created_at of a post's newest comment (None without comments)"""
+        return cls.get_collection().find_one(
+            {'post_id': id_filter(post_id)}, {'created_at': 1}, sort=[('created_at', -1)]
+        )
+    
     def to_dict(self):
         """Convert to dictionary"""
         return {
@@ -9,7 +9,10 @@ from bson import ObjectId
 
 from blog.models import BlogPost, BlogComment
 from blog.serializers import BlogPostSerializer, BlogCommentSerializer
-from users.models import User
+from users.loaders import get_user_loader
+from users.permissions import get_request_role
+from config.pagination import InvalidCursor, get_page_params
+from config.conditional import ConditionalGetMixin, latest
 
 
 class BlogPostListView(APIView):
@@ -23,8 +26,7 @@ class BlogPostListView(APIView):
             tag = request.query_params.get('tag')
             search = request.query_params.get('search')
             featured = request.query_params.get('featured')
-            skip = int(request.query_params.get('skip', 0))
-            limit = int(request.query_params.get('limit', 10))
+            cursor, limit = get_page_params(request.query_params, default_limit=10)
             
             filters = {'is_published': True}
             if category:
@@ -39,7 +41,10 @@ class BlogPostListView(APIView):
                     {'content': {'$regex': search, '$options': 'i'}}
                 ]
             
-            posts = BlogPost.find_all(filters, skip, limit)
+            posts, next_cursor = BlogPost.find_page(filters, limit, cursor)
+            
+            users = get_user_loader(request)
+            users.prime(post.author_id for post in posts)
             
             posts_data = []
             for post in posts:
@@ -47,7 +52,7 @@ class BlogPostListView(APIView):
                 
                 # Get author details
                 if post.author_id:
-                    author = User.find_by_id(post.author_id)
+                    author = users.load(post.author_id)
                     if author:
                         post_dict['author'] = {
                             'id': str(author.id),
@@ -59,9 +64,12 @@ class BlogPostListView(APIView):
             
             return Response({
                 'count': len(posts_data),
-                'posts': posts_data
+                'posts': posts_data,
+                'next_cursor': next_cursor
             }, status=status.HTTP_200_OK)
             
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({
                 'error': 'Failed to fetch blog posts',
@@ -71,10 +79,9 @@ class BlogPostListView(APIView):
     def post(self, request):
         """Create a new blog post"""
         try:
-            user_id = request.user.get('user_id')
-            user = User.find_by_id(user_id)
+            user_id = str(request.user.id)
             
-            if not user or user.role not in ['instructor', 'admin']:
+            if get_request_role(request) not in ['instructor', 'admin']:
                 return Response({
                     'error': 'Only instructors and admins can create blog posts'
                 }, status=status.HTTP_403_FORBIDDEN)
@@ -101,10 +108,29 @@ class BlogPostListView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class BlogPostDetailView(APIView):
+class BlogPostDetailView(ConditionalGetMixin, APIView):
     """Get, update, or delete a specific blog post"""
     permission_classes = [AllowAny]
     
+    def get_validators(self, request, slug):
+        """
+        Post version and newest comment
+        Not the counters: they are write-behind, so they'd change after the
+        comments they count are already in the response.
+        """
+        version = BlogPost.find_version_by_slug(slug)
+        if not version:
+            return None
+        self._post_version = version
+        comment = BlogComment.find_latest(version['_id']) or {}
+        parts = (str(version['_id']), version.get('updated_at'),
+                 str(comment.get('_id')), comment.get('created_at'))
+        return parts, latest(version.get('updated_at'), comment.get('created_at'))
+    
+    def not_modified(self, request, slug):
+        """A revalidated read is still a view"""
+        BlogPost(**self._post_version).increment_views()
+    
     def get(self, request, slug):
         """Get blog post by slug"""
         try:
@@ -120,9 +146,14 @@ class BlogPostDetailView(APIView):
             
             post_dict = post.to_dict()
             
+            # Author and comment users are fetched together in one query
+            comments = BlogComment.find_by_post(post.id)
+            users = get_user_loader(request)
+            users.prime([post.author_id] + [comment.user_id for comment in comments])
+            
             # Get author details
             if post.author_id:
-                author = User.find_by_id(post.author_id)
+                author = users.load(post.author_id)
                 if author:
                     post_dict['author'] = {
                         'id': str(author.id),
@@ -133,11 +164,10 @@ class BlogPostDetailView(APIView):
                     }
             
             # Get comments
-            comments = BlogComment.find_by_post(post.id)
             comments_data = []
             for comment in comments:
                 comment_dict = comment.to_dict()
-                user = User.find_by_id(comment.user_id)
+                user = users.load(comment.user_id)
                 if user:
                     comment_dict['user'] = {
                         'id': str(user.id),
@@ -247,7 +277,7 @@ class BlogCommentView(APIView):
                 comment = BlogComment.create(**comment_data)
                 
                 # Update post comments count
-                post.update(comments_count=post.comments_count + 1)
+                post.increment_comments()
                 
                 return Response({
                     'message': 'Comment created successfully',
@@ -273,13 +303,16 @@ class FeaturedBlogPostsView(APIView):
             limit = int(request.query_params.get('limit', 3))
             posts = BlogPost.find_featured(limit)
             
+            users = get_user_loader(request)
+            users.prime(post.author_id for post in posts)
+            
             posts_data = []
             for post in posts:
                 post_dict = post.to_dict()
                 
                 # Get author details
                 if post.author_id:
-                    author = User.find_by_id(post.author_id)
+                    author = users.load(post.author_id)
                     if author:
                         post_dict['author'] = {
                             'id': str(author.id),
@@ -0,0 +1,93 @@
+"""
+Conditional GET support for API views
+A view with ConditionalGetMixin implements get_validators() using cheap
+lookups (cached finders or an updated_at projection). The mixin turns
+those versions into a weak ETag and a Last-Modified date, and it answers
+a matching If-None-Match / If-Modified-Since with 304 Not Modified. This
+happens after authentication and permission checks, but before the view
+queries and serializes the body. Validators are evaluated by
+django.utils.cache.get_conditional_response, so the HTTP rules are
+Django's.
+"""
+import calendar
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class NotModified(Exception):
+    """Raised from APIView.initial to short-circuit to a 304"""
+
+
+def make_etag(*parts):
+    """Weak ETag from the versions of the documents a response is built from"""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return 'W/' + quote_etag(digest)
+
+
+def latest(*timestamps):
+    """Most recent of several datetimes (None ignored)"""
+    timestamps = [timestamp for timestamp in timestamps if timestamp]
+    return max(timestamps) if timestamps else None
+
+
+class ConditionalGetMixin:
+    """
+    APIView mixin for conditional GET/HEAD
+    get_validators(request, *args, **kwargs) returns (version_parts, last_modified)
+    or None to skip conditional handling (e.g. not found, not allowed - the
+    view then answers as usual). last_modified is a naive UTC datetime or None.
+    """
+
+    # Cache-Control directives sent with validated responses; clients must revalidate
+    cache_control = {'no_cache': True}
+
+    def get_validators(self, request, *args, **kwargs):
+        return None
+
+    def not_modified(self, request, *args, **kwargs):
+        """Hook run when answering 304 (e.g. to count a view)"""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._etag = None
+        self._last_modified = None
+        if request.method not in ('GET', 'HEAD'):
+            return
+
+        try:
+            validators = self.get_validators(request, *args, **kwargs)
+        except Exception as e:
+            # Let the view answer (and report) bad ids or lookup failures itself
+            print(f"⚠️ Skipping conditional GET: {str(e)}")
+            validators = None
+        if not validators:
+            return
+        parts, last_modified = validators
+        self._etag = make_etag(*parts)
+        self._last_modified = calendar.timegm(last_modified.utctimetuple()) if last_modified else None
+
+        conditional = get_conditional_response(
+            request._request, etag=self._etag, last_modified=self._last_modified
+        )
+        if conditional is not None and conditional.status_code == status.HTTP_304_NOT_MODIFIED:
+            self.not_modified(request, *args, **kwargs)
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, '_etag', None)
+        if etag and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            if self._last_modified is not None:
+                response['Last-Modified'] = http_date(self._last_modified)
+            patch_cache_control(response, **self.cache_control)
+        return response
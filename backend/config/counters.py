@@ -0,0 +1,56 @@
+"""
+Write-behind counters
+Increments of denormalized counters (views_count, likes_count, comments_count)
+are coalesced per (collection, _id, field) in memory and flushed as one
+bulk_write of $inc operations every COUNTER_FLUSH_INTERVAL seconds and at
+shutdown, so a popular document costs one write per interval instead of
+one per hit. Counters lag by up to one interval.
+"""
+from bson import ObjectId
+from django.conf import settings
+from pymongo import UpdateOne
+
+from config.mongodb import get_collection
+from config.write_buffer import WriteBehindBuffer
+
+COUNTER_WRITE_BEHIND = getattr(settings, 'COUNTER_WRITE_BEHIND', True)
+COUNTER_FLUSH_INTERVAL = getattr(settings, 'COUNTER_FLUSH_INTERVAL', 5)
+COUNTER_MAX_PENDING = getattr(settings, 'COUNTER_MAX_PENDING', 1000)
+
+
+class CounterBuffer(WriteBehindBuffer):
+    """Sums increments keyed by (collection_name, document_id, field)"""
+
+    def merge(self, current, amount):
+        return (current or 0) + amount
+
+    def build_operations(self, pending):
+        # One $inc per document, covering all of its buffered fields
+        updates = {}
+        for (collection_name, document_id, field), amount in pending.items():
+            if amount:
+                updates.setdefault((collection_name, document_id), {})[field] = amount
+
+        operations = {}
+        for (collection_name, document_id), inc in updates.items():
+            operations.setdefault(collection_name, []).append(
+                UpdateOne({'_id': document_id}, {'$inc': inc})
+            )
+        return operations
+
+
+counter_buffer = CounterBuffer(
+    'counters',
+    flush_interval=COUNTER_FLUSH_INTERVAL,
+    max_pending=COUNTER_MAX_PENDING
+)
+
+
+def increment_counter(collection_name, document_id, field, amount=1):
+    """Increment a counter field on a document (buffered unless COUNTER_WRITE_BEHIND is off)"""
+    if isinstance(document_id, str):
+        document_id = ObjectId(document_id)
+    if not COUNTER_WRITE_BEHIND:
+        get_collection(collection_name).update_one({'_id': document_id}, {'$inc': {field: amount}})
+        return
+    counter_buffer.add((collection_name, document_id, field), amount)
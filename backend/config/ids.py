@@ -0,0 +1,143 @@
+"""
+Canonical MongoDB id representation
+References between documents are stored as ObjectId; models declare their
+reference fields in OBJECT_ID_FIELDS and go through these helpers to write
+and query them. Documents written before may still hold string ids: until
+manage.py migrate_object_ids has rewritten them, MONGO_LEGACY_STRING_IDS
+makes id filters match both forms (an $in of two values, still indexed).
+"""
+from datetime import datetime
+
+from bson import ObjectId
+from django.conf import settings
+from pymongo import UpdateOne
+
+from config.mongodb import get_collection
+
+LEGACY_STRING_IDS = getattr(settings, 'MONGO_LEGACY_STRING_IDS', True)
+MIGRATION_BATCH_SIZE = getattr(settings, 'MONGO_ID_MIGRATION_BATCH_SIZE', 500)
+
+# Checkpoints of migrate_object_ids, one document per collection
+MIGRATIONS_COLLECTION = 'migrations'
+
+
+def to_object_id(value):
+    """ObjectId for an id given as ObjectId or string (None stays None, invalid raises InvalidId)"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, ObjectId):
+        return value
+    return ObjectId(str(value))
+
+
+def to_object_ids(values):
+    return [to_object_id(value) for value in values if value not in (None, '')]
+
+
+def id_filter(value):
+    """Query value matching a reference field stored as ObjectId (or legacy string)"""
+    object_id = to_object_id(value)
+    if LEGACY_STRING_IDS and object_id is not None:
+        return {'$in': [object_id, str(object_id)]}
+    return object_id
+
+
+def ids_filter(values):
+    """Query value matching any of several ids"""
+    object_ids = to_object_ids(values)
+    if LEGACY_STRING_IDS:
+        return {'$in': object_ids + [str(object_id) for object_id in object_ids]}
+    return {'$in': object_ids}
+
+
+def id_lookup_let(variable, expression='$_id'):
+    """$lookup let for id_match_expr: the ObjectId, and with legacy ids its string form"""
+    let = {variable: expression}
+    if LEGACY_STRING_IDS:
+        let[f'{variable}_str'] = {'$toString': expression}
+    return let
+
+
+def id_match_expr(field, variable):
+    """
+    $lookup pipeline $match joining field to a let variable from id_lookup_let
+    Only plain $expr $eq on a field can use the joined collection's index, so
+    legacy ids are matched with one $eq branch per form (converted once in let).
+    """
+    if LEGACY_STRING_IDS:
+        return {'$match': {'$or': [
+            {'$expr': {'$eq': [f'${field}', f'$${variable}']}},
+            {'$expr': {'$eq': [f'${field}', f'$${variable}_str']}},
+        ]}}
+    return {'$match': {'$expr': {'$eq': [f'${field}', f'$${variable}']}}}
+
+
+def normalize_ids(document, fields):
+    """Convert the given reference fields of a document to ObjectId in place (invalid ids are left as they are)"""
+    for field in fields:
+        value = document.get(field)
+        if isinstance(value, str) and ObjectId.is_valid(value):
+            document[field] = ObjectId(value)
+    return document
+
+
+def migrate_object_ids(collection_name, fields, batch_size=MIGRATION_BATCH_SIZE, restart=False):
+    """
+    Rewrite string ids in the given fields to ObjectId, in _id order and in batches
+    Progress is checkpointed after every batch, so an interrupted run resumes
+    where it stopped. Yields the checkpoint after each batch:
+    {'last_id', 'scanned', 'converted', 'invalid', 'done'}
+    Strings that aren't valid ObjectIds are left as they are and counted as invalid.
+    """
+    collection = get_collection(collection_name)
+    checkpoints = get_collection(MIGRATIONS_COLLECTION)
+    checkpoint_id = f'object_ids:{collection_name}'
+
+    checkpoint = None if restart else checkpoints.find_one({'_id': checkpoint_id})
+    if not checkpoint:
+        checkpoint = {
+            '_id': checkpoint_id, 'fields': list(fields), 'last_id': None,
+            'scanned': 0, 'converted': 0, 'invalid': 0, 'done': False,
+        }
+
+    query = {'$or': [{field: {'$type': 'string'}} for field in fields]}
+    projection = {field: 1 for field in fields}
+
+    while True:
+        batch_query = dict(query)
+        if checkpoint['last_id'] is not None:
+            batch_query['_id'] = {'$gt': checkpoint['last_id']}
+        documents = list(collection.find(batch_query, projection).sort('_id', 1).limit(batch_size))
+        if not documents:
+            checkpoint['done'] = True
+
+        operations = []
+        for document in documents:
+            update = {}
+            for field in fields:
+                value = document.get(field)
+                if not isinstance(value, str):
+                    continue
+                if ObjectId.is_valid(value):
+                    update[field] = ObjectId(value)
+                else:
+                    checkpoint['invalid'] += 1
+            if update:
+                # Only rewrite values that are still the string we read
+                operations.append(UpdateOne(
+                    {'_id': document['_id'], **{field: str(value) for field, value in update.items()}},
+                    {'$set': update}
+                ))
+        if operations:
+            result = collection.bulk_write(operations, ordered=False)
+            checkpoint['converted'] += result.modified_count
+
+        if documents:
+            checkpoint['last_id'] = documents[-1]['_id']
+            checkpoint['scanned'] += len(documents)
+        checkpoint['updated_at'] = datetime.utcnow()
+        checkpoints.replace_one({'_id': checkpoint_id}, checkpoint, upsert=True)
+        yield checkpoint
+
+        if checkpoint['done']:
+            return
@@ -0,0 +1,233 @@
+"""
+Declarative MongoDB index registry
+Model classes declare their indexes in an INDEXES list of pymongo IndexModel;
+this module collects them per collection and syncs them with the database
+(manage.py ensure_indexes). audit_finders() runs every model finder with
+sample arguments, captures the queries it sends and explains them, so
+collection scans show up before they reach production (manage.py audit_queries).
+"""
+import contextvars
+import importlib
+import inspect
+
+from bson import ObjectId
+from django.conf import settings
+from pymongo import monitoring
+from pymongo.errors import OperationFailure
+
+from config.mongodb import (
+    LazyCollection, close_mongo_connection, get_database, register_event_listener
+)
+
+# Modules holding the MongoDB model classes
+MODEL_MODULES = getattr(settings, 'MONGO_MODEL_MODULES', [
+    'users.models',
+    'blog.models',
+    'courses.models',
+    'courses.extended_models',
+    'courses.models_progress',
+    'courses.ratings',
+    'courses.summaries',
+])
+
+# Commands explained by the audit
+EXPLAINABLE_COMMANDS = ('find', 'aggregate', 'count', 'distinct')
+
+
+def get_collection_name(model):
+    """Collection of a model class (COLLECTION_NAME or a LazyCollection attribute)"""
+    name = getattr(model, 'COLLECTION_NAME', None)
+    if name:
+        return name
+    for value in vars(model).values():
+        if isinstance(value, LazyCollection):
+            return value.collection_name
+    return None
+
+
+def iter_models(attribute='INDEXES'):
+    """Model classes defined in MODEL_MODULES that declare the given attribute"""
+    for module_name in MODEL_MODULES:
+        module = importlib.import_module(module_name)
+        for _, model in inspect.getmembers(module, inspect.isclass):
+            if model.__module__ == module_name and hasattr(model, attribute) and get_collection_name(model):
+                yield model
+
+
+def get_index_registry():
+    """Declared indexes: {collection_name: [IndexModel]}"""
+    registry = {}
+    for model in iter_models():
+        indexes = registry.setdefault(get_collection_name(model), [])
+        names = {index.document['name'] for index in indexes}
+        indexes.extend(index for index in model.INDEXES if index.document['name'] not in names)
+    return registry
+
+
+def sync_indexes(collection_name, indexes, prune=False, dry_run=False):
+    """
+    Create the declared indexes missing from a collection and, with prune,
+    drop the ones no model declares (_id is always kept)
+    Returns: {'created': [...], 'existing': [...], 'dropped': [...], 'errors': [...]}
+    """
+    db = get_database()
+    result = {'created': [], 'existing': [], 'dropped': [], 'errors': []}
+
+    if collection_name not in db.list_collection_names():
+        if not dry_run:
+            db.create_collection(collection_name)
+        current = {}
+    else:
+        current = db[collection_name].index_information()
+
+    declared = {index.document['name']: index for index in indexes}
+
+    # Drop first: a collection has at most one text index, so a changed one
+    # can only be created once the old one is gone
+    if prune:
+        for name in current:
+            if name == '_id_' or name in declared:
+                continue
+            if not dry_run:
+                db[collection_name].drop_index(name)
+            result['dropped'].append(name)
+
+    for name, index in declared.items():
+        if name in current:
+            result['existing'].append(name)
+            continue
+        if not dry_run:
+            try:
+                db[collection_name].create_indexes([index])
+            except OperationFailure as e:
+                # e.g. duplicates under a unique index, or same keys with other options
+                result['errors'].append(f'{name}: {str(e)}')
+                continue
+        result['created'].append(name)
+
+    return result
+
+
+class QueryCaptureListener(monitoring.CommandListener):
+    """Keeps the read commands sent while capture_queries is set"""
+
+    def started(self, event):
+        captured = capture_queries.get()
+        if captured is not None and event.command_name in EXPLAINABLE_COMMANDS:
+            captured.append(dict(event.command))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+# List receiving the captured commands (None when not capturing)
+capture_queries = contextvars.ContextVar('capture_queries', default=None)
+query_capture_listener = QueryCaptureListener()
+
+# Sample finder arguments by parameter name (ids default to a fresh ObjectId)
+SAMPLE_ARGUMENTS = {
+    'email': 'audit@example.com',
+    'username': 'audit',
+    'token': 'audit',
+    'slug': 'audit',
+    'prefix': 'aud',
+    'course_ids': lambda: [str(ObjectId())],
+}
+
+
+def sample_arguments(finder):
+    """Arguments for the required parameters of a finder, None if one can't be guessed"""
+    arguments = {}
+    for name, parameter in inspect.signature(finder).parameters.items():
+        if parameter.default is not inspect.Parameter.empty or parameter.kind in (
+                inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+            continue
+        if name in SAMPLE_ARGUMENTS:
+            value = SAMPLE_ARGUMENTS[name]
+            arguments[name] = value() if callable(value) else value
+        elif name.endswith('_id'):
+            arguments[name] = str(ObjectId())
+        else:
+            return None
+    return arguments
+
+
+def iter_finders():
+    """(label, bound finder) for every find* classmethod/staticmethod of the models"""
+    for model in iter_models():
+        for name, attribute in vars(model).items():
+            if name.startswith('find') and isinstance(attribute, (classmethod, staticmethod)):
+                yield f'{model.__name__}.{name}', getattr(model, name)
+
+
+def plan_stages(explain):
+    """All plan stage names found in an explain() result"""
+    stages = set()
+    if isinstance(explain, dict):
+        if isinstance(explain.get('stage'), str):
+            stages.add(explain['stage'])
+        for value in explain.values():
+            stages |= plan_stages(value)
+    elif isinstance(explain, list):
+        for value in explain:
+            stages |= plan_stages(value)
+    return stages
+
+
+def explain_command(db, command):
+    """queryPlanner explain of a captured command"""
+    command = {
+        key: value for key, value in command.items()
+        if not key.startswith('$') and key not in ('lsid', 'txnNumber', 'readConcern')
+    }
+    return db.command({'explain': command, 'verbosity': 'queryPlanner'})
+
+
+def audit_finders():
+    """
+    Run every model finder with sample arguments and explain the queries it sends
+    Returns a list of {'finder', 'status', 'queries': [{'collection', 'stages', 'collscan'}], 'error'}
+    with status 'ok', 'collscan', 'skipped' or 'error'
+    """
+    # The listener is only attached to new clients
+    register_event_listener(query_capture_listener)
+    close_mongo_connection()
+    db = get_database()
+
+    report = []
+    for label, finder in iter_finders():
+        arguments = sample_arguments(finder)
+        if arguments is None:
+            report.append({'finder': label, 'status': 'skipped', 'queries': [],
+                           'error': 'no sample value for a required argument'})
+            continue
+
+        captured = []
+        token = capture_queries.set(captured)
+        try:
+            finder(**arguments)
+        except Exception as e:
+            report.append({'finder': label, 'status': 'error', 'queries': [], 'error': str(e)})
+            continue
+        finally:
+            capture_queries.reset(token)
+
+        queries = []
+        try:
+            for command in captured:
+                stages = plan_stages(explain_command(db, command))
+                queries.append({
+                    'collection': command.get(next(iter(command))),
+                    'stages': sorted(stages),
+                    'collscan': 'COLLSCAN' in stages,
+                })
+        except Exception as e:
+            report.append({'finder': label, 'status': 'error', 'queries': queries, 'error': str(e)})
+            continue
+
+        status = 'collscan' if any(query['collscan'] for query in queries) else 'ok'
+        report.append({'finder': label, 'status': status, 'queries': queries, 'error': None})
+    return report
@@ -0,0 +1,57 @@
+"""
+Request-level MongoDB metrics
+Counts the MongoDB commands each request issues (see config.mongodb), adds
+Server-Timing / X-DB-Queries response headers and logs a sample of requests
+plus every request over the query threshold, to spot N+1 patterns.
+"""
+import logging
+import random
+import time
+
+from django.conf import settings
+
+from config.mongodb import RequestCommandStats, current_command_stats
+
+logger = logging.getLogger('smartcampus.db')
+
+DB_METRICS_HEADERS = getattr(settings, 'DB_METRICS_HEADERS', True)
+DB_METRICS_LOG_SAMPLE_RATE = getattr(settings, 'DB_METRICS_LOG_SAMPLE_RATE', 0.01)
+# Requests issuing at least this many commands are always logged
+DB_METRICS_LOG_QUERY_THRESHOLD = getattr(settings, 'DB_METRICS_LOG_QUERY_THRESHOLD', 25)
+
+
+class MongoQueryMetricsMiddleware:
+    """Attributes MongoDB commands to the request and reports them"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestCommandStats()
+        token = current_command_stats.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_command_stats.reset(token)
+
+        total_ms = (time.perf_counter() - stats.started) * 1000
+
+        if DB_METRICS_HEADERS:
+            timings = [f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"']
+            if stats.slowest:
+                timings.append(f'db-slowest;dur={stats.slowest_ms:.1f};desc="{stats.slowest}"')
+            timings.append(f'app;dur={total_ms:.1f}')
+            existing = response.get('Server-Timing')
+            response['Server-Timing'] = ', '.join(([existing] if existing else []) + timings)
+            response['X-DB-Queries'] = str(stats.count)
+
+        if stats.count >= DB_METRICS_LOG_QUERY_THRESHOLD or random.random() < DB_METRICS_LOG_SAMPLE_RATE:
+            top = ', '.join(f'{name} x{count}' for name, count in stats.top_commands())
+            logger.info(
+                '%s %s -> %s | %d queries (%d failed) in %.1fms, slowest %.1fms (%s) | request %.1fms | top: %s',
+                request.method, request.path, response.status_code,
+                stats.count, stats.failed, stats.total_ms, stats.slowest_ms, stats.slowest,
+                total_ms, top
+            )
+
+        return response
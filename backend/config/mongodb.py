@@ -1,28 +1,231 @@
 """
 MongoDB database connection utilities
+One MongoClient per worker process, created lazily on first use and rebuilt
+after a fork (gunicorn/uwsgi preload), with pool options from
+settings.MONGODB_SETTINGS, cached collection handles and pool statistics.
+Commands are attributed to the current request for config.middleware.
 """
-from pymongo import MongoClient
+import contextvars
+import os
+import threading
+import time
+
+from pymongo import MongoClient, monitoring
 from django.conf import settings
 
 _client = None
 _db = None
+_client_pid = None
+_collections = {}
+_lock = threading.Lock()
+
+# MONGODB_SETTINGS key -> MongoClient keyword
+_CLIENT_OPTIONS = {
+    'max_pool_size': 'maxPoolSize',
+    'min_pool_size': 'minPoolSize',
+    'max_idle_time_ms': 'maxIdleTimeMS',
+    'wait_queue_timeout_ms': 'waitQueueTimeoutMS',
+    'connect_timeout_ms': 'connectTimeoutMS',
+    'socket_timeout_ms': 'socketTimeoutMS',
+    'server_selection_timeout_ms': 'serverSelectionTimeoutMS',
+    'compressors': 'compressors',
+    'app_name': 'appname',
+}
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Counts connection pool events for this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {
+                'connections_created': 0,
+                'connections_closed': 0,
+                'checked_out': 0,
+                'checked_in': 0,
+                'checkout_failed': 0,
+                'pool_cleared': 0,
+            }
+
+    def _incr(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._incr('pool_cleared')
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._incr('connections_created')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._incr('connections_closed')
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._incr('checkout_failed')
+
+    def connection_checked_out(self, event):
+        self._incr('checked_out')
+
+    def connection_checked_in(self, event):
+        self._incr('checked_in')
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats['open_connections'] = stats['connections_created'] - stats['connections_closed']
+        stats['in_use'] = stats['checked_out'] - stats['checked_in']
+        return stats
+
+
+pool_stats_listener = PoolStatsListener()
+
+
+class RequestCommandStats:
+    """MongoDB commands issued while serving one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.failed = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest = None
+        self.by_command = {}
+        self.pending = {}
+
+    def record(self, command_name, collection, duration_ms, failed=False):
+        self.count += 1
+        self.total_ms += duration_ms
+        if failed:
+            self.failed += 1
+        key = f'{command_name} {collection}' if collection else command_name
+        if duration_ms > self.slowest_ms:
+            self.slowest_ms = duration_ms
+            self.slowest = key
+        self.by_command[key] = self.by_command.get(key, 0) + 1
+
+    def top_commands(self, limit=5):
+        """Most repeated command/collection pairs - repeated finds point at N+1 loops"""
+        return sorted(self.by_command.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+# Stats of the request being served in the current thread/context (None outside requests)
+current_command_stats = contextvars.ContextVar('current_command_stats', default=None)
+
+
+class CommandStatsListener(monitoring.CommandListener):
+    """Attributes every MongoDB command to the current request's RequestCommandStats"""
+
+    def started(self, event):
+        stats = current_command_stats.get()
+        if stats is None:
+            return
+        # The collection name is only on the started event; keep it for the reply
+        collection = event.command.get(event.command_name)
+        stats.pending[event.request_id] = collection if isinstance(collection, str) else None
+
+    def _record(self, event, failed):
+        stats = current_command_stats.get()
+        if stats is None:
+            return
+        collection = stats.pending.pop(event.request_id, None)
+        stats.record(event.command_name, collection, event.duration_micros / 1000.0, failed=failed)
+
+    def succeeded(self, event):
+        self._record(event, failed=False)
+
+    def failed(self, event):
+        self._record(event, failed=True)
+
+
+command_stats_listener = CommandStatsListener()
+
+# Extra pymongo event listeners registered on every new client
+_event_listeners = [pool_stats_listener]
+if getattr(settings, 'MONGO_COMMAND_MONITORING', True):
+    _event_listeners.append(command_stats_listener)
+
+
+def register_event_listener(listener):
+    """Register a pymongo event listener for clients created from now on"""
+    if listener not in _event_listeners:
+        _event_listeners.append(listener)
+
+
+def get_client_options():
+    """MongoClient keyword arguments built from MONGODB_SETTINGS"""
+    mongo_settings = settings.MONGODB_SETTINGS
+    options = {}
+    for key, option in _CLIENT_OPTIONS.items():
+        value = mongo_settings.get(key)
+        if value in (None, ''):
+            continue
+        if option == 'compressors' and isinstance(value, (list, tuple)):
+            value = ','.join(value)
+        options[option] = value
+    return options
+
+
+def _reset_after_fork():
+    """Drop the parent's client in a forked child; it is rebuilt on first use"""
+    global _client, _db, _client_pid
+    _client = None
+    _db = None
+    _client_pid = None
+    _collections.clear()
+    pool_stats_listener.reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
 
 
 def get_mongo_client():
-    """Get MongoDB client singleton"""
-    global _client
-    if _client is None:
-        print(f"🔌 Connecting to MongoDB: {settings.MONGODB_SETTINGS['host']}")
-        _client = MongoClient(settings.MONGODB_SETTINGS['host'])
-        print(f"✅ MongoDB client connected")
+    """Get MongoDB client for this process"""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            if _client is None or _client_pid != pid:
+                if _client_pid is not None and _client_pid != pid:
+                    # Forked without the at-fork hook: don't reuse the parent's sockets
+                    _reset_after_fork()
+                options = get_client_options()
+                print(f"🔌 Connecting to MongoDB: {settings.MONGODB_SETTINGS['host']} (pid {pid})")
+                _client = MongoClient(
+                    settings.MONGODB_SETTINGS['host'],
+                    event_listeners=list(_event_listeners),
+                    **options
+                )
+                _client_pid = pid
+                print(f"✅ MongoDB client connected")
     return _client
 
 
 def get_database():
-    """Get MongoDB database singleton"""
+    """Get MongoDB database for this process"""
     global _db
+    client = get_mongo_client()
     if _db is None:
-        client = get_mongo_client()
         db_name = settings.MONGODB_SETTINGS['db_name']
         print(f"📂 Using database: {db_name}")
         _db = client[db_name]
@@ -30,16 +233,44 @@ def get_database():
 
 
 def get_collection(collection_name):
-    """Get MongoDB collection"""
-    db = get_database()
-    print(f"📊 Accessing collection: {collection_name}")
-    return db[collection_name]
+    """Get MongoDB collection (handles are cached per process)"""
+    collection = _collections.get(collection_name)
+    if collection is None or _client_pid != os.getpid():
+        collection = get_database()[collection_name]
+        _collections[collection_name] = collection
+    return collection
+
+
+class LazyCollection:
+    """
+    Class attribute that resolves to a collection on access,
+    so models don't open a connection at import time (before workers fork)
+    """
+
+    def __init__(self, collection_name):
+        self.collection_name = collection_name
+
+    def __get__(self, instance, owner):
+        return get_collection(self.collection_name)
+
+
+def get_pool_stats():
+    """Connection pool statistics for this process"""
+    stats = pool_stats_listener.snapshot()
+    stats['pid'] = os.getpid()
+    stats['connected'] = _client is not None and _client_pid == os.getpid()
+    stats['options'] = get_client_options()
+    stats['cached_collections'] = sorted(_collections)
+    return stats
 
 
 def close_mongo_connection():
     """Close MongoDB connection"""
-    global _client, _db
-    if _client is not None:
-        _client.close()
+    global _client, _db, _client_pid
+    with _lock:
+        if _client is not None:
+            _client.close()
         _client = None
         _db = None
+        _client_pid = None
+        _collections.clear()
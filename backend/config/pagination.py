@@ -0,0 +1,103 @@
+"""
+Keyset (cursor) pagination for MongoDB list queries
+Pages are read with a range on (sort field, _id) instead of skip(), so with an
+index ending in those two keys page N costs one index seek, like page 1.
+Clients get an opaque cursor holding the sort value and _id of the last
+document of a page and send it back as ?cursor= to get the next one.
+"""
+import base64
+import binascii
+
+from bson import ObjectId, json_util
+from bson.errors import BSONError
+from django.conf import settings
+from pymongo import DESCENDING
+
+DEFAULT_PAGE_SIZE = getattr(settings, 'PAGINATION_DEFAULT_PAGE_SIZE', 20)
+MAX_PAGE_SIZE = getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 100)
+
+
+class InvalidCursor(ValueError):
+    """Cursor that wasn't issued by encode_cursor"""
+
+
+def encode_cursor(sort_value, document_id):
+    """Opaque cursor for the position after (sort_value, document_id)"""
+    payload = json_util.dumps([sort_value, document_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(sort_value, document_id) of a cursor, raises InvalidCursor"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        position = json_util.loads(payload.decode())
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError, LookupError, BSONError):
+        raise InvalidCursor('Invalid pagination cursor')
+    # Both values end up in a query: no documents/arrays (operators), ids are ObjectIds
+    if not isinstance(position, list) or len(position) != 2:
+        raise InvalidCursor('Invalid pagination cursor')
+    sort_value, document_id = position
+    if not isinstance(document_id, ObjectId) or isinstance(sort_value, (dict, list)):
+        raise InvalidCursor('Invalid pagination cursor')
+    return sort_value, document_id
+
+
+def keyset_filter(sort_field, direction, sort_value, document_id):
+    """
+    Query for the documents after (sort_value, document_id) in (sort_field, _id) order
+    Missing/null sort values sort first ascending and last descending, like MongoDB does.
+    """
+    after = '$lt' if direction == DESCENDING else '$gt'
+    same_value = {sort_field: sort_value, '_id': {after: document_id}}
+    if sort_value is None:
+        if direction == DESCENDING:
+            return same_value
+        return {'$or': [same_value, {sort_field: {'$ne': None}}]}
+
+    branches = [{sort_field: {after: sort_value}}, same_value]
+    if direction == DESCENDING:
+        branches.append({sort_field: None})
+    return {'$or': branches}
+
+
+def paginate(collection, query, sort_field, direction=DESCENDING, limit=DEFAULT_PAGE_SIZE,
+             cursor=None, projection=None):
+    """
+    One page of a query in (sort_field, _id) order
+    Returns (documents, next_cursor); next_cursor is None on the last page.
+    A projection must keep sort_field.
+    """
+    if cursor:
+        keyset = keyset_filter(sort_field, direction, *decode_cursor(cursor))
+        query = {'$and': [query, keyset]} if query else keyset
+
+    # One extra document tells whether there is a next page
+    documents = list(
+        collection.find(query or {}, projection)
+        .sort([(sort_field, direction), ('_id', direction)])
+        .limit(limit + 1)
+    )
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor(last.get(sort_field), last['_id'])
+    return documents, next_cursor
+
+
+def get_page_params(query_params, default_limit=DEFAULT_PAGE_SIZE):
+    """
+    (cursor, limit) from request query params
+    The limit is clamped to 1..MAX_PAGE_SIZE; a malformed cursor raises InvalidCursor.
+    """
+    try:
+        limit = int(query_params.get('limit', default_limit))
+    except (TypeError, ValueError):
+        limit = default_limit
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    cursor = query_params.get('cursor') or None
+    if cursor:
+        decode_cursor(cursor)
+    return cursor, limit
@@ -0,0 +1,156 @@
+"""
+Versioned read-through cache for model finders
+Entries hold the raw documents a finder loaded, tagged with the scope they
+belong to (e.g. one course) and that scope's version when they were stored.
+Bumping a scope's version makes all of its entries stale at once, without
+knowing their keys. Versions are random tokens, so a version that expires or
+is evicted can't make old entries valid again.
+
+Backends (READ_CACHE_BACKEND):
+- 'local': per-process LRU (default); other workers see changes after READ_CACHE_TTL
+- 'django': django.core.cache alias READ_CACHE_ALIAS, shared by all workers
+  with a Redis/Memcached backend
+- 'none': no caching
+"""
+import copy
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from config.local_cache import LocalTTLCache
+
+READ_CACHE_BACKEND = getattr(settings, 'READ_CACHE_BACKEND', 'local')
+READ_CACHE_TTL = getattr(settings, 'READ_CACHE_TTL', 600)
+READ_CACHE_SIZE = getattr(settings, 'READ_CACHE_SIZE', 4096)
+READ_CACHE_ALIAS = getattr(settings, 'READ_CACHE_ALIAS', 'default')
+
+_MISSING = object()
+
+
+class LocalBackend:
+    """Per-process LRU; values are copied in and out since callers mutate model fields"""
+
+    def __init__(self, ttl=READ_CACHE_TTL, max_size=READ_CACHE_SIZE):
+        self.entries = LocalTTLCache(ttl=ttl, max_size=max_size)
+
+    def get(self, key):
+        value = self.entries.get(key)
+        return copy.deepcopy(value) if value is not None else None
+
+    def set(self, key, value):
+        self.entries.set(key, copy.deepcopy(value))
+
+    def add(self, key, value):
+        """Set only if missing"""
+        if self.entries.get(key) is None:
+            self.set(key, value)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class DjangoCacheBackend:
+    """A Django cache alias (values are pickled by the cache backend)"""
+
+    def __init__(self, alias=READ_CACHE_ALIAS, ttl=READ_CACHE_TTL):
+        self.cache = caches[alias]
+        self.ttl = ttl
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache.set(key, value, timeout=self.ttl)
+
+    def add(self, key, value):
+        self.cache.add(key, value, timeout=self.ttl)
+
+    def clear(self):
+        self.cache.clear()
+
+
+class NullBackend:
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def add(self, key, value):
+        pass
+
+    def clear(self):
+        pass
+
+
+BACKENDS = {
+    'local': LocalBackend,
+    'django': DjangoCacheBackend,
+    'none': NullBackend,
+}
+
+
+class VersionedReadCache:
+    """Read-through cache whose entries are invalidated per scope"""
+
+    def __init__(self, backend, prefix='read'):
+        self.backend = backend
+        self.prefix = prefix
+
+    def _version_key(self, scope):
+        return f'{self.prefix}:version:{scope}'
+
+    def version(self, scope):
+        """Current version token of a scope (created on first use)"""
+        version = self.backend.get(self._version_key(scope))
+        if version is None:
+            # add() so concurrent first readers agree on one token
+            self.backend.add(self._version_key(scope), uuid.uuid4().hex)
+            version = self.backend.get(self._version_key(scope))
+        return version
+
+    def bump(self, scope):
+        """Make every entry of a scope stale"""
+        self.backend.set(self._version_key(scope), uuid.uuid4().hex)
+
+    def get(self, key, default=None):
+        entry = self.backend.get(f'{self.prefix}:{key}')
+        if entry is None:
+            return default
+        scope, version, data = entry
+        if version is None or version != self.version(scope):
+            return default
+        return data
+
+    def get_or_load(self, key, loader, scope=None, scope_of=None):
+        """
+        Get cached data or call loader() and cache its result
+        Give scope when it is known before loading (then empty results are
+        cached too); otherwise scope_of(data) derives it from the loaded data
+        and results without a scope are not cached.
+        """
+        data = self.get(key, _MISSING)
+        if data is not _MISSING:
+            return data
+
+        # Read the version before loading, so a bump during the load isn't lost
+        version = self.version(scope) if scope else None
+        data = loader()
+        if not scope:
+            scope = scope_of(data) if (scope_of and data) else None
+            if not scope:
+                return data
+            version = self.version(scope)
+        if version is not None:
+            self.backend.set(f'{self.prefix}:{key}', (scope, version, data))
+        return data
+
+
+def get_backend(name=READ_CACHE_BACKEND):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown READ_CACHE_BACKEND '{name}' (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
+
+
+read_cache = VersionedReadCache(get_backend())
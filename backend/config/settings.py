@@ -56,6 +56,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'config.middleware.MongoQueryMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -143,6 +144,18 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MONGODB_SETTINGS = {
     'host': os.getenv('MONGO_URI', 'mongodb://localhost:27017/'),
     'db_name': os.getenv('MONGO_DB_NAME', 'smartcampus_db'),
+    # Connection pool (per worker process)
+    'max_pool_size': int(os.getenv('MONGO_MAX_POOL_SIZE', 50)),
+    'min_pool_size': int(os.getenv('MONGO_MIN_POOL_SIZE', 0)),
+    'max_idle_time_ms': int(os.getenv('MONGO_MAX_IDLE_TIME_MS', 300000)),
+    'wait_queue_timeout_ms': int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000)),
+    # Timeouts
+    'connect_timeout_ms': int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 5000)),
+    'server_selection_timeout_ms': int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+    'socket_timeout_ms': int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 0)) or None,
+    # Wire compression, e.g. 'zstd,snappy,zlib' (zstd/snappy need extra packages)
+    'compressors': os.getenv('MONGO_COMPRESSORS', ''),
+    'app_name': os.getenv('MONGO_APP_NAME', 'smartcampus-backend'),
 }
 
 # REST Framework Configuration
@@ -185,3 +198,56 @@ EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+
+# Auth user cache (users.auth_cache)
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 60))
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', 2048))
+# Publish invalidations through the Django cache - only useful with a shared cache backend
+AUTH_USER_CACHE_SHARED_INVALIDATION = os.getenv('AUTH_USER_CACHE_SHARED_INVALIDATION', 'False') == 'True'
+
+# Per-process course ownership / enrollment indexes used by courses.permissions
+COURSE_OWNER_CACHE_TTL = int(os.getenv('COURSE_OWNER_CACHE_TTL', 600))
+ENROLLMENT_CACHE_TTL = int(os.getenv('ENROLLMENT_CACHE_TTL', 300))
+# Per-instructor course dashboard cache (courses.views_instructor)
+INSTRUCTOR_DASHBOARD_CACHE_TTL = int(os.getenv('INSTRUCTOR_DASHBOARD_CACHE_TTL', 30))
+# Faceted catalog pages (courses.catalog), dropped on course changes
+CATALOG_CACHE_TTL = int(os.getenv('CATALOG_CACHE_TTL', 300))
+CATALOG_CACHE_SIZE = int(os.getenv('CATALOG_CACHE_SIZE', 512))
+CATALOG_CACHE_SHARED_INVALIDATION = os.getenv('CATALOG_CACHE_SHARED_INVALIDATION', 'False') == 'True'
+# Course structure finders (config.read_cache): 'local', 'django' (shared cache alias) or 'none'
+READ_CACHE_BACKEND = os.getenv('READ_CACHE_BACKEND', 'local')
+READ_CACHE_TTL = int(os.getenv('READ_CACHE_TTL', 600))
+READ_CACHE_SIZE = int(os.getenv('READ_CACHE_SIZE', 4096))
+READ_CACHE_ALIAS = os.getenv('READ_CACHE_ALIAS', 'default')
+
+# Lesson player heartbeats (courses.heartbeats) - buffered and flushed in bulk
+HEARTBEAT_FLUSH_INTERVAL = int(os.getenv('HEARTBEAT_FLUSH_INTERVAL', 10))
+HEARTBEAT_MAX_PENDING = int(os.getenv('HEARTBEAT_MAX_PENDING', 500))
+HEARTBEAT_MAX_DELTA_SECONDS = int(os.getenv('HEARTBEAT_MAX_DELTA_SECONDS', 120))
+HEARTBEAT_MAX_EVENTS = int(os.getenv('HEARTBEAT_MAX_EVENTS', 100))
+
+# Write-behind counters for views/likes/comments (config.counters)
+COUNTER_WRITE_BEHIND = os.getenv('COUNTER_WRITE_BEHIND', 'True') == 'True'
+COUNTER_FLUSH_INTERVAL = int(os.getenv('COUNTER_FLUSH_INTERVAL', 5))
+COUNTER_MAX_PENDING = int(os.getenv('COUNTER_MAX_PENDING', 1000))
+
+# MongoDB per-request metrics (config.middleware)
+MONGO_COMMAND_MONITORING = os.getenv('MONGO_COMMAND_MONITORING', 'True') == 'True'
+DB_METRICS_HEADERS = os.getenv('DB_METRICS_HEADERS', 'True') == 'True'
+DB_METRICS_LOG_SAMPLE_RATE = float(os.getenv('DB_METRICS_LOG_SAMPLE_RATE', 0.01))
+DB_METRICS_LOG_QUERY_THRESHOLD = int(os.getenv('DB_METRICS_LOG_QUERY_THRESHOLD', 25))
+
+# Reference ids (config.ids): match legacy string ids too until manage.py migrate_object_ids has run
+MONGO_LEGACY_STRING_IDS = os.getenv('MONGO_LEGACY_STRING_IDS', 'True') == 'True'
+MONGO_ID_MIGRATION_BATCH_SIZE = int(os.getenv('MONGO_ID_MIGRATION_BATCH_SIZE', 500))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'smartcampus.db': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
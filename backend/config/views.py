@@ -0,0 +1,17 @@
+"""
+Operational API views
+"""
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from config.mongodb import get_pool_stats
+from config.write_buffer import get_buffer_stats
+from users.permissions import IsAdmin
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def mongo_pool_stats(request):
+    """MongoDB connection pool and write buffer statistics for the worker serving this request"""
+    return Response({'mongodb': get_pool_stats(), 'write_buffers': get_buffer_stats()})
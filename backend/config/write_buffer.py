@@ -0,0 +1,141 @@
+"""
+In-process write-behind buffers
+Coalesce frequent small writes in memory and flush them to MongoDB with one
+unordered bulk_write per collection: on a timer, when the buffer holds
+max_pending keys, and at interpreter shutdown.
+Buffered writes are per worker process; a hard crash loses at most one
+flush interval of data, so only use this for counters and telemetry.
+"""
+import atexit
+import os
+import threading
+import time
+
+from config.mongodb import get_collection
+
+_buffers = []
+
+
+class WriteBehindBuffer:
+    """
+    Base buffer keyed by an arbitrary hashable key
+    Subclasses implement merge() and build_operations()
+    """
+
+    def __init__(self, name, flush_interval=10, max_pending=1000):
+        self.name = name
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._timer_pid = None
+        self._timer_lock = threading.Lock()
+        self.flushes = 0
+        self.operations_written = 0
+        self.failed_flushes = 0
+        self.last_flush = None
+        _buffers.append(self)
+
+    def merge(self, current, value):
+        """Combine a new value into the pending value for its key (current may be None)"""
+        raise NotImplementedError
+
+    def build_operations(self, pending):
+        """Turn pending {key: value} into {collection_name: [pymongo write operations]}"""
+        raise NotImplementedError
+
+    def add(self, key, value):
+        """Buffer a value; flushes right away when the buffer is full"""
+        with self._lock:
+            self._pending[key] = self.merge(self._pending.get(key), value)
+            size = len(self._pending)
+        self._ensure_timer()
+        if size >= self.max_pending:
+            self.flush()
+
+    def flush(self):
+        """Write everything pending, returns the number of write operations sent"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        written = 0
+        for collection_name, operations in self.build_operations(pending).items():
+            if not operations:
+                continue
+            try:
+                get_collection(collection_name).bulk_write(operations, ordered=False)
+                written += len(operations)
+            except Exception as e:
+                self.failed_flushes += 1
+                print(f"⚠️ {self.name}: failed to flush {len(operations)} writes to {collection_name}: {str(e)}")
+
+        self.flushes += 1
+        self.operations_written += written
+        self.last_flush = time.time()
+        return written
+
+    def _ensure_timer(self):
+        """Start the flush thread for this process (threads don't survive a fork)"""
+        pid = os.getpid()
+        if self._timer_pid == pid:
+            return
+        with self._timer_lock:
+            if self._timer_pid == pid:
+                return
+            thread = threading.Thread(target=self._run_timer, name=f'{self.name}-flush', daemon=True)
+            thread.start()
+            self._timer_pid = pid
+
+    def _run_timer(self):
+        pid = os.getpid()
+        while self._timer_pid in (None, pid):
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ {self.name}: flush failed: {str(e)}")
+
+    def _reset_after_fork(self):
+        # The parent flushes its own pending writes
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._timer_lock = threading.Lock()
+        self._timer_pid = None
+
+    def stats(self):
+        return {
+            'pending': len(self._pending),
+            'flush_interval': self.flush_interval,
+            'max_pending': self.max_pending,
+            'flushes': self.flushes,
+            'operations_written': self.operations_written,
+            'failed_flushes': self.failed_flushes,
+            'last_flush': self.last_flush,
+        }
+
+
+def flush_all_buffers():
+    """Flush every write-behind buffer in this process"""
+    for buffer in _buffers:
+        try:
+            buffer.flush()
+        except Exception as e:
+            print(f"⚠️ {buffer.name}: flush at shutdown failed: {str(e)}")
+
+
+def get_buffer_stats():
+    """Statistics of the write-behind buffers in this process"""
+    return {buffer.name: buffer.stats() for buffer in _buffers}
+
+
+def _reset_buffers_after_fork():
+    for buffer in _buffers:
+        buffer._reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_buffers_after_fork)
+
+atexit.register(flush_all_buffers)
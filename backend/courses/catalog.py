@@ -0,0 +1,273 @@
+"""
+Faceted course catalog
+One $facet aggregation returns a page of published courses together with
+counts by category, level, language, price band and rating band. Each facet
+is counted with every filter applied except its own, so the counts show what
+choosing another value would return. Responses are cached per normalized
+filter set and dropped whenever a course is created, updated or deleted
+(Course.create/update/delete call invalidate_catalog). With
+CATALOG_CACHE_SHARED_INVALIDATION on, invalidations are also published
+through the Django cache so other workers drop their copies (needs a shared
+cache backend such as Redis or Memcached).
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from pymongo import DESCENDING
+
+from config.local_cache import LocalTTLCache
+from config.pagination import decode_cursor, encode_cursor, keyset_filter
+from courses.search import normalize_text, prefix_filter, search_modes
+
+CATALOG_CACHE_TTL = getattr(settings, 'CATALOG_CACHE_TTL', 300)
+CATALOG_CACHE_SIZE = getattr(settings, 'CATALOG_CACHE_SIZE', 512)
+CATALOG_CACHE_SHARED_INVALIDATION = getattr(settings, 'CATALOG_CACHE_SHARED_INVALIDATION', False)
+
+INVALIDATION_KEY = 'catalog_invalidated'
+
+# name -> (lowest price included, first price excluded); None is unbounded
+PRICE_BANDS = {
+    'free': (None, 0.01),
+    'under_50': (0.01, 50),
+    '50_to_100': (50, 100),
+    '100_plus': (100, None),
+}
+
+# name -> minimum rating (bands overlap: '4' includes every course rated 4.5+)
+RATING_BANDS = {
+    '4.5': 4.5,
+    '4': 4.0,
+    '3.5': 3.5,
+    '3': 3.0,
+}
+
+# Facets grouped on a plain course field
+FIELD_FACETS = ('category', 'level', 'language')
+
+# Course fields whose change invalidates the catalog (enrolled_count and the
+# rating aggregates only go stale for CATALOG_CACHE_TTL)
+CATALOG_FIELDS = {
+    'title', 'description', 'short_description', 'thumbnail', 'category', 'level',
+    'difficulty_level', 'language', 'price', 'discount_price', 'duration_hours',
+    'published', 'is_featured', 'instructor_id',
+}
+
+
+class CatalogCache(LocalTTLCache):
+    """TTL/LRU cache of catalog responses keyed by normalized filter set"""
+
+    def __init__(self, ttl=CATALOG_CACHE_TTL, max_size=CATALOG_CACHE_SIZE,
+                 shared_invalidation=CATALOG_CACHE_SHARED_INVALIDATION):
+        super().__init__(ttl=ttl, max_size=max_size)
+        self.shared_invalidation = shared_invalidation
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        if entry is None:
+            return default
+        stored_at, data = entry
+
+        if self.shared_invalidation:
+            invalidated_at = cache.get(INVALIDATION_KEY)
+            if invalidated_at and invalidated_at >= stored_at:
+                self.discard(key)
+                return default
+
+        return data
+
+    def invalidate(self):
+        """Drop every entry here and, if enabled, signal other workers"""
+        self.clear()
+        if self.shared_invalidation:
+            try:
+                cache.set(INVALIDATION_KEY, time.time(), timeout=self.ttl)
+            except Exception as e:
+                print(f"⚠️ Could not publish catalog cache invalidation: {str(e)}")
+
+
+catalog_cache = CatalogCache()
+
+
+def invalidate_catalog(changed_fields=None):
+    """
+    Invalidate cached catalog pages (called on Course.create/update/delete)
+    With changed_fields, only when one of them is shown or filtered on by the catalog
+    """
+    if changed_fields is None or CATALOG_FIELDS.intersection(changed_fields):
+        catalog_cache.invalidate()
+
+
+def normalize_filters(params):
+    """
+    Catalog filters from query params, with unknown bands and blank values dropped
+    Returns a dict with the keys search, category, level, language, price_band, rating_band
+    """
+    def clean(name):
+        value = (params.get(name) or '').strip()
+        return value or None
+
+    filters = {
+        'search': normalize_text(params.get('search')) or None,
+        'category': clean('category'),
+        # 'difficulty' is the parameter name CourseListView uses
+        'level': clean('level') or clean('difficulty'),
+        'language': clean('language'),
+        'price_band': clean('price_band'),
+        'rating_band': clean('rating_band'),
+    }
+    if filters['price_band'] not in PRICE_BANDS:
+        filters['price_band'] = None
+    if filters['rating_band'] not in RATING_BANDS:
+        filters['rating_band'] = None
+    return filters
+
+
+def cache_key(filters, limit, cursor):
+    """Cache key of a normalized filter set and page"""
+    parts = [f'{name}={value}' for name, value in sorted(filters.items()) if value is not None]
+    parts.append(f'limit={limit}')
+    if cursor:
+        parts.append(f'cursor={cursor}')
+    return '&'.join(parts)
+
+
+def price_range(band):
+    low, high = PRICE_BANDS[band]
+    bounds = {}
+    if low is not None:
+        bounds['$gte'] = low
+    if high is not None:
+        bounds['$lt'] = high
+    return bounds
+
+
+def filter_matches(filters):
+    """{facet name: query condition} for each active facet filter"""
+    matches = {}
+    for field in FIELD_FACETS:
+        if filters[field]:
+            matches[field] = {field: filters[field]}
+    if filters['price_band']:
+        matches['price_band'] = {'price': price_range(filters['price_band'])}
+    if filters['rating_band']:
+        matches['rating_band'] = {'rating': {'$gte': RATING_BANDS[filters['rating_band']]}}
+    return matches
+
+
+def base_match(filters, search_mode=None):
+    """Top-level $match: published courses matching the search (uses the catalog indexes)"""
+    match = {'published': True}
+    search = filters['search']
+    if search_mode == 'prefix':
+        match['title_normalized'] = prefix_filter(search)
+    elif search_mode == 'text':
+        match['$text'] = {'$search': search}
+    return match
+
+
+def combine(conditions):
+    conditions = [condition for condition in conditions if condition]
+    if not conditions:
+        return {}
+    return conditions[0] if len(conditions) == 1 else {'$and': conditions}
+
+
+def price_band_expr():
+    """$switch naming the price band of a course"""
+    branches = []
+    for band, (low, high) in PRICE_BANDS.items():
+        checks = []
+        if low is not None:
+            checks.append({'$gte': [{'$ifNull': ['$price', 0]}, low]})
+        if high is not None:
+            checks.append({'$lt': [{'$ifNull': ['$price', 0]}, high]})
+        branches.append({'case': {'$and': checks}, 'then': band})
+    return {'$switch': {'branches': branches, 'default': None}}
+
+
+def build_pipeline(filters, limit, cursor=None, search_mode=None):
+    """The $facet aggregation for a catalog page (search_mode: 'text', 'prefix' or None)"""
+    matches = filter_matches(filters)
+
+    def match_except(facet):
+        return {'$match': combine([condition for name, condition in matches.items() if name != facet])}
+
+    results_match = combine([
+        combine(list(matches.values())),
+        keyset_filter('created_at', DESCENDING, *decode_cursor(cursor)) if cursor else None,
+    ])
+    facets = {
+        'results': [
+            {'$match': results_match},
+            {'$sort': {'created_at': -1, '_id': -1}},
+            {'$limit': limit + 1},
+        ],
+        'total': [match_except(None), {'$count': 'count'}],
+        'price_band': [
+            match_except('price_band'),
+            {'$group': {'_id': price_band_expr(), 'count': {'$sum': 1}}},
+        ],
+        'rating_band': [
+            match_except('rating_band'),
+            # Band names contain dots, which $group field names can't
+            {'$group': {'_id': None, **{
+                f'band_{index}': {'$sum': {'$cond': [{'$gte': [{'$ifNull': ['$rating', 0]}, minimum]}, 1, 0]}}
+                for index, minimum in enumerate(RATING_BANDS.values())
+            }}},
+        ],
+    }
+    for field in FIELD_FACETS:
+        facets[field] = [
+            match_except(field),
+            {'$group': {'_id': f'${field}', 'count': {'$sum': 1}}},
+            {'$sort': {'count': -1, '_id': 1}},
+        ]
+
+    return [{'$match': base_match(filters, search_mode)}, {'$facet': facets}]
+
+
+def run_catalog_query(filters, limit, cursor=None):
+    """
+    Run the catalog aggregation
+    A word search that matches nothing is re-run as a title prefix search
+    (decided on the total, so every page of a search uses the same mode).
+    Returns {'courses': [course documents], 'next_cursor', 'total', 'facets', 'search_mode'}
+    """
+    from courses.models import Course
+
+    modes = search_modes(filters['search']) or (None,)
+    for search_mode in modes:
+        rows = list(Course.get_collection().aggregate(build_pipeline(filters, limit, cursor, search_mode)))
+        row = rows[0] if rows else {}
+        if (row.get('total') or [{}])[0].get('count', 0):
+            break
+
+    courses = row.get('results', [])
+    next_cursor = None
+    if len(courses) > limit:
+        courses = courses[:limit]
+        next_cursor = encode_cursor(courses[-1].get('created_at'), courses[-1]['_id'])
+
+    facets = {}
+    for field in FIELD_FACETS:
+        facets[field] = [
+            {'value': group['_id'], 'count': group['count']}
+            for group in row.get(field, []) if group['_id'] not in (None, '')
+        ]
+    price_counts = {group['_id']: group['count'] for group in row.get('price_band', [])}
+    facets['price_band'] = [{'value': band, 'count': price_counts.get(band, 0)} for band in PRICE_BANDS]
+    rating_counts = (row.get('rating_band') or [{}])[0]
+    facets['rating_band'] = [
+        {'value': band, 'count': rating_counts.get(f'band_{index}', 0)}
+        for index, band in enumerate(RATING_BANDS)
+    ]
+
+    total = row.get('total') or [{}]
+    return {
+        'courses': courses,
+        'next_cursor': next_cursor,
+        'total': total[0].get('count', 0),
+        'facets': facets,
+        'search_mode': search_mode,
+    }
@@ -0,0 +1,35 @@
+"""
+Cached reads of course structure (course, modules, lessons, quizzes)
+Entries are scoped per course: every create/update/delete of a course or of
+its modules, lessons and quizzes bumps the course's version (see the models),
+so students keep reading the structure from the cache until an instructor
+changes it.
+"""
+from config.read_cache import read_cache
+
+
+def course_scope(course_id):
+    return f'course:{course_id}' if course_id else None
+
+
+def course_scope_of(document):
+    """Scope of a loaded document, or of the first document of a list"""
+    if isinstance(document, list):
+        document = document[0] if document else None
+    return course_scope(document.get('course_id')) if document else None
+
+
+def cached_content(key, loader, course_id=None):
+    """
+    Read-through for a course content finder: loader() returns raw documents
+    Without course_id the scope is taken from the loaded documents' course_id.
+    """
+    return read_cache.get_or_load(
+        key, loader, scope=course_scope(course_id), scope_of=course_scope_of
+    )
+
+
+def invalidate_course_content(course_id):
+    """Drop the cached structure of a course (after any change to it or its content)"""
+    if course_id:
+        read_cache.bump(course_scope(course_id))
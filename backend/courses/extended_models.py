@@ -5,13 +5,22 @@ Submission, Discussion, Comment, Progress
 """
 from datetime import datetime
 from bson import ObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING
 from config.mongodb import get_collection
+from config.ids import to_object_id, id_filter, ids_filter, normalize_ids
+from config.pagination import paginate
+from courses.content_cache import cached_content, invalidate_course_content
+from config.counters import increment_counter
 
 
 class Module:
     """Module model - Grouping of lessons within a course"""
     
     COLLECTION_NAME = 'modules'
+    OBJECT_ID_FIELDS = ('course_id',)
+    INDEXES = [
+        IndexModel([('course_id', ASCENDING), ('order', ASCENDING)]),
+    ]
     
     def __init__(self, **kwargs):
         self.id = kwargs.get('_id')
@@ -34,41 +43,50 @@ class Module:
         collection = cls.get_collection()
         kwargs['created_at'] = datetime.utcnow()
         kwargs['updated_at'] = datetime.utcnow()
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
+        invalidate_course_content(kwargs.get('course_id'))
         return cls(**kwargs)
     
     @classmethod
     def find_by_id(cls, module_id):
-        """Find module by ID"""
+        """Find module by ID (cached per course)"""
         collection = cls.get_collection()
-        if isinstance(module_id, str):
-            module_id = ObjectId(module_id)
-        module_data = collection.find_one({'_id': module_id})
+        object_id = to_object_id(module_id)
+        module_data = cached_content(f'module:{object_id}', lambda: collection.find_one({'_id': object_id}))
         return cls(**module_data) if module_data else None
     
     @classmethod
     def find_by_course(cls, course_id):
-        """Find modules by course"""
+        """Find modules by course (cached per course)"""
         collection = cls.get_collection()
-        # Keep course_id as string since it's stored as string in the database
-        if isinstance(course_id, ObjectId):
-            course_id = str(course_id)
-        modules_data = collection.find({'course_id': course_id}).sort('order', 1)
+        object_id = to_object_id(course_id)
+        modules_data = cached_content(
+            f'modules:{object_id}',
+            lambda: list(collection.find({'course_id': id_filter(object_id)}).sort('order', 1)),
+            course_id=object_id
+        )
         return [cls(**module) for module in modules_data]
     
     def update(self, **kwargs):
         """Update module"""
         collection = self.get_collection()
         kwargs['updated_at'] = datetime.utcnow()
+        normalize_ids(kwargs, self.OBJECT_ID_FIELDS)
         collection.update_one({'_id': self.id}, {'$set': kwargs})
+        invalidate_course_content(self.course_id)
         for key, value in kwargs.items():
             setattr(self, key, value)
+        # Moved to another course
+        if kwargs.get('course_id'):
+            invalidate_course_content(self.course_id)
     
     def delete(self):
         """Delete module"""
         collection = self.get_collection()
         collection.delete_one({'_id': self.id})
+        invalidate_course_content(self.course_id)
     
     def to_dict(self):
         """Convert to dictionary"""
@@ -89,6 +107,12 @@ class Lesson:
     """Lesson model - Multimodal content (video, text, quiz, etc.)"""
     
     COLLECTION_NAME = 'lessons'
+    OBJECT_ID_FIELDS = ('module_id', 'course_id')
+    INDEXES = [
+        IndexModel([('module_id', ASCENDING), ('order', ASCENDING)]),
+        IndexModel([('course_id', ASCENDING), ('order', ASCENDING)]),
+        IndexModel([('course_id', ASCENDING), ('is_published', ASCENDING)]),
+    ]
     
     CONTENT_TYPES = ['video', 'text', 'quiz', 'exercise', 'assignment', 'resource']
     
@@ -115,54 +139,84 @@ class Lesson:
     @classmethod
     def create(cls, **kwargs):
         """Create lesson"""
+        from courses.models import Course
         collection = cls.get_collection()
         kwargs['created_at'] = datetime.utcnow()
         kwargs['updated_at'] = datetime.utcnow()
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
-        return cls(**kwargs)
+        lesson = cls(**kwargs)
+        course_id = lesson.get_course_id()
+        Course.increment_content_counts(
+            course_id, lessons=1, published_lessons=int(bool(lesson.is_published))
+        )
+        invalidate_course_content(course_id)
+        return lesson
     
     @classmethod
     def find_by_id(cls, lesson_id):
-        """Find lesson by ID"""
+        """Find lesson by ID (cached per course)"""
         collection = cls.get_collection()
-        if isinstance(lesson_id, str):
-            lesson_id = ObjectId(lesson_id)
-        lesson_data = collection.find_one({'_id': lesson_id})
+        object_id = to_object_id(lesson_id)
+        lesson_data = cached_content(f'lesson:{object_id}', lambda: collection.find_one({'_id': object_id}))
         return cls(**lesson_data) if lesson_data else None
     
+    def get_course_id(self):
+        """Course of this lesson, from the lesson itself or its module"""
+        if self.course_id:
+            return self.course_id
+        module = Module.find_by_id(str(self.module_id)) if self.module_id else None
+        return module.course_id if module else None
+    
     @classmethod
     def find_by_module(cls, module_id):
-        """Find lessons by module"""
+        """Find lessons by module (cached per course)"""
         collection = cls.get_collection()
-        # Keep module_id as string since it's stored as string in the database
-        if isinstance(module_id, ObjectId):
-            module_id = str(module_id)
-        lessons_data = collection.find({'module_id': module_id}).sort('order', 1)
+        object_id = to_object_id(module_id)
+        module = Module.find_by_id(object_id)
+        lessons_data = cached_content(
+            f'lessons:{object_id}',
+            lambda: list(collection.find({'module_id': id_filter(object_id)}).sort('order', 1)),
+            course_id=module.course_id if module else None
+        )
         return [cls(**lesson) for lesson in lessons_data]
     
     @classmethod
     def find_by_course(cls, course_id):
         """Find all lessons in a course"""
         collection = cls.get_collection()
-        # Keep course_id as string since it's stored as string in the database
-        if isinstance(course_id, ObjectId):
-            course_id = str(course_id)
-        lessons_data = collection.find({'course_id': course_id}).sort('order', 1)
+        lessons_data = collection.find({'course_id': id_filter(course_id)}).sort('order', 1)
         return [cls(**lesson) for lesson in lessons_data]
     
     def update(self, **kwargs):
         """Update lesson"""
+        from courses.models import Course
         collection = self.get_collection()
         kwargs['updated_at'] = datetime.utcnow()
+        was_published = bool(self.is_published)
+        normalize_ids(kwargs, self.OBJECT_ID_FIELDS)
         collection.update_one({'_id': self.id}, {'$set': kwargs})
         for key, value in kwargs.items():
             setattr(self, key, value)
+        course_id = self.get_course_id()
+        if 'is_published' in kwargs and bool(self.is_published) != was_published:
+            Course.increment_content_counts(
+                course_id, published_lessons=1 if self.is_published else -1
+            )
+        invalidate_course_content(course_id)
     
     def delete(self):
         """Delete lesson"""
+        from courses.models import Course
         collection = self.get_collection()
-        collection.delete_one({'_id': self.id})
+        result = collection.delete_one({'_id': self.id})
+        course_id = self.get_course_id()
+        if result.deleted_count:
+            Course.increment_content_counts(
+                course_id, lessons=-1, published_lessons=-int(bool(self.is_published))
+            )
+        invalidate_course_content(course_id)
     
     def to_dict(self):
         """Convert to dictionary"""
@@ -188,6 +242,11 @@ class Quiz:
     """Quiz model - Assessment questionnaire for lessons"""
     
     COLLECTION_NAME = 'quizzes'
+    OBJECT_ID_FIELDS = ('lesson_id', 'course_id', 'instructor_id')
+    INDEXES = [
+        IndexModel([('lesson_id', ASCENDING)]),
+        IndexModel([('course_id', ASCENDING)]),
+    ]
     
     def __init__(self, **kwargs):
         self.id = kwargs.get('_id')
@@ -214,52 +273,71 @@ class Quiz:
     @classmethod
     def create(cls, **kwargs):
         """Create quiz"""
+        from courses.models import Course
         collection = cls.get_collection()
         kwargs['created_at'] = datetime.utcnow()
         kwargs['updated_at'] = datetime.utcnow()
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
+        Course.increment_content_counts(kwargs.get('course_id'), quizzes=1)
+        invalidate_course_content(kwargs.get('course_id'))
         return cls(**kwargs)
     
     @classmethod
     def find_by_id(cls, quiz_id):
         """Find quiz by ID"""
         collection = cls.get_collection()
-        if isinstance(quiz_id, str):
-            quiz_id = ObjectId(quiz_id)
-        quiz_data = collection.find_one({'_id': quiz_id})
+        quiz_data = collection.find_one({'_id': to_object_id(quiz_id)})
         return cls(**quiz_data) if quiz_data else None
     
     @classmethod
     def find_by_lesson(cls, lesson_id):
-        """Find quiz by lesson"""
+        """Find quiz by lesson (cached per course, including 'no quiz')"""
         collection = cls.get_collection()
-        # Keep lesson_id as string since it's stored as string in the database
-        if isinstance(lesson_id, ObjectId):
-            lesson_id = str(lesson_id)
-        quiz_data = collection.find_one({'lesson_id': lesson_id})
+        object_id = to_object_id(lesson_id)
+        lesson = Lesson.find_by_id(object_id)
+        quiz_data = cached_content(
+            f'lesson_quiz:{object_id}',
+            lambda: collection.find_one({'lesson_id': id_filter(object_id)}),
+            course_id=lesson.get_course_id() if lesson else None
+        )
         return cls(**quiz_data) if quiz_data else None
     
+    def get_course_id(self):
+        """Course of this quiz, resolved through its lesson for quizzes saved without one"""
+        if self.course_id and ObjectId.is_valid(str(self.course_id)):
+            return self.course_id
+        lesson = Lesson.find_by_id(str(self.lesson_id)) if self.lesson_id else None
+        return lesson.get_course_id() if lesson else None
+    
     def update(self, **kwargs):
         """Update quiz"""
         collection = self.get_collection()
         kwargs['updated_at'] = datetime.utcnow()
+        normalize_ids(kwargs, self.OBJECT_ID_FIELDS)
         collection.update_one({'_id': self.id}, {'$set': kwargs})
+        invalidate_course_content(self.get_course_id())
         for key, value in kwargs.items():
             setattr(self, key, value)
+        if kwargs.get('course_id'):
+            invalidate_course_content(self.course_id)
     
     def delete(self):
         """Delete quiz"""
+        from courses.models import Course
         collection = self.get_collection()
-        collection.delete_one({'_id': self.id})
+        course_id = self.get_course_id()
+        result = collection.delete_one({'_id': self.id})
+        if result.deleted_count:
+            Course.increment_content_counts(course_id, quizzes=-1)
+        invalidate_course_content(course_id)
     
     @classmethod
     def find_by_course(cls, course_id):
         """Find all quizzes in a course"""
         collection = cls.get_collection()
-        if isinstance(course_id, str):
-            course_id = ObjectId(course_id)
-        quizzes_data = collection.find({'course_id': course_id})
+        quizzes_data = collection.find({'course_id': id_filter(course_id)})
         return [cls(**quiz) for quiz in quizzes_data]
     
     def to_dict(self):
@@ -288,6 +366,11 @@ class ExerciseTemplate:
     """Exercise Template - Pattern for automatic exercise generation"""
     
     COLLECTION_NAME = 'exercise_templates'
+    OBJECT_ID_FIELDS = ('course_id', 'lesson_id')
+    INDEXES = [
+        IndexModel([('lesson_id', ASCENDING)]),
+        IndexModel([('course_id', ASCENDING)]),
+    ]
     
     def __init__(self, **kwargs):
         self.id = kwargs.get('_id')
@@ -316,6 +399,7 @@ class ExerciseTemplate:
         collection = cls.get_collection()
         kwargs['created_at'] = datetime.utcnow()
         kwargs['updated_at'] = datetime.utcnow()
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
         return cls(**kwargs)
@@ -324,18 +408,14 @@ class ExerciseTemplate:
     def find_by_id(cls, template_id):
         """Find template by ID"""
         collection = cls.get_collection()
-        if isinstance(template_id, str):
-            template_id = ObjectId(template_id)
-        template_data = collection.find_one({'_id': template_id})
+        template_data = collection.find_one({'_id': to_object_id(template_id)})
         return cls(**template_data) if template_data else None
     
     @classmethod
     def find_by_lesson(cls, lesson_id):
         """Find templates by lesson"""
         collection = cls.get_collection()
-        if isinstance(lesson_id, str):
-            lesson_id = ObjectId(lesson_id)
-        templates_data = collection.find({'lesson_id': lesson_id})
+        templates_data = collection.find({'lesson_id': id_filter(lesson_id)})
         return [cls(**template) for template in templates_data]
     
     def to_dict(self):
@@ -363,6 +443,11 @@ class GeneratedExercise:
     """Generated Exercise - Unique instance of an exercise from template"""
     
     COLLECTION_NAME = 'generated_exercises'
+    OBJECT_ID_FIELDS = ('template_id', 'student_id', 'course_id')
+    INDEXES = [
+        IndexModel([('student_id', ASCENDING), ('course_id', ASCENDING), ('generated_at', DESCENDING)]),
+        IndexModel([('student_id', ASCENDING), ('generated_at', DESCENDING)]),
+    ]
     
     def __init__(self, **kwargs):
         self.id = kwargs.get('_id')
@@ -392,6 +477,7 @@ class GeneratedExercise:
         collection = cls.get_collection()
         kwargs['generated_at'] = datetime.utcnow()
         kwargs['status'] = 'not_started'
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
         return cls(**kwargs)
@@ -400,19 +486,16 @@ class GeneratedExercise:
     def find_by_student(cls, student_id, course_id=None):
         """Find exercises by student"""
         collection = cls.get_collection()
-        if isinstance(student_id, str):
-            student_id = ObjectId(student_id)
-        query = {'student_id': student_id}
+        query = {'student_id': id_filter(student_id)}
         if course_id:
-            if isinstance(course_id, str):
-                course_id = ObjectId(course_id)
-            query['course_id'] = course_id
+            query['course_id'] = id_filter(course_id)
         exercises_data = collection.find(query).sort('generated_at', -1)
         return [cls(**exercise) for exercise in exercises_data]
     
     def update(self, **kwargs):
         """Update generated exercise"""
         collection = self.get_collection()
+        normalize_ids(kwargs, self.OBJECT_ID_FIELDS)
         collection.update_one({'_id': self.id}, {'$set': kwargs})
         for key, value in kwargs.items():
             setattr(self, key, value)
@@ -443,6 +526,11 @@ class Submission:
     """Submission - Student's submitted work"""
     
     COLLECTION_NAME = 'submissions'
+    OBJECT_ID_FIELDS = ('student_id', 'course_id', 'lesson_id', 'exercise_id')
+    INDEXES = [
+        IndexModel([('student_id', ASCENDING), ('course_id', ASCENDING), ('submitted_at', DESCENDING)]),
+        IndexModel([('student_id', ASCENDING), ('submitted_at', DESCENDING)]),
+    ]
     
     def __init__(self, **kwargs):
         self.id = kwargs.get('_id')
@@ -471,6 +559,7 @@ class Submission:
         collection = cls.get_collection()
         kwargs['submitted_at'] = datetime.utcnow()
         kwargs['status'] = 'submitted'
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
         return cls(**kwargs)
@@ -479,19 +568,16 @@ class Submission:
     def find_by_student(cls, student_id, course_id=None):
         """Find submissions by student"""
         collection = cls.get_collection()
-        if isinstance(student_id, str):
-            student_id = ObjectId(student_id)
-        query = {'student_id': student_id}
+        query = {'student_id': id_filter(student_id)}
         if course_id:
-            if isinstance(course_id, str):
-                course_id = ObjectId(course_id)
-            query['course_id'] = course_id
+            query['course_id'] = id_filter(course_id)
         submissions_data = collection.find(query).sort('submitted_at', -1)
         return [cls(**submission) for submission in submissions_data]
     
     def update(self, **kwargs):
         """Update submission"""
         collection = self.get_collection()
+        normalize_ids(kwargs, self.OBJECT_ID_FIELDS)
         collection.update_one({'_id': self.id}, {'$set': kwargs})
         for key, value in kwargs.items():
             setattr(self, key, value)
@@ -521,6 +607,11 @@ class Discussion:
     """Discussion - Thread for course/lesson discussions"""
     
     COLLECTION_NAME = 'discussions'
+    OBJECT_ID_FIELDS = ('course_id', 'lesson_id', 'author_id')
+    INDEXES = [
+        IndexModel([('course_id', ASCENDING), ('lesson_id', ASCENDING), ('created_at', DESCENDING)]),
+        IndexModel([('course_id', ASCENDING), ('created_at', DESCENDING)]),
+    ]
     
     def __init__(self, **kwargs):
         self.id = kwargs.get('_id')
@@ -549,6 +640,7 @@ class Discussion:
         kwargs['updated_at'] = datetime.utcnow()
         kwargs['views_count'] = 0
         kwargs['comments_count'] = 0
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
         return cls(**kwargs)
@@ -557,13 +649,9 @@ class Discussion:
     def find_by_course(cls, course_id, lesson_id=None):
         """Find discussions by course"""
         collection = cls.get_collection()
-        if isinstance(course_id, str):
-            course_id = ObjectId(course_id)
-        query = {'course_id': course_id}
+        query = {'course_id': id_filter(course_id)}
         if lesson_id:
-            if isinstance(lesson_id, str):
-                lesson_id = ObjectId(lesson_id)
-            query['lesson_id'] = lesson_id
+            query['lesson_id'] = id_filter(lesson_id)
         discussions_data = collection.find(query).sort('created_at', -1)
         return [cls(**discussion) for discussion in discussions_data]
     
@@ -571,6 +659,7 @@ class Discussion:
         """Update discussion"""
         collection = self.get_collection()
         kwargs['updated_at'] = datetime.utcnow()
+        normalize_ids(kwargs, self.OBJECT_ID_FIELDS)
         collection.update_one({'_id': self.id}, {'$set': kwargs})
         for key, value in kwargs.items():
             setattr(self, key, value)
@@ -603,6 +692,10 @@ class Comment:
     """Comment - Message in a discussion thread"""
     
     COLLECTION_NAME = 'comments'
+    OBJECT_ID_FIELDS = ('discussion_id', 'author_id', 'parent_comment_id')
+    INDEXES = [
+        IndexModel([('discussion_id', ASCENDING), ('created_at', ASCENDING)]),
+    ]
     
     def __init__(self, **kwargs):
         self.id = kwargs.get('_id')
@@ -627,15 +720,12 @@ class Comment:
         kwargs['created_at'] = datetime.utcnow()
         kwargs['updated_at'] = datetime.utcnow()
         kwargs['likes_count'] = 0
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
         
         # Increment comments count in discussion
-        discussions_collection = get_collection('discussions')
-        discussions_collection.update_one(
-            {'_id': ObjectId(kwargs['discussion_id']) if isinstance(kwargs['discussion_id'], str) else kwargs['discussion_id']},
-            {'$inc': {'comments_count': 1}}
-        )
+        increment_counter(Discussion.COLLECTION_NAME, kwargs['discussion_id'], 'comments_count')
         
         return cls(**kwargs)
     
@@ -643,15 +733,14 @@ class Comment:
     def find_by_discussion(cls, discussion_id):
         """Find comments by discussion"""
         collection = cls.get_collection()
-        if isinstance(discussion_id, str):
-            discussion_id = ObjectId(discussion_id)
-        comments_data = collection.find({'discussion_id': discussion_id}).sort('created_at', 1)
+        comments_data = collection.find({'discussion_id': id_filter(discussion_id)}).sort('created_at', 1)
         return [cls(**comment) for comment in comments_data]
     
     def update(self, **kwargs):
         """Update comment"""
         collection = self.get_collection()
         kwargs['updated_at'] = datetime.utcnow()
+        normalize_ids(kwargs, self.OBJECT_ID_FIELDS)
         collection.update_one({'_id': self.id}, {'$set': kwargs})
         for key, value in kwargs.items():
             setattr(self, key, value)
@@ -662,11 +751,7 @@ class Comment:
         collection.delete_one({'_id': self.id})
         
         # Decrement comments count in discussion
-        discussions_collection = get_collection('discussions')
-        discussions_collection.update_one(
-            {'_id': self.discussion_id},
-            {'$inc': {'comments_count': -1}}
-        )
+        increment_counter(Discussion.COLLECTION_NAME, self.discussion_id, 'comments_count', -1)
     
     def to_dict(self):
         """Convert to dictionary"""
@@ -688,6 +773,11 @@ class Progress:
     """Progress - Track student progress in courses"""
     
     COLLECTION_NAME = 'progress'
+    OBJECT_ID_FIELDS = ('student_id', 'course_id', 'lesson_id')
+    INDEXES = [
+        IndexModel([('student_id', ASCENDING), ('lesson_id', ASCENDING)], unique=True),
+        IndexModel([('student_id', ASCENDING), ('course_id', ASCENDING)]),
+    ]
     
     def __init__(self, **kwargs):
         self.id = kwargs.get('_id')
@@ -698,6 +788,8 @@ class Progress:
         self.completed_at = kwargs.get('completed_at')
         self.time_spent_minutes = kwargs.get('time_spent_minutes', 0)
         self.last_position = kwargs.get('last_position', 0)  # For video timestamp
+        self.furthest_position = kwargs.get('furthest_position', 0)
+        self.time_spent_seconds = kwargs.get('time_spent_seconds', 0)  # From player heartbeats
         self.notes = kwargs.get('notes', '')
         self.bookmarked = kwargs.get('bookmarked', False)
         self.created_at = kwargs.get('created_at', datetime.utcnow())
@@ -713,6 +805,7 @@ class Progress:
         collection = cls.get_collection()
         kwargs['created_at'] = datetime.utcnow()
         kwargs['updated_at'] = datetime.utcnow()
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
         return cls(**kwargs)
@@ -721,13 +814,9 @@ class Progress:
     def find_one(cls, student_id, lesson_id):
         """Find progress for a specific student and lesson"""
         collection = cls.get_collection()
-        if isinstance(student_id, str):
-            student_id = ObjectId(student_id)
-        if isinstance(lesson_id, str):
-            lesson_id = ObjectId(lesson_id)
         progress_data = collection.find_one({
-            'student_id': student_id,
-            'lesson_id': lesson_id
+            'student_id': id_filter(student_id),
+            'lesson_id': id_filter(lesson_id)
         })
         return cls(**progress_data) if progress_data else None
     
@@ -735,13 +824,9 @@ class Progress:
     def find_by_student_course(cls, student_id, course_id):
         """Find all progress for a student in a course"""
         collection = cls.get_collection()
-        if isinstance(student_id, str):
-            student_id = ObjectId(student_id)
-        if isinstance(course_id, str):
-            course_id = ObjectId(course_id)
         progress_data = collection.find({
-            'student_id': student_id,
-            'course_id': course_id
+            'student_id': id_filter(student_id),
+            'course_id': id_filter(course_id)
         })
         return [cls(**progress) for progress in progress_data]
     
@@ -749,6 +834,7 @@ class Progress:
         """Update progress"""
         collection = self.get_collection()
         kwargs['updated_at'] = datetime.utcnow()
+        normalize_ids(kwargs, self.OBJECT_ID_FIELDS)
         collection.update_one({'_id': self.id}, {'$set': kwargs})
         for key, value in kwargs.items():
             setattr(self, key, value)
@@ -764,6 +850,8 @@ class Progress:
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
             'time_spent_minutes': self.time_spent_minutes,
             'last_position': self.last_position,
+            'furthest_position': self.furthest_position,
+            'time_spent_seconds': self.time_spent_seconds,
             'notes': self.notes,
             'bookmarked': self.bookmarked,
             'created_at': self.created_at.isoformat() if self.created_at else None,
@@ -775,6 +863,12 @@ class QuizAttempt:
     """QuizAttempt - Track student attempts at quizzes"""
     
     COLLECTION_NAME = 'quiz_attempts'
+    OBJECT_ID_FIELDS = ('quiz_id', 'student_id', 'course_id', 'lesson_id')
+    INDEXES = [
+        IndexModel([('student_id', ASCENDING), ('quiz_id', ASCENDING), ('started_at', DESCENDING)]),
+        IndexModel([('quiz_id', ASCENDING), ('completed_at', DESCENDING), ('_id', DESCENDING)]),
+        IndexModel([('student_id', ASCENDING), ('course_id', ASCENDING)]),
+    ]
     
     def __init__(self, **kwargs):
         self.id = kwargs.get('_id')
@@ -800,6 +894,7 @@ class QuizAttempt:
         """Create quiz attempt"""
         collection = cls.get_collection()
         kwargs['started_at'] = datetime.utcnow()
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
         return cls(**kwargs)
@@ -808,22 +903,16 @@ class QuizAttempt:
     def find_by_id(cls, attempt_id):
         """Find attempt by ID"""
         collection = cls.get_collection()
-        if isinstance(attempt_id, str):
-            attempt_id = ObjectId(attempt_id)
-        attempt_data = collection.find_one({'_id': attempt_id})
+        attempt_data = collection.find_one({'_id': to_object_id(attempt_id)})
         return cls(**attempt_data) if attempt_data else None
     
     @classmethod
     def find_by_student_quiz(cls, student_id, quiz_id):
         """Find all attempts by a student for a specific quiz"""
         collection = cls.get_collection()
-        if isinstance(student_id, str):
-            student_id = ObjectId(student_id)
-        if isinstance(quiz_id, str):
-            quiz_id = ObjectId(quiz_id)
         attempts_data = collection.find({
-            'student_id': student_id,
-            'quiz_id': quiz_id
+            'student_id': id_filter(student_id),
+            'quiz_id': id_filter(quiz_id)
         }).sort('started_at', -1)
         return [cls(**attempt) for attempt in attempts_data]
     
@@ -831,14 +920,67 @@ class QuizAttempt:
     def find_by_quiz(cls, quiz_id):
         """Find all attempts for a quiz"""
         collection = cls.get_collection()
-        if isinstance(quiz_id, str):
-            quiz_id = ObjectId(quiz_id)
-        attempts_data = collection.find({'quiz_id': quiz_id}).sort('completed_at', -1)
+        attempts_data = collection.find({'quiz_id': id_filter(quiz_id)}).sort('completed_at', -1)
         return [cls(**attempt) for attempt in attempts_data]
     
+    @classmethod
+    def find_page_by_quiz(cls, quiz_id, limit=50, cursor=None):
+        """One page of a quiz's attempts, latest completed first: (attempts, next_cursor)"""
+        attempts_data, next_cursor = paginate(
+            cls.get_collection(), {'quiz_id': id_filter(quiz_id)}, 'completed_at', DESCENDING, limit, cursor
+        )
+        return [cls(**attempt) for attempt in attempts_data], next_cursor
+    
+    @classmethod
+    def get_quiz_stats(cls, quiz_id):
+        """
+        Statistics over all attempts of a quiz, computed in the database
+        Average score and pass rate are over completed attempts
+        """
+        completed = {'$ifNull': ['$completed_at', False]}
+        totals = {
+            'attempts': {'$sum': '$attempts'},
+            'completed': {'$sum': '$completed'},
+            'score_sum': {'$sum': '$score_sum'},
+            'passed': {'$sum': '$passed'},
+        }
+        rows = list(cls.get_collection().aggregate([
+            {'$match': {'quiz_id': id_filter(quiz_id)}},
+            {'$group': {
+                '_id': {'$toString': '$student_id'},
+                'attempts': {'$sum': 1},
+                'completed': {'$sum': {'$cond': [completed, 1, 0]}},
+                'score_sum': {'$sum': {'$cond': [completed, '$percentage', 0]}},
+                'passed': {'$sum': {'$cond': [{'$and': [completed, '$passed']}, 1, 0]}},
+            }},
+            {'$group': {'_id': None, 'students': {'$sum': 1}, **totals}},
+        ]))
+        stats = rows[0] if rows else {'students': 0, 'attempts': 0, 'completed': 0, 'score_sum': 0, 'passed': 0}
+        completed_count = stats['completed']
+        return {
+            'total_attempts': stats['attempts'],
+            'unique_students': stats['students'],
+            'average_score': stats['score_sum'] / completed_count if completed_count else 0,
+            'pass_rate': stats['passed'] / completed_count * 100 if completed_count else 0,
+        }
+    
+    @classmethod
+    def get_student_bests(cls, quiz_id, student_ids):
+        """{student_id (str): {'best_score', 'validated'}} over all their attempts at a quiz"""
+        rows = cls.get_collection().aggregate([
+            {'$match': {'quiz_id': id_filter(quiz_id), 'student_id': ids_filter(student_ids)}},
+            {'$group': {
+                '_id': {'$toString': '$student_id'},
+                'best_score': {'$max': '$percentage'},
+                'validated': {'$max': {'$cond': ['$passed', True, False]}},
+            }},
+        ])
+        return {row['_id']: {'best_score': row['best_score'] or 0, 'validated': row['validated']} for row in rows}
+    
     def update(self, **kwargs):
         """Update quiz attempt"""
         collection = self.get_collection()
+        normalize_ids(kwargs, self.OBJECT_ID_FIELDS)
         collection.update_one({'_id': self.id}, {'$set': kwargs})
         for key, value in kwargs.items():
             setattr(self, key, value)
@@ -866,6 +1008,10 @@ class Assignment:
     """Assignment - Practical homework for courses"""
     
     COLLECTION_NAME = 'assignments'
+    OBJECT_ID_FIELDS = ('course_id', 'lesson_id', 'instructor_id')
+    INDEXES = [
+        IndexModel([('course_id', ASCENDING), ('created_at', DESCENDING)]),
+    ]
     
     ASSIGNMENT_TYPES = ['coding', 'written', 'mixed']
     
@@ -895,43 +1041,46 @@ class Assignment:
     @classmethod
     def create(cls, **kwargs):
         """Create assignment"""
+        from courses.models import Course
         collection = cls.get_collection()
         kwargs['created_at'] = datetime.utcnow()
         kwargs['updated_at'] = datetime.utcnow()
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
+        Course.increment_content_counts(kwargs.get('course_id'), assignments=1)
         return cls(**kwargs)
     
     @classmethod
     def find_by_id(cls, assignment_id):
         """Find assignment by ID"""
         collection = cls.get_collection()
-        if isinstance(assignment_id, str):
-            assignment_id = ObjectId(assignment_id)
-        assignment_data = collection.find_one({'_id': assignment_id})
+        assignment_data = collection.find_one({'_id': to_object_id(assignment_id)})
         return cls(**assignment_data) if assignment_data else None
     
     @classmethod
     def find_by_course(cls, course_id):
         """Find assignments by course"""
         collection = cls.get_collection()
-        if isinstance(course_id, str):
-            course_id = ObjectId(course_id)
-        assignments_data = collection.find({'course_id': course_id}).sort('created_at', -1)
+        assignments_data = collection.find({'course_id': id_filter(course_id)}).sort('created_at', -1)
         return [cls(**assignment) for assignment in assignments_data]
     
     def update(self, **kwargs):
         """Update assignment"""
         collection = self.get_collection()
         kwargs['updated_at'] = datetime.utcnow()
+        normalize_ids(kwargs, self.OBJECT_ID_FIELDS)
         collection.update_one({'_id': self.id}, {'$set': kwargs})
         for key, value in kwargs.items():
             setattr(self, key, value)
     
     def delete(self):
         """Delete assignment"""
+        from courses.models import Course
         collection = self.get_collection()
-        collection.delete_one({'_id': self.id})
+        result = collection.delete_one({'_id': self.id})
+        if result.deleted_count:
+            Course.increment_content_counts(self.course_id, assignments=-1)
     
     def to_dict(self):
         """Convert to dictionary"""
@@ -960,6 +1109,12 @@ class AssignmentSubmission:
     """AssignmentSubmission - Track student assignment submissions"""
     
     COLLECTION_NAME = 'assignment_submissions'
+    OBJECT_ID_FIELDS = ('assignment_id', 'student_id', 'course_id', 'graded_by')
+    INDEXES = [
+        IndexModel([('student_id', ASCENDING), ('assignment_id', ASCENDING), ('started_at', DESCENDING)]),
+        IndexModel([('assignment_id', ASCENDING), ('submitted_at', DESCENDING), ('_id', DESCENDING)]),
+        IndexModel([('student_id', ASCENDING), ('status', ASCENDING)]),
+    ]
     
     def __init__(self, **kwargs):
         self.id = kwargs.get('_id')
@@ -993,6 +1148,7 @@ class AssignmentSubmission:
         collection = cls.get_collection()
         kwargs['started_at'] = datetime.utcnow()
         kwargs['status'] = 'submitted'
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
         return cls(**kwargs)
@@ -1001,22 +1157,16 @@ class AssignmentSubmission:
     def find_by_id(cls, submission_id):
         """Find submission by ID"""
         collection = cls.get_collection()
-        if isinstance(submission_id, str):
-            submission_id = ObjectId(submission_id)
-        submission_data = collection.find_one({'_id': submission_id})
+        submission_data = collection.find_one({'_id': to_object_id(submission_id)})
         return cls(**submission_data) if submission_data else None
     
     @classmethod
     def find_by_student_assignment(cls, student_id, assignment_id):
         """Find all submissions by a student for a specific assignment"""
         collection = cls.get_collection()
-        if isinstance(student_id, str):
-            student_id = ObjectId(student_id)
-        if isinstance(assignment_id, str):
-            assignment_id = ObjectId(assignment_id)
         submissions_data = collection.find({
-            'student_id': student_id,
-            'assignment_id': assignment_id
+            'student_id': id_filter(student_id),
+            'assignment_id': id_filter(assignment_id)
         }).sort('started_at', -1)
         return [cls(**submission) for submission in submissions_data]
     
@@ -1024,14 +1174,75 @@ class AssignmentSubmission:
     def find_by_assignment(cls, assignment_id):
         """Find all submissions for an assignment"""
         collection = cls.get_collection()
-        if isinstance(assignment_id, str):
-            assignment_id = ObjectId(assignment_id)
-        submissions_data = collection.find({'assignment_id': assignment_id}).sort('submitted_at', -1)
+        submissions_data = collection.find({'assignment_id': id_filter(assignment_id)}).sort('submitted_at', -1)
         return [cls(**submission) for submission in submissions_data]
     
+    @classmethod
+    def find_page_by_assignment(cls, assignment_id, limit=50, cursor=None):
+        """One page of an assignment's submissions, latest first: (submissions, next_cursor)"""
+        submissions_data, next_cursor = paginate(
+            cls.get_collection(), {'assignment_id': id_filter(assignment_id)},
+            'submitted_at', DESCENDING, limit, cursor
+        )
+        return [cls(**submission) for submission in submissions_data], next_cursor
+    
+    @classmethod
+    def get_assignment_stats(cls, assignment_id):
+        """
+        Statistics over all submissions of an assignment, computed in the database
+        Average score and pass rate are over graded submissions
+        """
+        graded = {'$eq': ['$status', 'graded']}
+        totals = {
+            'submissions': {'$sum': '$submissions'},
+            'graded': {'$sum': '$graded'},
+            'pending': {'$sum': '$pending'},
+            'score_sum': {'$sum': '$score_sum'},
+            'passed': {'$sum': '$passed'},
+        }
+        rows = list(cls.get_collection().aggregate([
+            {'$match': {'assignment_id': id_filter(assignment_id)}},
+            {'$group': {
+                '_id': {'$toString': '$student_id'},
+                'submissions': {'$sum': 1},
+                'graded': {'$sum': {'$cond': [graded, 1, 0]}},
+                'pending': {'$sum': {'$cond': [{'$eq': ['$status', 'submitted']}, 1, 0]}},
+                'score_sum': {'$sum': {'$cond': [graded, '$percentage', 0]}},
+                'passed': {'$sum': {'$cond': [{'$and': [graded, '$passed']}, 1, 0]}},
+            }},
+            {'$group': {'_id': None, 'students': {'$sum': 1}, **totals}},
+        ]))
+        stats = rows[0] if rows else {
+            'students': 0, 'submissions': 0, 'graded': 0, 'pending': 0, 'score_sum': 0, 'passed': 0
+        }
+        graded_count = stats['graded']
+        return {
+            'total_submissions': stats['submissions'],
+            'unique_students': stats['students'],
+            'graded_count': graded_count,
+            'pending_count': stats['pending'],
+            'average_score': stats['score_sum'] / graded_count if graded_count else 0,
+            'pass_rate': stats['passed'] / graded_count * 100 if graded_count else 0,
+        }
+    
+    @classmethod
+    def get_student_bests(cls, assignment_id, student_ids):
+        """{student_id (str): {'best_score', 'validated'}} over their graded submissions"""
+        graded = {'$eq': ['$status', 'graded']}
+        rows = cls.get_collection().aggregate([
+            {'$match': {'assignment_id': id_filter(assignment_id), 'student_id': ids_filter(student_ids)}},
+            {'$group': {
+                '_id': {'$toString': '$student_id'},
+                'best_score': {'$max': {'$cond': [graded, '$percentage', 0]}},
+                'validated': {'$max': {'$cond': [{'$and': [graded, '$passed']}, True, False]}},
+            }},
+        ])
+        return {row['_id']: {'best_score': row['best_score'] or 0, 'validated': row['validated']} for row in rows}
+    
     def update(self, **kwargs):
         """Update assignment submission"""
         collection = self.get_collection()
+        normalize_ids(kwargs, self.OBJECT_ID_FIELDS)
         collection.update_one({'_id': self.id}, {'$set': kwargs})
         for key, value in kwargs.items():
             setattr(self, key, value)
@@ -0,0 +1,191 @@
+"""
+Learning heartbeats from the lesson player
+Events (lesson, seconds watched/read, video position) are coalesced per
+(student, lesson) and flushed in bulk:
+- progress (per lesson): $inc time_spent_seconds, last/furthest video position
+- student_progress (per course): $inc time_spent_minutes, $max last_accessed;
+  created (empty, 0%) when the student has no record for the course yet
+- student_summaries (per course entry): same, see courses.summaries
+"""
+from datetime import datetime
+
+from bson import ObjectId
+from django.conf import settings
+from pymongo import UpdateOne
+
+from config.ids import id_filter
+from config.local_cache import LocalTTLCache
+from config.write_buffer import WriteBehindBuffer
+from courses.extended_models import Lesson, Module, Progress
+from courses.models import Enrollment
+from courses.summaries import StudentSummary
+
+HEARTBEAT_FLUSH_INTERVAL = getattr(settings, 'HEARTBEAT_FLUSH_INTERVAL', 10)
+HEARTBEAT_MAX_PENDING = getattr(settings, 'HEARTBEAT_MAX_PENDING', 500)
+# Upper bound for the seconds a single event can add
+HEARTBEAT_MAX_DELTA_SECONDS = getattr(settings, 'HEARTBEAT_MAX_DELTA_SECONDS', 120)
+HEARTBEAT_MAX_EVENTS = getattr(settings, 'HEARTBEAT_MAX_EVENTS', 100)
+
+# lesson_id -> course_id (lessons don't move between courses)
+lesson_course_index = LocalTTLCache(ttl=3600, max_size=8192)
+
+
+def get_lesson_course_ids(lesson_ids):
+    """
+    Map lesson ids to their course ids, loading unknown lessons with one query
+    (plus one for the modules of lessons that only reference their course through it)
+    """
+    result = {}
+    missing = []
+    for lesson_id in lesson_ids:
+        course_id = lesson_course_index.get(lesson_id)
+        if course_id:
+            result[lesson_id] = course_id
+        else:
+            missing.append(ObjectId(lesson_id))
+
+    if missing:
+        lesson_modules = {}
+        cursor = Lesson.get_collection().find({'_id': {'$in': missing}}, {'course_id': 1, 'module_id': 1})
+        for lesson in cursor:
+            course_id = lesson.get('course_id')
+            if course_id and ObjectId.is_valid(str(course_id)):
+                lesson_course_index.set(str(lesson['_id']), str(course_id))
+                result[str(lesson['_id'])] = str(course_id)
+            elif lesson.get('module_id') and ObjectId.is_valid(str(lesson['module_id'])):
+                lesson_modules[str(lesson['_id'])] = str(lesson['module_id'])
+
+        if lesson_modules:
+            cursor = Module.get_collection().find(
+                {'_id': {'$in': [ObjectId(module_id) for module_id in set(lesson_modules.values())]}},
+                {'course_id': 1}
+            )
+            module_courses = {
+                str(module['_id']): str(module['course_id'])
+                for module in cursor
+                if module.get('course_id') and ObjectId.is_valid(str(module['course_id']))
+            }
+            for lesson_id, module_id in lesson_modules.items():
+                course_id = module_courses.get(module_id)
+                if course_id:
+                    lesson_course_index.set(lesson_id, course_id)
+                    result[lesson_id] = course_id
+    return result
+
+
+def get_enrollment_ids(pairs):
+    """Map (student_id, course_id) pairs to enrollment ids with one query"""
+    if not pairs:
+        return {}
+    cursor = Enrollment.get_collection().find(
+        {'$or': [
+            {'student_id': id_filter(student_id), 'course_id': id_filter(course_id)}
+            for student_id, course_id in pairs
+        ]},
+        {'student_id': 1, 'course_id': 1}
+    )
+    return {
+        (str(enrollment['student_id']), str(enrollment['course_id'])): enrollment['_id']
+        for enrollment in cursor
+    }
+
+
+class HeartbeatBuffer(WriteBehindBuffer):
+    """Buffers heartbeats keyed by (student_id, lesson_id)"""
+
+    def merge(self, current, event):
+        if current is None:
+            return dict(event, max_position=event['position'])
+        current['seconds'] += event['seconds']
+        current['last_seen'] = max(current['last_seen'], event['last_seen'])
+        if event['position'] is not None:
+            current['position'] = event['position']
+            current['max_position'] = max(current['max_position'] or 0, event['position'])
+        return current
+
+    def build_operations(self, pending):
+        now = datetime.utcnow()
+        lesson_ops = []
+        course_totals = {}
+
+        for (student_id, lesson_id), entry in pending.items():
+            update = {
+                '$inc': {'time_spent_seconds': entry['seconds']},
+                '$max': {'updated_at': entry['last_seen']},
+                '$setOnInsert': {
+                    'course_id': ObjectId(entry['course_id']),
+                    'completed': False,
+                    'created_at': now,
+                },
+            }
+            if entry['position'] is not None:
+                update['$set'] = {'last_position': entry['position']}
+                update['$max']['furthest_position'] = entry['max_position']
+            lesson_ops.append(UpdateOne(
+                {'student_id': ObjectId(student_id), 'lesson_id': ObjectId(lesson_id)},
+                update,
+                upsert=True
+            ))
+
+            seconds, last_seen = course_totals.get((student_id, entry['course_id']), (0, entry['last_seen']))
+            course_totals[(student_id, entry['course_id'])] = (
+                seconds + entry['seconds'], max(last_seen, entry['last_seen'])
+            )
+
+        # Time spent before the first lesson completion creates the course-level
+        # record (the same shape StudentProgress.record_lesson_completion creates)
+        course_totals = {key: totals for key, totals in course_totals.items() if totals[0]}
+        try:
+            enrollment_ids = get_enrollment_ids(list(course_totals))
+        except Exception as e:
+            print(f"⚠️ Could not load enrollments for heartbeat flush: {str(e)}")
+            enrollment_ids = {}
+
+        course_ops = []
+        for (student_id, course_id), (seconds, last_seen) in course_totals.items():
+            update = {
+                '$inc': {'time_spent_minutes': round(seconds / 60, 2)},
+                '$max': {'last_accessed': last_seen, 'updated_at': last_seen},
+            }
+            enrollment_id = enrollment_ids.get((student_id, course_id))
+            if enrollment_id:
+                update['$setOnInsert'] = {
+                    'enrollment_id': enrollment_id,
+                    'lessons_completed': [],
+                    'quizzes_completed': [],
+                    'assignments_completed': [],
+                    'completion_percentage': 0.0,
+                    'created_at': now,
+                }
+            course_ops.append(UpdateOne(
+                {'student_id': ObjectId(student_id), 'course_id': ObjectId(course_id)},
+                update,
+                upsert=bool(enrollment_id)
+            ))
+        summary_ops = [
+            StudentSummary.time_spent_operation(student_id, course_id, round(seconds / 60, 2), last_seen)
+            for (student_id, course_id), (seconds, last_seen) in course_totals.items()
+        ]
+
+        return {
+            Progress.COLLECTION_NAME: lesson_ops,
+            'student_progress': course_ops,
+            'student_summaries': summary_ops,
+        }
+
+
+heartbeat_buffer = HeartbeatBuffer(
+    'heartbeats',
+    flush_interval=HEARTBEAT_FLUSH_INTERVAL,
+    max_pending=HEARTBEAT_MAX_PENDING
+)
+
+
+def record_heartbeat(student_id, lesson_id, course_id, seconds, position=None):
+    """Buffer one heartbeat"""
+    heartbeat_buffer.add((str(student_id), str(lesson_id)), {
+        'course_id': str(course_id),
+        'seconds': seconds,
+        'position': position,
+        'last_seen': datetime.utcnow(),
+    })
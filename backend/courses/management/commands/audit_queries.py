@@ -0,0 +1,47 @@
+"""
+Management command to explain every model finder (find* methods) with
+sample arguments and report the queries that scan a whole collection
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from config.indexes import audit_finders
+
+
+class Command(BaseCommand):
+    help = 'Explain the queries of every model finder and report COLLSCANs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Show the plan stages of every query, not only collection scans'
+        )
+        parser.add_argument(
+            '--fail-on-collscan', action='store_true',
+            help='Exit with an error if a finder scans a collection (for CI)'
+        )
+
+    def handle(self, *args, **options):
+        report = audit_finders()
+
+        for entry in report:
+            if entry['status'] == 'collscan':
+                self.stdout.write(self.style.ERROR(f"❌ {entry['finder']}: COLLSCAN"))
+            elif entry['status'] == 'ok':
+                self.stdout.write(self.style.SUCCESS(f"✅ {entry['finder']}"))
+            else:
+                self.stdout.write(self.style.WARNING(f"⚠️  {entry['finder']}: {entry['status']} - {entry['error']}"))
+
+            for query in entry['queries']:
+                if query['collscan'] or options['verbose_plans']:
+                    self.stdout.write(f"   {query['collection']}: {', '.join(query['stages'])}")
+
+        counts = {}
+        for entry in report:
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        self.stdout.write(self.style.SUCCESS(
+            f"\n📊 {len(report)} finders: {counts.get('ok', 0)} indexed, {counts.get('collscan', 0)} COLLSCAN, "
+            f"{counts.get('skipped', 0)} skipped, {counts.get('error', 0)} errors"
+        ))
+
+        if options['fail_on_collscan'] and counts.get('collscan'):
+            raise CommandError(f"{counts['collscan']} finders scan a whole collection")
@@ -0,0 +1,59 @@
+"""
+Management command to sync the MongoDB indexes declared on the model
+classes (INDEXES, see config.indexes) for users, courses and blog
+"""
+from django.core.management.base import BaseCommand
+
+from config.indexes import get_index_registry, sync_indexes
+
+
+class Command(BaseCommand):
+    help = 'Create missing declared indexes (and optionally drop undeclared ones)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--collection', action='append', dest='collections',
+            help='Only sync this collection (can be repeated)'
+        )
+        parser.add_argument(
+            '--prune', action='store_true',
+            help='Drop indexes that no model declares'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Show what would change without writing'
+        )
+
+    def handle(self, *args, **options):
+        registry = get_index_registry()
+        collections = options['collections'] or sorted(registry)
+        prefix = '(dry run) ' if options['dry_run'] else ''
+
+        totals = {'created': 0, 'existing': 0, 'dropped': 0, 'errors': 0}
+        for collection_name in collections:
+            if collection_name not in registry:
+                self.stdout.write(self.style.WARNING(f'⚠️  No model declares indexes for {collection_name}'))
+                continue
+            try:
+                result = sync_indexes(
+                    collection_name, registry[collection_name],
+                    prune=options['prune'], dry_run=options['dry_run']
+                )
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'❌ Error syncing {collection_name}: {str(e)}'))
+                totals['errors'] += 1
+                continue
+
+            for name in result['created']:
+                self.stdout.write(self.style.SUCCESS(f'✅ {prefix}{collection_name}: created {name}'))
+            for name in result['dropped']:
+                self.stdout.write(self.style.WARNING(f'🗑️  {prefix}{collection_name}: dropped {name}'))
+            for error in result['errors']:
+                self.stdout.write(self.style.ERROR(f'❌ {collection_name}: {error}'))
+            for key in totals:
+                totals[key] += len(result[key])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n📊 {prefix}{totals['created']} created, {totals['existing']} up to date, "
+            f"{totals['dropped']} dropped, {totals['errors']} errors"
+        ))
@@ -3,9 +3,11 @@ Management command to initialize MongoDB collections for all course models
 """
 from django.core.management.base import BaseCommand
 from django.conf import settings
-from pymongo import MongoClient, IndexModel, ASCENDING, DESCENDING, TEXT
+from pymongo import MongoClient
 from pymongo.errors import CollectionInvalid
 
+from config.indexes import get_index_registry
+
 
 class Command(BaseCommand):
     help = 'Initialize MongoDB collections with indexes for course models'
@@ -20,89 +22,8 @@ class Command(BaseCommand):
         
         self.stdout.write(self.style.SUCCESS(f'\n🔗 Connected to MongoDB: {db_name}\n'))
         
-        # Define collections with their indexes
-        collections_config = {
-            'courses': [
-                IndexModel([('instructor_id', ASCENDING)]),
-                IndexModel([('category', ASCENDING)]),
-                IndexModel([('level', ASCENDING)]),
-                IndexModel([('published', ASCENDING)]),
-                IndexModel([('title', TEXT), ('description', TEXT)]),
-                IndexModel([('created_at', DESCENDING)]),
-            ],
-            'enrollments': [
-                IndexModel([('student_id', ASCENDING)]),
-                IndexModel([('course_id', ASCENDING)]),
-                IndexModel([('student_id', ASCENDING), ('course_id', ASCENDING)], unique=True),
-                IndexModel([('enrolled_at', DESCENDING)]),
-            ],
-            'reviews': [
-                IndexModel([('student_id', ASCENDING)]),
-                IndexModel([('course_id', ASCENDING)]),
-                IndexModel([('student_id', ASCENDING), ('course_id', ASCENDING)], unique=True),
-                IndexModel([('rating', DESCENDING)]),
-            ],
-            'modules': [
-                IndexModel([('course_id', ASCENDING)]),
-                IndexModel([('course_id', ASCENDING), ('order', ASCENDING)]),
-                IndexModel([('published', ASCENDING)]),
-            ],
-            'lessons': [
-                IndexModel([('module_id', ASCENDING)]),
-                IndexModel([('course_id', ASCENDING)]),
-                IndexModel([('module_id', ASCENDING), ('order', ASCENDING)]),
-                IndexModel([('lesson_type', ASCENDING)]),
-                IndexModel([('published', ASCENDING)]),
-            ],
-            'quizzes': [
-                IndexModel([('course_id', ASCENDING)]),
-                IndexModel([('lesson_id', ASCENDING)]),
-                IndexModel([('created_at', DESCENDING)]),
-            ],
-            'exercise_templates': [
-                IndexModel([('course_id', ASCENDING)]),
-                IndexModel([('lesson_id', ASCENDING)]),
-                IndexModel([('difficulty', ASCENDING)]),
-            ],
-            'generated_exercises': [
-                IndexModel([('template_id', ASCENDING)]),
-                IndexModel([('student_id', ASCENDING)]),
-                IndexModel([('course_id', ASCENDING)]),
-                IndexModel([('student_id', ASCENDING), ('template_id', ASCENDING)]),
-            ],
-            'submissions': [
-                IndexModel([('student_id', ASCENDING)]),
-                IndexModel([('course_id', ASCENDING)]),
-                IndexModel([('lesson_id', ASCENDING)]),
-                IndexModel([('exercise_id', ASCENDING)]),
-                IndexModel([('quiz_id', ASCENDING)]),
-                IndexModel([('status', ASCENDING)]),
-                IndexModel([('submitted_at', DESCENDING)]),
-                IndexModel([('student_id', ASCENDING), ('status', ASCENDING)]),
-            ],
-            'discussions': [
-                IndexModel([('course_id', ASCENDING)]),
-                IndexModel([('lesson_id', ASCENDING)]),
-                IndexModel([('author_id', ASCENDING)]),
-                IndexModel([('created_at', DESCENDING)]),
-                IndexModel([('is_pinned', ASCENDING), ('created_at', DESCENDING)]),
-                IndexModel([('title', TEXT), ('content', TEXT)]),
-            ],
-            'comments': [
-                IndexModel([('discussion_id', ASCENDING)]),
-                IndexModel([('author_id', ASCENDING)]),
-                IndexModel([('parent_comment_id', ASCENDING)]),
-                IndexModel([('created_at', ASCENDING)]),
-            ],
-            'progress': [
-                IndexModel([('student_id', ASCENDING)]),
-                IndexModel([('course_id', ASCENDING)]),
-                IndexModel([('lesson_id', ASCENDING)]),
-                IndexModel([('student_id', ASCENDING), ('course_id', ASCENDING)]),
-                IndexModel([('student_id', ASCENDING), ('lesson_id', ASCENDING)], unique=True),
-                IndexModel([('last_accessed', DESCENDING)]),
-            ],
-        }
+        # Collections with the indexes declared on the model classes (config.indexes)
+        collections_config = get_index_registry()
         
         # Create collections and indexes
         created_count = 0
@@ -0,0 +1,70 @@
+"""
+Management command to rewrite reference ids stored as strings to ObjectId
+(the fields each model declares in OBJECT_ID_FIELDS, see config.ids)
+Runs in batches and checkpoints after each one, so it can be interrupted and
+re-run; set MONGO_LEGACY_STRING_IDS = False once every collection is done.
+"""
+from django.core.management.base import BaseCommand
+
+from config.ids import MIGRATION_BATCH_SIZE, migrate_object_ids
+from config.indexes import get_collection_name, iter_models
+
+
+class Command(BaseCommand):
+    help = 'Convert string reference ids to ObjectId (resumable)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--collection', action='append', dest='collections',
+            help='Only migrate this collection (can be repeated)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=MIGRATION_BATCH_SIZE,
+            help=f'Documents per batch (default {MIGRATION_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Ignore saved checkpoints and scan from the beginning'
+        )
+
+    def handle(self, *args, **options):
+        id_fields = {}
+        for model in iter_models('OBJECT_ID_FIELDS'):
+            fields = id_fields.setdefault(get_collection_name(model), [])
+            fields.extend(field for field in model.OBJECT_ID_FIELDS if field not in fields)
+
+        collections = options['collections'] or sorted(id_fields)
+        pending = 0
+        for collection_name in collections:
+            fields = id_fields.get(collection_name)
+            if not fields:
+                self.stdout.write(self.style.WARNING(f'⚠️  No model declares id fields for {collection_name}'))
+                continue
+
+            self.stdout.write(f'🔄 {collection_name} ({", ".join(fields)})')
+            try:
+                checkpoint = None
+                for checkpoint in migrate_object_ids(
+                        collection_name, fields,
+                        batch_size=options['batch_size'], restart=options['restart']):
+                    if not checkpoint['done']:
+                        self.stdout.write(
+                            f"   … {checkpoint['scanned']} scanned, {checkpoint['converted']} converted "
+                            f"(last _id {checkpoint['last_id']})"
+                        )
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ {collection_name}: {checkpoint['converted']} converted, "
+                    f"{checkpoint['invalid']} invalid ids left as strings"
+                ))
+            except Exception as e:
+                pending += 1
+                self.stdout.write(self.style.ERROR(
+                    f'❌ Error migrating {collection_name}: {str(e)} (re-run to resume)'
+                ))
+
+        if pending:
+            self.stdout.write(self.style.WARNING(f'\n⚠️  {pending} collections not finished'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                '\n📊 Done. Set MONGO_LEGACY_STRING_IDS=False so id filters match ObjectId only'
+            ))
@@ -0,0 +1,30 @@
+"""
+Management command to rebuild the running rating aggregates
+(course and instructor review sums/counts) from the review collections
+"""
+from django.core.management.base import BaseCommand
+
+from courses.ratings import RATING_KINDS, RatingAggregate
+
+
+class Command(BaseCommand):
+    help = 'Rebuild rating aggregates from the review collections'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind', choices=sorted(RATING_KINDS), action='append', dest='kinds',
+            help='Only rebuild this aggregate kind (can be repeated)'
+        )
+        parser.add_argument(
+            '--target',
+            help='Only rebuild the aggregate of this course/instructor id'
+        )
+
+    def handle(self, *args, **options):
+        kinds = options['kinds'] or sorted(RATING_KINDS)
+        for kind in kinds:
+            try:
+                written = RatingAggregate.rebuild(kind, target_id=options['target'])
+                self.stdout.write(self.style.SUCCESS(f'✅ {kind}: {written} aggregates rebuilt'))
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'❌ Error rebuilding {kind}: {str(e)}'))
@@ -0,0 +1,40 @@
+"""
+Management command to (re)compute title_normalized on course documents,
+the field behind the catalog prefix search and autocomplete (courses.search)
+"""
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from courses.models import Course
+from courses.search import normalize_text
+
+
+class Command(BaseCommand):
+    help = 'Recompute the normalized course titles used by prefix search'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Updates sent per bulk write (default 500)'
+        )
+
+    def handle(self, *args, **options):
+        collection = Course.get_collection()
+        batch_size = options['batch_size']
+
+        checked = 0
+        updated = 0
+        operations = []
+        for course in collection.find({}, {'title': 1, 'title_normalized': 1}):
+            checked += 1
+            normalized = normalize_text(course.get('title'))
+            if course.get('title_normalized') == normalized:
+                continue
+            operations.append(UpdateOne({'_id': course['_id']}, {'$set': {'title_normalized': normalized}}))
+            if len(operations) >= batch_size:
+                updated += collection.bulk_write(operations, ordered=False).modified_count
+                operations = []
+        if operations:
+            updated += collection.bulk_write(operations, ordered=False).modified_count
+
+        self.stdout.write(self.style.SUCCESS(f'\n📊 {checked} courses checked, {updated} titles updated'))
@@ -0,0 +1,38 @@
+"""
+Management command to rebuild the materialized student learning summaries
+from enrollments, progress, quiz attempts and graded submissions
+"""
+from django.core.management.base import BaseCommand
+
+from courses.models import Enrollment
+from courses.models_progress import StudentProgress
+from courses.summaries import StudentSummary
+
+
+class Command(BaseCommand):
+    help = 'Rebuild student learning summaries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--student', action='append', dest='students',
+            help='Only rebuild the summary of this student id (can be repeated)'
+        )
+
+    def handle(self, *args, **options):
+        student_ids = options['students']
+        if not student_ids:
+            student_ids = {
+                str(student_id)
+                for collection in (Enrollment.get_collection(), StudentProgress.collection)
+                for student_id in collection.distinct('student_id')
+            }
+
+        rebuilt = 0
+        for student_id in sorted(student_ids):
+            try:
+                StudentSummary.build(student_id)
+                rebuilt += 1
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'❌ Error rebuilding summary of {student_id}: {str(e)}'))
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {rebuilt} student summaries rebuilt'))
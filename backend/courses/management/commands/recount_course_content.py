@@ -0,0 +1,47 @@
+"""
+Management command to recount the per-course content counters
+(lessons, published lessons, quizzes, assignments) stored on course documents
+"""
+from django.core.management.base import BaseCommand
+from bson import ObjectId
+
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = 'Recount content counters stored on course documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course', action='append', dest='courses', default=[],
+            help='Only recount this course id (can be repeated)'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report drifted counters without writing them'
+        )
+
+    def handle(self, *args, **options):
+        collection = Course.get_collection()
+        query = {}
+        if options['courses']:
+            query = {'_id': {'$in': [ObjectId(course_id) for course_id in options['courses']]}}
+
+        checked = 0
+        repaired = 0
+        for course in collection.find(query, {'title': 1, 'content_counts': 1}):
+            checked += 1
+            counts = Course.count_content(course['_id'])
+            stored = course.get('content_counts')
+            if stored == counts:
+                continue
+
+            repaired += 1
+            self.stdout.write(self.style.WARNING(
+                f"   🔧 {course.get('title', course['_id'])}: {stored} -> {counts}"
+            ))
+            if not options['dry_run']:
+                collection.update_one({'_id': course['_id']}, {'$set': {'content_counts': counts}})
+
+        action = 'would be repaired' if options['dry_run'] else 'repaired'
+        self.stdout.write(self.style.SUCCESS(f'\n📊 {checked} courses checked, {repaired} {action}'))
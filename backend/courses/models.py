@@ -3,18 +3,49 @@ Course and related models for MongoDB
 """
 from datetime import datetime
 from bson import ObjectId
+from pymongo import IndexModel, ReturnDocument, ASCENDING, DESCENDING, TEXT
 from config.mongodb import get_collection
+from config.ids import to_object_id, id_filter, ids_filter, id_lookup_let, id_match_expr, normalize_ids
+from config.pagination import paginate
+from courses.search import normalize_text, prefix_filter
+from courses.catalog import invalidate_catalog
+from courses.content_cache import cached_content, invalidate_course_content
+from courses.ratings import RatingAggregate
 
 
 class Course:
     """Course model"""
     
     COLLECTION_NAME = 'courses'
+    OBJECT_ID_FIELDS = ('instructor_id',)
+    INDEXES = [
+        IndexModel([('instructor_id', ASCENDING)]),
+        # Catalog pages: filters, then the (created_at, _id) keyset
+        IndexModel([('published', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)]),
+        IndexModel([('published', ASCENDING), ('category', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)]),
+        IndexModel([('published', ASCENDING), ('level', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)]),
+        IndexModel([('is_featured', ASCENDING), ('is_published', ASCENDING)]),
+        IndexModel([('created_at', DESCENDING)]),
+        # Catalog search: words ranked by textScore, short inputs by title prefix
+        IndexModel(
+            [('published', ASCENDING), ('title', TEXT), ('short_description', TEXT), ('description', TEXT)],
+            weights={'title': 10, 'short_description': 3, 'description': 1},
+            name='catalog_text_search'
+        ),
+        IndexModel([('published', ASCENDING), ('title_normalized', ASCENDING), ('_id', ASCENDING)]),
+    ]
     
     DIFFICULTY_LEVELS = ['Beginner', 'Intermediate', 'Advanced', 'Expert']
     CATEGORIES = ['Web Development', 'Data Science', 'Mobile Development', 'Design', 
                   'Business', 'Marketing', 'IT & Software', 'Personal Development']
     
+    # Content counters kept on the course document under 'content_counts'
+    CONTENT_COUNTERS = ('lessons', 'published_lessons', 'quizzes', 'assignments')
+    
+    # Fields loaded for course cards (dashboards, enrollment lists)
+    SUMMARY_FIELDS = ('title', 'description', 'short_description', 'thumbnail', 'instructor_id',
+                      'category', 'level', 'difficulty_level', 'duration_hours', 'published')
+    
     def __init__(self, **kwargs):
         self.id = kwargs.get('_id')
         self.title = kwargs.get('title')
@@ -39,6 +70,7 @@ class Course:
         self.enrolled_count = kwargs.get('enrolled_count', 0)
         self.rating = kwargs.get('rating', 0.0)
         self.reviews_count = kwargs.get('reviews_count', 0)
+        self.content_counts = kwargs.get('content_counts')
         # Support both 'published' (from DB) and 'is_published' (legacy)
         self.published = kwargs.get('published', False)
         self.is_published = self.published  # Alias for consistency
@@ -59,37 +91,213 @@ class Course:
         kwargs['enrolled_count'] = 0
         kwargs['rating'] = 0.0
         kwargs['reviews_count'] = 0
+        kwargs['content_counts'] = {name: 0 for name in cls.CONTENT_COUNTERS}
+        kwargs['title_normalized'] = normalize_text(kwargs.get('title'))
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
+        if kwargs.get('published'):
+            invalidate_catalog()
         return cls(**kwargs)
     
     @classmethod
     def find_by_id(cls, course_id):
-        """Find course by ID"""
+        """Find course by ID (cached until the course or its content changes)"""
         collection = cls.get_collection()
-        if isinstance(course_id, str):
-            course_id = ObjectId(course_id)
-        course_data = collection.find_one({'_id': course_id})
+        object_id = to_object_id(course_id)
+        course_data = cached_content(
+            f'course:{object_id}', lambda: collection.find_one({'_id': object_id}), course_id=object_id
+        )
         return cls(**course_data) if course_data else None
     
     @classmethod
-    def find_all(cls, filters=None, skip=0, limit=20):
-        """Find all courses with filters"""
-        collection = cls.get_collection()
-        query = filters or {}
-        courses_data = collection.find(query).skip(skip).limit(limit).sort('created_at', -1)
+    def increment_enrolled_count(cls, course_id, delta=1):
+        """Atomically adjust the enrollment counter"""
+        object_id = to_object_id(course_id)
+        cls.get_collection().update_one({'_id': object_id}, {'$inc': {'enrolled_count': delta}})
+        invalidate_course_content(object_id)
+    
+    @classmethod
+    def find_all(cls, filters=None, limit=20, cursor=None):
+        """Find all courses with filters (one page, newest first)"""
+        return cls.find_page(filters, limit, cursor)[0]
+    
+    @classmethod
+    def find_page(cls, filters=None, limit=20, cursor=None):
+        """
+        One page of courses, newest first
+        Returns (courses, next_cursor); next_cursor is None on the last page
+        """
+        courses_data, next_cursor = paginate(
+            cls.get_collection(), filters or {}, 'created_at', DESCENDING, limit, cursor
+        )
+        return [cls(**course) for course in courses_data], next_cursor
+    
+    @classmethod
+    def search(cls, text, filters=None, limit=20):
+        """
+        Courses matching the words of text, most relevant first ($text, textScore)
+        filters must pin 'published' (the text index is prefixed by it)
+        """
+        query = dict(filters or {})
+        query['$text'] = {'$search': text}
+        courses_data = (
+            cls.get_collection()
+            .find(query, {'search_score': {'$meta': 'textScore'}})
+            .sort([('search_score', {'$meta': 'textScore'})])
+            .limit(limit)
+        )
         return [cls(**course) for course in courses_data]
     
+    @classmethod
+    def find_page_by_title_prefix(cls, prefix, filters=None, limit=20, cursor=None):
+        """
+        One page of courses whose title starts with prefix (case and accent insensitive),
+        in title order: (courses, next_cursor)
+        """
+        match = prefix_filter(prefix)
+        if match is None:
+            return [], None
+        query = dict(filters or {})
+        query['title_normalized'] = match
+        courses_data, next_cursor = paginate(
+            cls.get_collection(), query, 'title_normalized', ASCENDING, limit, cursor
+        )
+        return [cls(**course) for course in courses_data], next_cursor
+    
+    @classmethod
+    def autocomplete(cls, prefix, limit=10):
+        """Published course titles starting with prefix: [{'id', 'title', 'thumbnail'}]"""
+        match = prefix_filter(prefix)
+        if match is None:
+            return []
+        cursor = (
+            cls.get_collection()
+            .find({'published': True, 'title_normalized': match}, {'title': 1, 'thumbnail': 1})
+            .sort([('title_normalized', ASCENDING), ('_id', ASCENDING)])
+            .limit(limit)
+        )
+        return [
+            {'id': str(data['_id']), 'title': data.get('title'), 'thumbnail': data.get('thumbnail', '')}
+            for data in cursor
+        ]
+    
     @classmethod
     def find_by_instructor(cls, instructor_id):
         """Find courses by instructor"""
         collection = cls.get_collection()
-        # Keep instructor_id as string since it's stored as string in the database
-        instructor_id = str(instructor_id)
-        courses_data = collection.find({'instructor_id': instructor_id})
+        courses_data = collection.find({'instructor_id': id_filter(instructor_id)})
         return [cls(**course) for course in courses_data]
     
+    @classmethod
+    def find_summaries(cls, course_ids, users=None):
+        """
+        Find several courses with one $in query and a summary projection
+        Returns {course_id (str): summary dict}; with a UserLoader, each summary
+        also gets its instructor (one batched user query)
+        """
+        ids = {ObjectId(str(course_id)) for course_id in course_ids if ObjectId.is_valid(str(course_id))}
+        if not ids:
+            return {}
+        cursor = cls.get_collection().find(
+            {'_id': {'$in': list(ids)}},
+            {field: 1 for field in cls.SUMMARY_FIELDS}
+        )
+        summaries = {}
+        for data in cursor:
+            summaries[str(data['_id'])] = {
+                'id': str(data['_id']),
+                'title': data.get('title'),
+                'description': data.get('description'),
+                'short_description': data.get('short_description', ''),
+                'thumbnail': data.get('thumbnail', ''),
+                'instructor_id': str(data['instructor_id']) if data.get('instructor_id') else None,
+                'category': data.get('category'),
+                'level': data.get('level') or data.get('difficulty_level', 'Beginner'),
+                'duration_hours': data.get('duration_hours', 0),
+                'published': data.get('published', False),
+            }
+
+        if users is not None:
+            users.prime(summary['instructor_id'] for summary in summaries.values())
+            for summary in summaries.values():
+                instructor = users.load(summary['instructor_id']) if summary['instructor_id'] else None
+                summary['instructor'] = {
+                    'id': str(instructor.id),
+                    'name': f"{instructor.first_name} {instructor.last_name}",
+                    'profile_image': instructor.profile_image
+                } if instructor else None
+        return summaries
+    
+    @classmethod
+    def find_instructor_dashboard(cls, instructor_id):
+        """
+        Courses of an instructor with enrollment count, module count and
+        rating statistics (from the running review aggregate), in one aggregation
+        """
+        collection = cls.get_collection()
+
+        def count_lookup(collection_name, as_field):
+            return {'$lookup': {
+                'from': collection_name,
+                'let': id_lookup_let('course_id'),
+                'pipeline': [
+                    id_match_expr('course_id', 'course_id'),
+                    {'$count': 'count'},
+                ],
+                'as': as_field,
+            }}
+
+        pipeline = [
+            {'$match': {'instructor_id': id_filter(instructor_id)}},
+            count_lookup(Enrollment.COLLECTION_NAME, 'enrollment_stats'),
+            count_lookup('modules', 'module_stats'),
+            {'$lookup': {
+                'from': 'rating_aggregates',
+                'let': {'key': {'$concat': ['reviews:', {'$toString': '$_id'}]}},
+                'pipeline': [
+                    {'$match': {'$expr': {'$eq': ['$_id', '$$key']}}},
+                    {'$project': {'count': 1, 'rating_sum': '$sums.rating'}},
+                ],
+                'as': 'rating_stats',
+            }},
+        ]
+
+        results = []
+        for data in collection.aggregate(pipeline):
+            enrollment_stats = data.pop('enrollment_stats')
+            module_stats = data.pop('module_stats')
+            rating_stats = data.pop('rating_stats')
+            if rating_stats:
+                review_count = rating_stats[0].get('count', 0)
+                average_rating = (
+                    round(rating_stats[0].get('rating_sum', 0) / review_count, 1)
+                    if review_count > 0 else 0
+                )
+            else:
+                # Course without an aggregate yet (reviews predating it): seed it
+                stats = RatingAggregate.get_stats('reviews', data['_id'])
+                review_count = stats['total_reviews']
+                average_rating = round(stats['average_rating'], 1)
+            results.append({
+                'course': cls(**data),
+                'enrollment_count': enrollment_stats[0]['count'] if enrollment_stats else 0,
+                'module_count': module_stats[0]['count'] if module_stats else 0,
+                'review_count': review_count,
+                'average_rating': average_rating,
+            })
+        return results
+    
+    @classmethod
+    def find_instructor_id(cls, course_id):
+        """Get only the instructor id of a course (None if the course doesn't exist)"""
+        collection = cls.get_collection()
+        course_data = collection.find_one({'_id': to_object_id(course_id)}, {'instructor_id': 1})
+        if not course_data:
+            return None
+        return str(course_data.get('instructor_id'))
+
     @classmethod
     def find_featured(cls, limit=6):
         """Find featured courses"""
@@ -97,18 +305,229 @@ class Course:
         courses_data = collection.find({'is_featured': True, 'is_published': True}).limit(limit)
         return [cls(**course) for course in courses_data]
     
+    @staticmethod
+    def outline_lookup(lesson_fields=None):
+        """
+        $lookup stage joining a course to its ordered modules, each module's
+        ordered lessons and each lesson's quiz (_id/is_published only).
+        lesson_fields limits the lesson fields returned (full documents by default).
+        """
+        quiz_lookup = {
+            '$lookup': {
+                'from': 'quizzes',
+                'let': id_lookup_let('lesson_id'),
+                'pipeline': [
+                    id_match_expr('lesson_id', 'lesson_id'),
+                    {'$project': {'_id': 1, 'is_published': 1}},
+                    {'$limit': 1},
+                ],
+                'as': 'quiz',
+            }
+        }
+        lessons_pipeline = [
+            id_match_expr('module_id', 'module_id'),
+            {'$sort': {'order': 1}},
+        ]
+        if lesson_fields:
+            lessons_pipeline.append({'$project': {field: 1 for field in lesson_fields}})
+        lessons_pipeline.append(quiz_lookup)
+
+        lessons_lookup = {
+            '$lookup': {
+                'from': 'lessons',
+                'let': id_lookup_let('module_id'),
+                'pipeline': lessons_pipeline,
+                'as': 'lessons',
+            }
+        }
+        return {
+            '$lookup': {
+                'from': 'modules',
+                'let': id_lookup_let('course_id'),
+                'pipeline': [
+                    id_match_expr('course_id', 'course_id'),
+                    {'$sort': {'order': 1}},
+                    lessons_lookup,
+                ],
+                'as': 'modules',
+            }
+        }
+
+    @classmethod
+    def find_page_bundle(cls, course_id, student_id=None):
+        """
+        Fetch everything the course page needs in one aggregation:
+        course, instructor, reviews, modules > lessons > quiz and, when a
+        student is given, their enrollment and progress
+        Returns: raw document or None if the course doesn't exist
+        """
+        collection = cls.get_collection()
+        course_id = to_object_id(course_id)
+
+        pipeline = [
+            {'$match': {'_id': course_id}},
+            cls.outline_lookup(),
+            {'$lookup': {
+                'from': 'users',
+                # Courses created before the id migration may hold a string instructor_id
+                'let': {'instructor_id': {'$convert': {
+                    'input': '$instructor_id', 'to': 'objectId', 'onError': None, 'onNull': None
+                }}},
+                'pipeline': [
+                    {'$match': {'$expr': {'$eq': ['$_id', '$$instructor_id']}}},
+                    {'$project': {'first_name': 1, 'last_name': 1, 'email': 1, 'bio': 1, 'profile_image': 1}},
+                ],
+                'as': 'instructor',
+            }},
+            {'$lookup': {
+                'from': 'reviews',
+                'let': id_lookup_let('course_id'),
+                'pipeline': [
+                    id_match_expr('course_id', 'course_id'),
+                    {'$sort': {'created_at': -1}},
+                ],
+                'as': 'reviews',
+            }},
+        ]
+
+        if student_id:
+            pipeline += [
+                {'$lookup': {
+                    'from': 'enrollments',
+                    'pipeline': [
+                        {'$match': {'student_id': id_filter(student_id), 'course_id': id_filter(course_id)}},
+                        {'$limit': 1},
+                    ],
+                    'as': 'enrollment',
+                }},
+                {'$lookup': {
+                    'from': 'student_progress',
+                    'pipeline': [
+                        {'$match': {'student_id': id_filter(student_id), 'course_id': id_filter(course_id)}},
+                        {'$limit': 1},
+                    ],
+                    'as': 'progress',
+                }},
+            ]
+
+        results = list(collection.aggregate(pipeline))
+        return results[0] if results else None
+
+    @classmethod
+    def find_status_outline(cls, course_id, student_id):
+        """
+        Fetch the course outline (lesson titles and quiz flags), the student's
+        progress and the published assignments in one aggregation
+        Returns: raw document or None if the course doesn't exist
+        """
+        collection = cls.get_collection()
+        course_id = to_object_id(course_id)
+
+        pipeline = [
+            {'$match': {'_id': course_id}},
+            {'$project': {'title': 1}},
+            cls.outline_lookup(lesson_fields=['title', 'module_id', 'order', 'duration_minutes']),
+            {'$lookup': {
+                'from': 'student_progress',
+                'pipeline': [
+                    {'$match': {'student_id': id_filter(student_id), 'course_id': id_filter(course_id)}},
+                    {'$project': {'lessons_completed': 1, 'completion_percentage': 1}},
+                    {'$limit': 1},
+                ],
+                'as': 'progress',
+            }},
+            {'$lookup': {
+                'from': 'assignments',
+                'pipeline': [
+                    {'$match': {'course_id': id_filter(course_id), 'is_published': True}},
+                    {'$sort': {'created_at': -1}},
+                    {'$project': {'title': 1}},
+                ],
+                'as': 'assignments',
+            }},
+        ]
+
+        results = list(collection.aggregate(pipeline))
+        return results[0] if results else None
+
+    @classmethod
+    def increment_content_counts(cls, course_id, **deltas):
+        """
+        Atomically adjust content counters, e.g. increment_content_counts(id, lessons=1)
+        Courses without counters yet are skipped; they're counted on first read
+        """
+        if not course_id or not ObjectId.is_valid(str(course_id)):
+            return
+        inc = {f'content_counts.{name}': delta for name, delta in deltas.items() if delta}
+        if inc:
+            cls.get_collection().update_one(
+                {'_id': to_object_id(course_id), 'content_counts': {'$exists': True}},
+                {'$inc': inc}
+            )
+            invalidate_course_content(to_object_id(course_id))
+    
+    @classmethod
+    def count_content(cls, course_id):
+        """Count lessons, published lessons, quizzes and assignments of a course"""
+        from courses.extended_models import Module, Lesson, Quiz, Assignment
+        
+        course_filter = id_filter(course_id)
+        module_ids = [
+            module['_id']
+            for module in Module.get_collection().find({'course_id': course_filter}, {'_id': 1})
+        ]
+        lesson_query = {'$or': [{'course_id': course_filter}, {'module_id': ids_filter(module_ids)}]}
+        lessons = Lesson.get_collection()
+        return {
+            'lessons': lessons.count_documents(lesson_query),
+            'published_lessons': lessons.count_documents({**lesson_query, 'is_published': True}),
+            'quizzes': Quiz.get_collection().count_documents({'course_id': course_filter}),
+            'assignments': Assignment.get_collection().count_documents({'course_id': course_filter}),
+        }
+    
+    @classmethod
+    def get_content_counts(cls, course_id):
+        """
+        Get content counters of a course (None if the course doesn't exist)
+        Counters missing on older courses are counted and stored on first read
+        """
+        if not ObjectId.is_valid(str(course_id)):
+            return None
+        course_id = ObjectId(str(course_id))
+        collection = cls.get_collection()
+        data = collection.find_one({'_id': course_id}, {'content_counts': 1})
+        if not data:
+            return None
+        
+        counts = data.get('content_counts')
+        if counts is None:
+            counts = cls.count_content(course_id)
+            collection.update_one(
+                {'_id': course_id, 'content_counts': {'$exists': False}},
+                {'$set': {'content_counts': counts}}
+            )
+        return {name: counts.get(name, 0) for name in cls.CONTENT_COUNTERS}
+    
     def update(self, **kwargs):
         """Update course"""
         collection = self.get_collection()
         kwargs['updated_at'] = datetime.utcnow()
+        if 'title' in kwargs:
+            kwargs['title_normalized'] = normalize_text(kwargs['title'])
         collection.update_one({'_id': self.id}, {'$set': kwargs})
+        invalidate_course_content(self.id)
+        invalidate_catalog(kwargs)
         for key, value in kwargs.items():
             setattr(self, key, value)
     
     def delete(self):
         """Delete course"""
+        from courses.summaries import StudentSummary
         collection = self.get_collection()
         collection.delete_one({'_id': self.id})
+        invalidate_course_content(self.id)
+        invalidate_catalog()
+        StudentSummary.course_removed(self.id)
     
     def to_dict(self):
         """Convert to dictionary"""
@@ -146,6 +565,11 @@ class Enrollment:
     """Enrollment model - tracks student enrollments"""
     
     COLLECTION_NAME = 'enrollments'
+    OBJECT_ID_FIELDS = ('student_id', 'course_id')
+    INDEXES = [
+        IndexModel([('student_id', ASCENDING), ('course_id', ASCENDING)], unique=True),
+        IndexModel([('course_id', ASCENDING)]),
+    ]
     
     def __init__(self, **kwargs):
         self.id = kwargs.get('_id')
@@ -169,6 +593,7 @@ class Enrollment:
         kwargs['enrolled_at'] = datetime.utcnow()
         kwargs['progress'] = 0.0
         kwargs['completed'] = False
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
@@ -178,32 +603,23 @@ class Enrollment:
     def find_by_student(cls, student_id):
         """Find enrollments by student"""
         collection = cls.get_collection()
-        if isinstance(student_id, str):
-            student_id = ObjectId(student_id)
-        enrollments_data = collection.find({'student_id': student_id})
+        enrollments_data = collection.find({'student_id': id_filter(student_id)})
         return [cls(**enrollment) for enrollment in enrollments_data]
     
     @classmethod
     def find_by_course(cls, course_id):
         """Find enrollments by course"""
         collection = cls.get_collection()
-        if isinstance(course_id, str):
-            course_id = ObjectId(course_id)
-        enrollments_data = collection.find({'course_id': course_id})
+        enrollments_data = collection.find({'course_id': id_filter(course_id)})
         return [cls(**enrollment) for enrollment in enrollments_data]
     
     @classmethod
     def find_one(cls, student_id, course_id):
         """Check if student is enrolled in course"""
         collection = cls.get_collection()
-        # Convert to ObjectId for database lookup since enrollments are stored with ObjectIds
-        if isinstance(student_id, str):
-            student_id = ObjectId(student_id)
-        if isinstance(course_id, str):
-            course_id = ObjectId(course_id)
         enrollment_data = collection.find_one({
-            'student_id': student_id,
-            'course_id': course_id
+            'student_id': id_filter(student_id),
+            'course_id': id_filter(course_id)
         })
         return cls(**enrollment_data) if enrollment_data else None
     
@@ -215,6 +631,14 @@ class Enrollment:
         for key, value in kwargs.items():
             setattr(self, key, value)
     
+    @classmethod
+    def set_progress(cls, enrollment_id, progress):
+        """Mirror the completion percentage onto an enrollment without loading it"""
+        cls.get_collection().update_one(
+            {'_id': to_object_id(enrollment_id)},
+            {'$set': {'progress': progress, 'last_accessed': datetime.utcnow()}}
+        )
+    
     def to_dict(self):
         """Convert to dictionary"""
         return {
@@ -234,6 +658,11 @@ class Review:
     """Course review model"""
     
     COLLECTION_NAME = 'reviews'
+    OBJECT_ID_FIELDS = ('student_id', 'course_id')
+    INDEXES = [
+        IndexModel([('course_id', ASCENDING), ('created_at', DESCENDING)]),
+        IndexModel([('student_id', ASCENDING), ('course_id', ASCENDING)], unique=True),
+    ]
     
     def __init__(self, **kwargs):
         self.id = kwargs.get('_id')
@@ -254,20 +683,47 @@ class Review:
         collection = cls.get_collection()
         kwargs['created_at'] = datetime.utcnow()
         kwargs['updated_at'] = datetime.utcnow()
+        normalize_ids(kwargs, cls.OBJECT_ID_FIELDS)
         
         result = collection.insert_one(kwargs)
         kwargs['_id'] = result.inserted_id
-        return cls(**kwargs)
+        review = cls(**kwargs)
+        RatingAggregate.review_added('reviews', review.course_id, {'rating': review.rating})
+        return review
     
     @classmethod
     def find_by_course(cls, course_id):
         """Find reviews by course"""
         collection = cls.get_collection()
-        if isinstance(course_id, str):
-            course_id = ObjectId(course_id)
-        reviews_data = collection.find({'course_id': course_id}).sort('created_at', -1)
+        reviews_data = collection.find({'course_id': id_filter(course_id)}).sort('created_at', -1)
         return [cls(**review) for review in reviews_data]
     
+    @classmethod
+    def find_latest_update(cls, course_id):
+        """updated_at of the course's most recently changed review (None without reviews)"""
+        data = cls.get_collection().find_one(
+            {'course_id': id_filter(course_id)}, {'updated_at': 1}, sort=[('updated_at', -1)]
+        )
+        return data.get('updated_at') if data else None
+    
+    def update(self, **kwargs):
+        """Update review, applying any rating change to the course aggregate"""
+        collection = self.get_collection()
+        kwargs['updated_at'] = datetime.utcnow()
+        before = collection.find_one_and_update(
+            {'_id': self.id}, {'$set': kwargs}, return_document=ReturnDocument.BEFORE
+        )
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+        if before:
+            RatingAggregate.review_changed('reviews', self.course_id, before, kwargs)
+    
+    def delete(self):
+        """Delete review and remove its rating from the course aggregate"""
+        deleted = self.get_collection().find_one_and_delete({'_id': self.id})
+        if deleted:
+            RatingAggregate.review_removed('reviews', self.course_id, deleted)
+    
     def to_dict(self):
         """Convert to dictionary"""
         return {
@@ -3,15 +3,19 @@ Progress tracking models for SmartCampus
 Tracks student progress through courses, lessons, quizzes, and assignments
 """
 from datetime import datetime
-from bson import ObjectId
-from config.mongodb import get_database
-
-db = get_database()
+from pymongo import IndexModel, ReturnDocument, ASCENDING
+from config.mongodb import LazyCollection
+from config.ids import to_object_id, id_filter
+from courses.ratings import RatingAggregate
 
 
 class StudentProgress:
     """Track student progress in a course"""
-    collection = db['student_progress']
+    collection = LazyCollection('student_progress')
+    OBJECT_ID_FIELDS = ('student_id', 'course_id', 'enrollment_id')
+    INDEXES = [
+        IndexModel([('student_id', ASCENDING), ('course_id', ASCENDING)], unique=True),
+    ]
     
     def __init__(self, student_id, course_id, enrollment_id, 
                  lessons_completed=None, quizzes_completed=None, 
@@ -19,9 +23,9 @@ class StudentProgress:
                  last_accessed=None, time_spent_minutes=0, 
                  created_at=None, updated_at=None, _id=None):
         self._id = _id
-        self.student_id = ObjectId(student_id) if student_id else None
-        self.course_id = ObjectId(course_id) if course_id else None
-        self.enrollment_id = ObjectId(enrollment_id) if enrollment_id else None
+        self.student_id = to_object_id(student_id)
+        self.course_id = to_object_id(course_id)
+        self.enrollment_id = to_object_id(enrollment_id)
         self.lessons_completed = lessons_completed or []  # List of lesson IDs
         self.quizzes_completed = quizzes_completed or []  # List of quiz IDs with scores
         self.assignments_completed = assignments_completed or []  # List of assignment IDs with scores
@@ -72,15 +76,15 @@ class StudentProgress:
     def find_by_student_and_course(cls, student_id, course_id):
         """Find progress by student and course"""
         data = cls.collection.find_one({
-            'student_id': ObjectId(student_id),
-            'course_id': ObjectId(course_id)
+            'student_id': id_filter(student_id),
+            'course_id': id_filter(course_id)
         })
         return cls(**data) if data else None
     
     @classmethod
     def find_by_student(cls, student_id):
         """Get all progress records for a student"""
-        cursor = cls.collection.find({'student_id': ObjectId(student_id)})
+        cursor = cls.collection.find({'student_id': id_filter(student_id)})
         return [cls(**data) for data in cursor]
     
     def update(self, **kwargs):
@@ -93,53 +97,127 @@ class StudentProgress:
         for key, value in kwargs.items():
             setattr(self, key, value)
     
+    def _apply(self, update, query=None, array_filters=None):
+        """
+        Apply an update to this record server-side and refresh from the stored document
+        Returns False if the record (or the extra query) didn't match
+        """
+        query = dict(query or {}, _id=self._id)
+        data = self.collection.find_one_and_update(
+            query, update,
+            array_filters=array_filters,
+            return_document=ReturnDocument.AFTER
+        )
+        if not data:
+            return False
+        self.__init__(**data)
+        return True
+    
+    def _set_entry(self, field, key, entry):
+        """Replace the entry with the same key in an array field, or append it"""
+        for _ in range(2):
+            # Replace in place if present
+            if self._apply(
+                {'$set': {f'{field}.$[entry]': entry, 'updated_at': datetime.utcnow()}},
+                query={f'{field}.{key}': entry[key]},
+                array_filters=[{f'entry.{key}': entry[key]}]
+            ):
+                return
+            # Otherwise append, unless a concurrent request appended it first
+            if self._apply(
+                {'$push': {field: entry}, '$set': {'updated_at': datetime.utcnow()}},
+                query={f'{field}.{key}': {'$ne': entry[key]}}
+            ):
+                return
+    
     def mark_lesson_complete(self, lesson_id):
         """Mark a lesson as completed"""
-        lesson_id_str = str(lesson_id)
-        if lesson_id_str not in self.lessons_completed:
-            self.lessons_completed.append(lesson_id_str)
-            self.update(lessons_completed=self.lessons_completed)
+        self._apply({
+            '$addToSet': {'lessons_completed': str(lesson_id)},
+            '$set': {'updated_at': datetime.utcnow()}
+        })
     
     def mark_quiz_complete(self, quiz_id, score, passed):
         """Mark a quiz as completed with score"""
-        quiz_entry = {
+        self._set_entry('quizzes_completed', 'quiz_id', {
             'quiz_id': str(quiz_id),
             'score': score,
             'passed': passed,
             'completed_at': datetime.utcnow().isoformat()
-        }
-        # Update if exists, otherwise append
-        found = False
-        for i, q in enumerate(self.quizzes_completed):
-            if q['quiz_id'] == str(quiz_id):
-                self.quizzes_completed[i] = quiz_entry
-                found = True
-                break
-        if not found:
-            self.quizzes_completed.append(quiz_entry)
-        self.update(quizzes_completed=self.quizzes_completed)
+        })
     
     def mark_assignment_complete(self, assignment_id, score, passed):
         """Mark an assignment as completed with score"""
-        assignment_entry = {
+        self._set_entry('assignments_completed', 'assignment_id', {
             'assignment_id': str(assignment_id),
             'score': score,
             'passed': passed,
             'completed_at': datetime.utcnow().isoformat()
+        })
+    
+    @classmethod
+    def record_lesson_completion(cls, student_id, course_id, lesson_id, total_lessons,
+                                 time_spent_minutes=0, enrollment_id=None):
+        """
+        Mark a lesson completed, add time spent and recompute the lesson-based
+        completion percentage in a single atomic update.
+        Creates the record when enrollment_id is given, otherwise returns None if
+        the student has no progress record for the course yet.
+        """
+        now = datetime.utcnow()
+        lessons = {'$ifNull': ['$lessons_completed', []]}
+        lesson_id = {'$literal': str(lesson_id)}
+        
+        if total_lessons:
+            percentage = {'$min': [100.0, {'$round': [
+                {'$multiply': [{'$divide': [{'$size': '$lessons_completed'}, total_lessons]}, 100]}, 2
+            ]}]}
+        else:
+            percentage = 0.0
+        
+        fields = {
+            'lessons_completed': {'$cond': [
+                {'$in': [lesson_id, lessons]}, lessons, {'$concatArrays': [lessons, [lesson_id]]}
+            ]},
+            'time_spent_minutes': {'$add': [{'$ifNull': ['$time_spent_minutes', 0]}, time_spent_minutes]},
+            'last_accessed': now,
+            'updated_at': now,
         }
-        # Update if exists, otherwise append
-        found = False
-        for i, a in enumerate(self.assignments_completed):
-            if a['assignment_id'] == str(assignment_id):
-                self.assignments_completed[i] = assignment_entry
-                found = True
-                break
-        if not found:
-            self.assignments_completed.append(assignment_entry)
-        self.update(assignments_completed=self.assignments_completed)
+        if enrollment_id:
+            # Defaults for a newly created record
+            fields.update({
+                'enrollment_id': {'$ifNull': ['$enrollment_id', to_object_id(enrollment_id)]},
+                'quizzes_completed': {'$ifNull': ['$quizzes_completed', []]},
+                'assignments_completed': {'$ifNull': ['$assignments_completed', []]},
+                'created_at': {'$ifNull': ['$created_at', now]},
+            })
+        
+        data = cls.collection.find_one_and_update(
+            {'student_id': to_object_id(student_id), 'course_id': to_object_id(course_id)},
+            [
+                {'$set': fields},
+                {'$set': {'completion_percentage': percentage}},
+            ],
+            upsert=bool(enrollment_id),
+            return_document=ReturnDocument.AFTER
+        )
+        return cls(**data) if data else None
     
-    def calculate_completion_percentage(self, total_lessons, total_quizzes, total_assignments):
-        """Calculate overall completion percentage"""
+    def calculate_completion_percentage(self, total_lessons=None, total_quizzes=None, total_assignments=None):
+        """
+        Calculate overall completion percentage
+        Totals not given are read from the course content counters
+        """
+        if None in (total_lessons, total_quizzes, total_assignments):
+            from courses.models import Course
+            counts = Course.get_content_counts(self.course_id) or {}
+            if total_lessons is None:
+                total_lessons = counts.get('lessons', 0)
+            if total_quizzes is None:
+                total_quizzes = counts.get('quizzes', 0)
+            if total_assignments is None:
+                total_assignments = counts.get('assignments', 0)
+        
         total_items = total_lessons + total_quizzes + total_assignments
         if total_items == 0:
             return 0.0
@@ -157,13 +235,18 @@ class StudentProgress:
 
 class CourseReview:
     """Student reviews and ratings for courses"""
-    collection = db['course_reviews']
+    collection = LazyCollection('course_reviews')
+    OBJECT_ID_FIELDS = ('student_id', 'course_id')
+    INDEXES = [
+        IndexModel([('course_id', ASCENDING)]),
+        IndexModel([('student_id', ASCENDING), ('course_id', ASCENDING)], unique=True),
+    ]
     
     def __init__(self, student_id, course_id, rating, review_text="",
                  would_recommend=True, created_at=None, updated_at=None, _id=None):
         self._id = _id
-        self.student_id = ObjectId(student_id) if student_id else None
-        self.course_id = ObjectId(course_id) if course_id else None
+        self.student_id = to_object_id(student_id)
+        self.course_id = to_object_id(course_id)
         self.rating = rating  # 1-5 stars
         self.review_text = review_text
         self.would_recommend = would_recommend
@@ -197,64 +280,65 @@ class CourseReview:
             'updated_at': review.updated_at
         })
         review._id = result.inserted_id
+        RatingAggregate.review_added('course_reviews', review.course_id, {'rating': review.rating})
         return review
     
     @classmethod
     def find_by_course(cls, course_id):
         """Get all reviews for a course"""
-        cursor = cls.collection.find({'course_id': ObjectId(course_id)})
+        cursor = cls.collection.find({'course_id': id_filter(course_id)})
         return [cls(**data) for data in cursor]
     
     @classmethod
     def find_by_student_and_course(cls, student_id, course_id):
         """Check if student already reviewed this course"""
         data = cls.collection.find_one({
-            'student_id': ObjectId(student_id),
-            'course_id': ObjectId(course_id)
+            'student_id': id_filter(student_id),
+            'course_id': id_filter(course_id)
         })
         return cls(**data) if data else None
     
     @classmethod
     def get_course_average_rating(cls, course_id):
-        """Calculate average rating for a course"""
-        pipeline = [
-            {'$match': {'course_id': ObjectId(course_id)}},
-            {'$group': {
-                '_id': '$course_id',
-                'average_rating': {'$avg': '$rating'},
-                'total_reviews': {'$sum': 1}
-            }}
-        ]
-        result = list(cls.collection.aggregate(pipeline))
-        if result:
-            return {
-                'average_rating': round(result[0]['average_rating'], 2),
-                'total_reviews': result[0]['total_reviews']
-            }
-        return {'average_rating': 0, 'total_reviews': 0}
+        """Average rating for a course (from the running aggregate)"""
+        return RatingAggregate.get_stats('course_reviews', course_id)
     
     def update(self, **kwargs):
-        """Update review"""
+        """Update review, applying any score change to the rating aggregate"""
         kwargs['updated_at'] = datetime.utcnow()
-        self.collection.update_one(
+        before = self.collection.find_one_and_update(
             {'_id': self._id},
-            {'$set': kwargs}
+            {'$set': kwargs},
+            return_document=ReturnDocument.BEFORE
         )
         for key, value in kwargs.items():
             setattr(self, key, value)
+        if before:
+            RatingAggregate.review_changed('course_reviews', self.course_id, before, kwargs)
+    
+    def delete(self):
+        """Delete review and remove its scores from the rating aggregate"""
+        deleted = self.collection.find_one_and_delete({'_id': self._id})
+        if deleted:
+            RatingAggregate.review_removed('course_reviews', self.course_id, deleted)
 
 
 class InstructorReview:
     """Student reviews and ratings for instructors"""
-    collection = db['instructor_reviews']
+    collection = LazyCollection('instructor_reviews')
+    OBJECT_ID_FIELDS = ('student_id', 'instructor_id', 'course_id')
+    INDEXES = [
+        IndexModel([('instructor_id', ASCENDING)]),
+        IndexModel([('student_id', ASCENDING), ('instructor_id', ASCENDING), ('course_id', ASCENDING)], unique=True),
+    ]
     
     def __init__(self, student_id, instructor_id, course_id, rating,
                  review_text="", teaching_quality=0, communication=0,
                  course_content=0, created_at=None, updated_at=None, _id=None):
         self._id = _id
-        self.student_id = ObjectId(student_id) if student_id else None
-        self.instructor_id = ObjectId(instructor_id) if instructor_id else None
-        self.course_id = ObjectId(course_id) if course_id else None
+        self.student_id = to_object_id(student_id)
+        self.instructor_id = to_object_id(instructor_id)
+        self.course_id = to_object_id(course_id)
         self.rating = rating  # Overall 1-5 stars
         self.review_text = review_text
         # Detailed ratings
@@ -297,61 +381,54 @@ class InstructorReview:
             'updated_at': review.updated_at
         })
         review._id = result.inserted_id
+        RatingAggregate.review_added('instructor_reviews', review.instructor_id, review.scores())
         return review
     
     @classmethod
     def find_by_instructor(cls, instructor_id):
         """Get all reviews for an instructor"""
-        cursor = cls.collection.find({'instructor_id': ObjectId(instructor_id)})
+        cursor = cls.collection.find({'instructor_id': id_filter(instructor_id)})
         return [cls(**data) for data in cursor]
     
     @classmethod
     def find_by_student_and_instructor(cls, student_id, instructor_id, course_id):
         """Check if student already reviewed this instructor for this course"""
         data = cls.collection.find_one({
-            'student_id': ObjectId(student_id),
-            'instructor_id': ObjectId(instructor_id),
-            'course_id': ObjectId(course_id)
+            'student_id': id_filter(student_id),
+            'instructor_id': id_filter(instructor_id),
+            'course_id': id_filter(course_id)
         })
         return cls(**data) if data else None
     
     @classmethod
     def get_instructor_average_rating(cls, instructor_id):
-        """Calculate average rating for an instructor"""
-        pipeline = [
-            {'$match': {'instructor_id': ObjectId(instructor_id)}},
-            {'$group': {
-                '_id': '$instructor_id',
-                'average_rating': {'$avg': '$rating'},
-                'average_teaching_quality': {'$avg': '$teaching_quality'},
-                'average_communication': {'$avg': '$communication'},
-                'average_course_content': {'$avg': '$course_content'},
-                'total_reviews': {'$sum': 1}
-            }}
-        ]
-        result = list(cls.collection.aggregate(pipeline))
-        if result:
-            return {
-                'average_rating': round(result[0]['average_rating'], 2),
-                'average_teaching_quality': round(result[0]['average_teaching_quality'], 2),
-                'average_communication': round(result[0]['average_communication'], 2),
-                'average_course_content': round(result[0]['average_course_content'], 2),
-                'total_reviews': result[0]['total_reviews']
-            }
+        """Average ratings for an instructor (from the running aggregate)"""
+        return RatingAggregate.get_stats('instructor_reviews', instructor_id)
+    
+    def scores(self):
+        """Scored fields of this review"""
         return {
-            'average_rating': 0,
-            'average_teaching_quality': 0,
-            'average_communication': 0,
-            'average_course_content': 0,
-            'total_reviews': 0
+            'rating': self.rating,
+            'teaching_quality': self.teaching_quality,
+            'communication': self.communication,
+            'course_content': self.course_content,
         }
     
     def update(self, **kwargs):
-        """Update review"""
+        """Update review, applying any score change to the rating aggregate"""
         kwargs['updated_at'] = datetime.utcnow()
-        self.collection.update_one(
+        before = self.collection.find_one_and_update(
             {'_id': self._id},
-            {'$set': kwargs}
+            {'$set': kwargs},
+            return_document=ReturnDocument.BEFORE
         )
         for key, value in kwargs.items():
             setattr(self, key, value)
+        if before:
+            RatingAggregate.review_changed('instructor_reviews', self.instructor_id, before, kwargs)
+    
+    def delete(self):
+        """Delete review and remove its scores from the rating aggregate"""
+        deleted = self.collection.find_one_and_delete({'_id': self._id})
+        if deleted:
+            RatingAggregate.review_removed('instructor_reviews', self.instructor_id, deleted)
@@ -0,0 +1,79 @@
+"""
+Course ownership and enrollment DRF permission classes
+Backed by small per-process indexes so repeated checks don't hit MongoDB:
+- course owner index: course_id -> instructor_id (a course never changes owner)
+- enrollment index: (student_id, course_id) for confirmed enrollments only,
+  so a new enrollment is seen on the very next request
+"""
+from bson.errors import InvalidId
+from django.conf import settings
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import BasePermission
+
+from config.local_cache import LocalTTLCache
+from courses.models import Course, Enrollment
+from users.permissions import is_admin
+
+COURSE_OWNER_CACHE_TTL = getattr(settings, 'COURSE_OWNER_CACHE_TTL', 600)
+ENROLLMENT_CACHE_TTL = getattr(settings, 'ENROLLMENT_CACHE_TTL', 300)
+
+course_owner_index = LocalTTLCache(ttl=COURSE_OWNER_CACHE_TTL, max_size=4096)
+enrollment_index = LocalTTLCache(ttl=ENROLLMENT_CACHE_TTL, max_size=16384)
+
+
+def get_course_owner_id(course_id):
+    """Get the instructor id (str) of a course, None if it doesn't exist"""
+    course_id = str(course_id)
+    try:
+        return course_owner_index.get_or_load(course_id, lambda: Course.find_instructor_id(course_id))
+    except InvalidId:
+        return None
+
+
+def user_owns_course(request, course_id):
+    """Check if the caller is the course instructor or an admin"""
+    if is_admin(request):
+        return True
+    owner_id = get_course_owner_id(course_id)
+    return owner_id is not None and owner_id == str(request.user.id)
+
+
+def is_enrolled(student_id, course_id):
+    """Check if a student is enrolled in a course"""
+    key = (str(student_id), str(course_id))
+    if enrollment_index.get(key):
+        return True
+    try:
+        enrolled = Enrollment.find_one(key[0], key[1]) is not None
+    except InvalidId:
+        return False
+    if enrolled:
+        enrollment_index.set(key, True)
+    return enrolled
+
+
+class IsCourseOwner(BasePermission):
+    """
+    Allow the instructor who owns the course in the URL (course_id kwarg), or an admin
+    Responds 404 if the course doesn't exist
+    """
+    message = 'You do not have permission to manage this course'
+
+    def has_permission(self, request, view):
+        course_id = view.kwargs.get('course_id')
+        if not course_id:
+            return False
+        if get_course_owner_id(course_id) is None:
+            raise NotFound('Course not found')
+        return user_owns_course(request, course_id)
+
+
+class IsEnrolled(BasePermission):
+    """Allow students enrolled in the course in the URL (course_id kwarg)"""
+    message = 'You must be enrolled in this course'
+
+    def has_permission(self, request, view):
+        course_id = view.kwargs.get('course_id')
+        if not course_id or not request.user or not request.user.is_authenticated:
+            return False
+        return is_enrolled(request.user.id, course_id)
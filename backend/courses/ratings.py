@@ -0,0 +1,201 @@
+"""
+Running rating aggregates
+Sums and counts of review scores per course / instructor, kept in the
+rating_aggregates collection and adjusted with $inc when a review is
+created, updated (by the score delta) or deleted, so averages are read
+with one find_one instead of a $group over every review.
+A target without an aggregate yet (reviews written before aggregates
+existed) is seeded from its review collection on first read or change.
+Rebuild from the review collections with: manage.py rebuild_rating_aggregates
+"""
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import IndexModel, ReturnDocument, ReplaceOne, ASCENDING
+
+from config.mongodb import LazyCollection, get_collection
+from config.ids import id_filter
+from courses.content_cache import invalidate_course_content
+
+# kind -> (review collection, field holding the rated target, scored fields)
+RATING_KINDS = {
+    'reviews': ('reviews', 'course_id', ('rating',)),
+    'course_reviews': ('course_reviews', 'course_id', ('rating',)),
+    'instructor_reviews': (
+        'instructor_reviews', 'instructor_id',
+        ('rating', 'teaching_quality', 'communication', 'course_content')
+    ),
+}
+
+# kind -> course document fields mirroring the statistics (shown in course listings)
+COURSE_MIRRORS = {
+    'reviews': {'rating': 'average_rating', 'reviews_count': 'total_reviews'},
+    'course_reviews': {'average_rating': 'average_rating', 'total_reviews': 'total_reviews'},
+}
+
+
+def _score(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class RatingAggregate:
+    """Sum/count of scores for one rated target"""
+    collection = LazyCollection('rating_aggregates')
+    INDEXES = [
+        IndexModel([('kind', ASCENDING), ('target_id', ASCENDING)]),
+    ]
+
+    @staticmethod
+    def key(kind, target_id):
+        return f'{kind}:{target_id}'
+
+    @classmethod
+    def fields(cls, kind):
+        return RATING_KINDS[kind][2]
+
+    @classmethod
+    def apply(cls, kind, target_id, scores, count=0):
+        """
+        Atomically add score deltas (and count delta) to a target's aggregate
+        Called after the review write; returns the updated statistics
+        """
+        if not cls.collection.find_one({'_id': cls.key(kind, target_id)}, {'_id': 1}):
+            # No aggregate yet: recount the target's reviews, which already include this change
+            return cls.to_stats(kind, cls.seed(kind, target_id))
+
+        inc = {f'sums.{field}': _score(scores.get(field)) for field in cls.fields(kind)}
+        inc['count'] = count
+        data = cls.collection.find_one_and_update(
+            {'_id': cls.key(kind, target_id)},
+            {
+                '$inc': inc,
+                '$set': {'updated_at': datetime.utcnow()},
+                '$setOnInsert': {'kind': kind, 'target_id': ObjectId(str(target_id))},
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        stats = cls.to_stats(kind, data)
+        cls.mirror(kind, target_id, stats)
+        return stats
+
+    @classmethod
+    def mirror(cls, kind, target_id, stats):
+        """Copy statistics onto the course document for kinds shown in listings"""
+        mirror = COURSE_MIRRORS.get(kind)
+        if mirror:
+            get_collection('courses').update_one(
+                {'_id': ObjectId(str(target_id))},
+                {'$set': {field: stats[stat] for field, stat in mirror.items()}}
+            )
+            invalidate_course_content(ObjectId(str(target_id)))
+
+    @classmethod
+    def review_added(cls, kind, target_id, review_scores):
+        return cls.apply(kind, target_id, review_scores, count=1)
+
+    @classmethod
+    def review_removed(cls, kind, target_id, review_scores):
+        return cls.apply(kind, target_id, {
+            field: -_score(review_scores.get(field)) for field in cls.fields(kind)
+        }, count=-1)
+
+    @classmethod
+    def review_changed(cls, kind, target_id, old_scores, new_scores):
+        """Apply the score delta of an edited review (count unchanged)"""
+        deltas = {}
+        for field in cls.fields(kind):
+            if field in new_scores:
+                deltas[field] = _score(new_scores[field]) - _score(old_scores.get(field))
+        if not any(deltas.values()):
+            return None
+        return cls.apply(kind, target_id, deltas)
+
+    @classmethod
+    def get_stats(cls, kind, target_id):
+        """Average scores and review count for a target (seeded on first read)"""
+        data = cls.collection.find_one({'_id': cls.key(kind, target_id)})
+        if data is None:
+            data = cls.seed(kind, target_id)
+        return cls.to_stats(kind, data)
+
+    @classmethod
+    def seed(cls, kind, target_id):
+        """
+        Create a missing aggregate from the target's reviews and mirror it
+        Targets without reviews get an empty aggregate, so they are counted once.
+        Returns the stored aggregate
+        """
+        key = cls.key(kind, target_id)
+        if not cls.rebuild(kind, target_id):
+            cls.collection.update_one(
+                {'_id': key},
+                {'$setOnInsert': {
+                    'kind': kind,
+                    'target_id': ObjectId(str(target_id)),
+                    'count': 0,
+                    'sums': {field: 0 for field in cls.fields(kind)},
+                    'updated_at': datetime.utcnow(),
+                }},
+                upsert=True
+            )
+            cls.mirror(kind, target_id, cls.to_stats(kind, None))
+        return cls.collection.find_one({'_id': key})
+
+    @classmethod
+    def to_stats(cls, kind, data):
+        count = (data or {}).get('count', 0)
+        sums = (data or {}).get('sums', {})
+        stats = {
+            f'average_{field}': round(sums.get(field, 0) / count, 2) if count > 0 else 0
+            for field in cls.fields(kind)
+        }
+        stats['total_reviews'] = max(count, 0)
+        return stats
+
+    @classmethod
+    def rebuild(cls, kind, target_id=None):
+        """Recompute aggregates of a kind from its review collection, returns the number written"""
+        review_collection, target_field, fields = RATING_KINDS[kind]
+
+        match = {target_field: {'$ne': None}}
+        if target_id:
+            match[target_field] = id_filter(target_id)
+        # Group legacy string ids with their ObjectId form
+        target = {'$convert': {'input': f'${target_field}', 'to': 'objectId', 'onError': None}}
+        group = {'_id': target, 'count': {'$sum': 1}}
+        for field in fields:
+            group[field] = {'$sum': {'$ifNull': [f'${field}', 0]}}
+
+        now = datetime.utcnow()
+        aggregates = {}
+        for row in get_collection(review_collection).aggregate([{'$match': match}, {'$group': group}]):
+            if row['_id'] is None:
+                continue
+            aggregates[cls.key(kind, row['_id'])] = {
+                'kind': kind,
+                'target_id': row['_id'],
+                'count': row['count'],
+                'sums': {field: row[field] for field in fields},
+                'updated_at': now,
+            }
+
+        # Targets that no longer have reviews
+        stale_query = {'kind': kind, '_id': {'$nin': list(aggregates)}}
+        if target_id:
+            stale_query['target_id'] = ObjectId(str(target_id))
+        stale = list(cls.collection.find(stale_query, {'target_id': 1}))
+        if stale:
+            cls.collection.delete_many({'_id': {'$in': [data['_id'] for data in stale]}})
+
+        if aggregates:
+            cls.collection.bulk_write([
+                ReplaceOne({'_id': key}, data, upsert=True) for key, data in aggregates.items()
+            ], ordered=False)
+
+        for data in list(aggregates.values()) + stale:
+            cls.mirror(kind, data['target_id'], cls.to_stats(kind, data if 'count' in data else None))
+        return len(aggregates)
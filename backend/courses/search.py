@@ -0,0 +1,51 @@
+"""
+Course catalog search helpers
+Full words go through the courses text index ($text, ranked by textScore);
+short inputs and partial words go through an anchored prefix match on
+title_normalized, a lowercased, accent-free copy of the title kept on
+every course document (see Course.create/update and manage.py
+rebuild_search_fields).
+"""
+import re
+import unicodedata
+
+from django.conf import settings
+
+# Inputs up to this many characters are treated as a title prefix
+PREFIX_MAX_LENGTH = getattr(settings, 'COURSE_SEARCH_PREFIX_MAX_LENGTH', 3)
+AUTOCOMPLETE_LIMIT = getattr(settings, 'COURSE_AUTOCOMPLETE_LIMIT', 10)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """Lowercase, strip accents and collapse whitespace ('  Écrire  du Code' -> 'ecrire du code')"""
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return _WHITESPACE.sub(' ', stripped).strip().lower()
+
+
+def prefix_filter(text):
+    """Index-friendly anchored match on title_normalized (None for empty input)"""
+    prefix = normalize_text(text)
+    if not prefix:
+        return None
+    return {'$regex': '^' + re.escape(prefix)}
+
+
+def use_prefix_search(text):
+    """Whether a search input is too short for word search"""
+    return len(normalize_text(text)) <= PREFIX_MAX_LENGTH
+
+
+def search_modes(text):
+    """
+    Search modes to try in order for an input: ('text', 'prefix') - partial
+    words ('pyth') aren't in the text index, so word search falls back to the
+    title prefix when it finds nothing - or ('prefix',) for short inputs
+    """
+    if not normalize_text(text):
+        return ()
+    return ('prefix',) if use_prefix_search(text) else ('text', 'prefix')
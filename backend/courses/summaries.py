@@ -0,0 +1,261 @@
+"""
+Materialized per-student learning summaries
+One student_summaries document per student with an entry per course
+(course card snapshot, completion, time spent, quizzes/assignments passed).
+Built from enrollments and progress on first read, then kept current by
+enrollment, lesson completion, heartbeats, quiz submission and assignment
+grading, so the learning dashboard is a single _id read.
+Rebuild with: manage.py rebuild_student_summaries
+"""
+from datetime import datetime
+
+from pymongo import IndexModel, UpdateOne, ASCENDING
+
+from config.mongodb import LazyCollection, get_collection
+from config.ids import to_object_id, id_filter
+from courses.models import Course, Enrollment
+from courses.models_progress import StudentProgress
+
+
+class StudentSummary:
+    """Learning summary document of one student"""
+    collection = LazyCollection('student_summaries')
+    INDEXES = [
+        IndexModel([('courses.course_id', ASCENDING)]),
+    ]
+
+    @staticmethod
+    def course_entry(course_id, course=None, enrollment=None, progress=None):
+        """Summary entry of one course"""
+        if progress:
+            completion = float(progress.completion_percentage or 0)
+        else:
+            completion = float(enrollment.progress or 0) if enrollment else 0.0
+        return {
+            'course_id': str(course_id),
+            'course': course,  # Course.find_summaries() card
+            'enrollment_id': str(enrollment.id) if enrollment and enrollment.id else None,
+            'enrolled_at': enrollment.enrolled_at if enrollment else None,
+            'completed': bool(enrollment.completed) if enrollment else False,
+            'certificate_issued': bool(enrollment.certificate_issued) if enrollment else False,
+            'completion_percentage': completion,
+            'lessons_completed_count': len(progress.lessons_completed) if progress else 0,
+            'time_spent_minutes': (progress.time_spent_minutes or 0) if progress else 0,
+            'last_accessed': progress.last_accessed if progress else None,
+            'quiz_attempts': 0,
+            'quizzes_passed': [],
+            'assignments_passed': [],
+        }
+
+    @classmethod
+    def build(cls, student_id):
+        """(Re)build a student's summary from enrollments, progress, quiz attempts and graded submissions"""
+        student_oid = to_object_id(student_id)
+        enrollments = {str(e.course_id): e for e in Enrollment.find_by_student(student_oid)}
+        progress = {str(p.course_id): p for p in StudentProgress.find_by_student(str(student_oid))}
+
+        course_ids = list(enrollments) + [course_id for course_id in progress if course_id not in enrollments]
+        courses = Course.find_summaries(course_ids)
+        # Enrollments in deleted courses are left out
+        entries = {
+            course_id: cls.course_entry(course_id, courses[course_id], enrollments.get(course_id), progress.get(course_id))
+            for course_id in course_ids if course_id in courses
+        }
+
+        quiz_rows = get_collection('quiz_attempts').aggregate([
+            {'$match': {'student_id': id_filter(student_oid)}},
+            {'$group': {
+                '_id': {'$toString': '$course_id'},
+                'attempts': {'$sum': 1},
+                'passed': {'$addToSet': {'$cond': ['$passed', {'$toString': '$quiz_id'}, None]}},
+            }},
+        ])
+        for row in quiz_rows:
+            if row['_id'] in entries:
+                entries[row['_id']]['quiz_attempts'] = row['attempts']
+                entries[row['_id']]['quizzes_passed'] = [quiz_id for quiz_id in row['passed'] if quiz_id]
+
+        assignment_rows = get_collection('assignment_submissions').aggregate([
+            {'$match': {'student_id': id_filter(student_oid), 'status': 'graded', 'passed': True}},
+            {'$group': {
+                '_id': {'$toString': '$course_id'},
+                'passed': {'$addToSet': {'$toString': '$assignment_id'}},
+            }},
+        ])
+        for row in assignment_rows:
+            if row['_id'] in entries:
+                entries[row['_id']]['assignments_passed'] = row['passed']
+
+        now = datetime.utcnow()
+        document = {'_id': student_oid, 'courses': list(entries.values()), 'updated_at': now}
+        cls.collection.replace_one({'_id': student_oid}, document, upsert=True)
+        return document
+
+    @classmethod
+    def get(cls, student_id):
+        """Get a student's summary document, building it on first use"""
+        data = cls.collection.find_one({'_id': to_object_id(student_id)})
+        return data or cls.build(student_id)
+
+    @staticmethod
+    def to_response(data):
+        """Dashboard payload: one entry per course plus totals"""
+        entries = []
+        totals = {'time_spent_minutes': 0, 'lessons_completed': 0, 'quizzes_completed': 0, 'assignments_completed': 0}
+        completion_sum = 0.0
+        for course_entry in data.get('courses', []):
+            course = course_entry.get('course') or {}
+            entry = {key: value for key, value in course_entry.items() if key not in ('quizzes_passed', 'assignments_passed')}
+            entry.update({
+                'course_title': course.get('title') or 'Course',
+                'course_thumbnail': course.get('thumbnail') or None,
+                'quizzes_completed_count': len(course_entry.get('quizzes_passed') or []),
+                'assignments_completed_count': len(course_entry.get('assignments_passed') or []),
+                'time_spent_hours': round((course_entry.get('time_spent_minutes') or 0) / 60, 2),
+                'enrolled_at': course_entry['enrolled_at'].isoformat() if course_entry.get('enrolled_at') else None,
+                'last_accessed': course_entry['last_accessed'].isoformat() if course_entry.get('last_accessed') else None,
+            })
+            totals['time_spent_minutes'] += entry.get('time_spent_minutes') or 0
+            totals['lessons_completed'] += entry.get('lessons_completed_count') or 0
+            totals['quizzes_completed'] += entry['quizzes_completed_count']
+            totals['assignments_completed'] += entry['assignments_completed_count']
+            completion_sum += entry.get('completion_percentage') or 0
+            entries.append(entry)
+
+        totals['time_spent_hours'] = round(totals['time_spent_minutes'] / 60, 2)
+        totals['average_completion_percentage'] = round(completion_sum / len(entries), 1) if entries else 0.0
+        return {
+            'progress': entries,
+            'total_courses': len(entries),
+            'totals': totals,
+            'updated_at': data['updated_at'].isoformat() if data.get('updated_at') else None,
+        }
+
+    # Incremental updates - documents that don't exist yet are skipped, they are built on first read.
+    # Failures are logged only: the summary can always be rebuilt from the source collections.
+
+    @classmethod
+    def _update_course(cls, student_id, course_id, update):
+        update.setdefault('$set', {})['updated_at'] = datetime.utcnow()
+        try:
+            cls.collection.update_one(
+                {'_id': to_object_id(student_id), 'courses.course_id': str(course_id)},
+                update
+            )
+        except Exception as e:
+            print(f"⚠️ Could not update learning summary of {student_id}: {str(e)}")
+
+    @classmethod
+    def course_enrolled(cls, enrollment, course=None):
+        """Add a course entry after enrollment"""
+        course_id = str(enrollment.course_id)
+        try:
+            if course is None:
+                course = Course.find_summaries([course_id]).get(course_id)
+            cls.collection.update_one(
+                {'_id': to_object_id(enrollment.student_id), 'courses.course_id': {'$ne': course_id}},
+                {
+                    '$push': {'courses': cls.course_entry(course_id, course, enrollment)},
+                    '$set': {'updated_at': datetime.utcnow()},
+                }
+            )
+        except Exception as e:
+            print(f"⚠️ Could not update learning summary of {enrollment.student_id}: {str(e)}")
+
+    @classmethod
+    def enrollment_changed(cls, enrollment):
+        """
+        Copy the completion/certificate flags of an updated enrollment, and its
+        progress when the student has no StudentProgress record (as course_entry does)
+        """
+        fields = {
+            'courses.$.completed': bool(enrollment.completed),
+            'courses.$.certificate_issued': bool(enrollment.certificate_issued),
+        }
+        try:
+            has_progress = StudentProgress.collection.count_documents({
+                'student_id': id_filter(enrollment.student_id),
+                'course_id': id_filter(enrollment.course_id),
+            }, limit=1)
+            if not has_progress:
+                fields['courses.$.completion_percentage'] = float(enrollment.progress or 0)
+        except Exception as e:
+            print(f"⚠️ Could not check progress of {enrollment.student_id}: {str(e)}")
+        cls._update_course(enrollment.student_id, enrollment.course_id, {'$set': fields})
+
+    @classmethod
+    def progress_changed(cls, student_id, course_id, progress):
+        """Copy completion and time spent from a StudentProgress record"""
+        cls._update_course(student_id, course_id, {'$set': {
+            'courses.$.completion_percentage': float(progress.completion_percentage or 0),
+            'courses.$.lessons_completed_count': len(progress.lessons_completed or []),
+            'courses.$.time_spent_minutes': progress.time_spent_minutes or 0,
+            'courses.$.last_accessed': progress.last_accessed,
+        }})
+
+    @classmethod
+    def quiz_submitted(cls, student_id, course_id, quiz_id, passed):
+        update = {'$inc': {'courses.$.quiz_attempts': 1}}
+        if passed:
+            update['$addToSet'] = {'courses.$.quizzes_passed': str(quiz_id)}
+        cls._update_course(student_id, course_id, update)
+
+    @classmethod
+    def assignment_graded(cls, student_id, course_id, assignment_id, passed):
+        """Called after the submission is graded; a failed grade keeps another passed submission's pass"""
+        if passed:
+            update = {'$addToSet': {'courses.$.assignments_passed': str(assignment_id)}}
+        else:
+            still_passed = get_collection('assignment_submissions').count_documents({
+                'student_id': id_filter(student_id),
+                'assignment_id': id_filter(assignment_id),
+                'status': 'graded',
+                'passed': True,
+            }, limit=1)
+            if still_passed:
+                return
+            update = {'$pull': {'courses.$.assignments_passed': str(assignment_id)}}
+        cls._update_course(student_id, course_id, update)
+
+    @staticmethod
+    def time_spent_operation(student_id, course_id, minutes, last_seen):
+        """Bulk write operation adding heartbeat time (see courses.heartbeats)"""
+        return UpdateOne(
+            {'_id': to_object_id(student_id), 'courses.course_id': str(course_id)},
+            {
+                '$inc': {'courses.$.time_spent_minutes': minutes},
+                '$max': {'courses.$.last_accessed': last_seen},
+            }
+        )
+
+    @classmethod
+    def course_changed(cls, course_id):
+        """Refresh the course card snapshot in every summary holding the course (removed if it is gone)"""
+        course_id = str(course_id)
+        try:
+            course = Course.find_summaries([course_id]).get(course_id)
+            if not course:
+                cls.course_removed(course_id)
+                return
+            cls.collection.update_many(
+                {'courses.course_id': course_id},
+                {'$set': {'courses.$[entry].course': course}},
+                array_filters=[{'entry.course_id': course_id}]
+            )
+        except Exception as e:
+            print(f"⚠️ Could not refresh learning summaries of course {course_id}: {str(e)}")
+
+    @classmethod
+    def course_removed(cls, course_id):
+        """Drop a deleted course's entry from every summary holding it"""
+        course_id = str(course_id)
+        try:
+            cls.collection.update_many(
+                {'courses.course_id': course_id},
+                {
+                    '$pull': {'courses': {'course_id': course_id}},
+                    '$set': {'updated_at': datetime.utcnow()},
+                }
+            )
+        except Exception as e:
+            print(f"⚠️ Could not remove course {course_id} from learning summaries: {str(e)}")
@@ -13,7 +13,10 @@ from courses.views import (
     InstructorCoursesView,
     CourseModulesView,
     ModuleLessonsView,
-    LessonDetailView
+    LessonDetailView,
+    CoursePageBundleView,
+    CourseAutocompleteView,
+    CourseCatalogView
 )
 from courses.views_instructor import (
     create_course,
@@ -56,7 +59,9 @@ from courses.views_ai import (
 from courses.views_progress import (
     get_student_progress,
     get_all_student_progress,
+    get_learning_summary,
     update_lesson_progress,
+    record_learning_heartbeats,
     get_course_status,
     submit_course_review,
     get_course_reviews,
@@ -114,10 +119,14 @@ urlpatterns = [
     # Course CRUD
     path('', CourseListView.as_view(), name='course-list'),
     path('featured/', FeaturedCoursesView.as_view(), name='featured-courses'),
+    path('autocomplete/', CourseAutocompleteView.as_view(), name='course-autocomplete'),
+    path('catalog/', CourseCatalogView.as_view(), name='course-catalog'),
     
     # Specific patterns MUST come before generic <str:course_id>
     path('my/enrollments/', MyEnrollmentsView.as_view(), name='my-enrollments'),
     path('progress/my/', get_all_student_progress, name='my-progress'),
+    path('progress/summary/', get_learning_summary, name='learning-summary'),
+    path('progress/heartbeat/', record_learning_heartbeats, name='learning-heartbeat'),
     path('module/<str:module_id>/lessons/', ModuleLessonsView.as_view(), name='module-lessons'),
     path('lesson/<str:lesson_id>/', LessonDetailView.as_view(), name='lesson-detail'),
     path('lesson/<str:lesson_id>/complete/', update_lesson_progress, name='complete-lesson'),
@@ -126,6 +135,7 @@ urlpatterns = [
     # Generic course patterns (MUST come after specific patterns)
     path('<str:course_id>/', CourseDetailView.as_view(), name='course-detail'),
     path('<str:course_id>/modules/', CourseModulesView.as_view(), name='course-modules'),
+    path('<str:course_id>/page/', CoursePageBundleView.as_view(), name='course-page-bundle'),
     path('<str:course_id>/enroll/', EnrollCourseView.as_view(), name='enroll-course'),
     path('<str:course_id>/progress/', UpdateProgressView.as_view(), name='update-progress'),
     path('<str:course_id>/status/', get_course_status, name='course-status'),
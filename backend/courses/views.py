@@ -15,6 +15,14 @@ from courses.serializers import (
     UpdateProgressSerializer
 )
 from users.models import User
+from users.loaders import get_user_loader
+from users.permissions import get_request_role
+from courses.permissions import is_enrolled
+from courses.summaries import StudentSummary
+from config.pagination import InvalidCursor, get_page_params
+from courses.search import AUTOCOMPLETE_LIMIT, search_modes
+from courses.catalog import catalog_cache, cache_key, normalize_filters, run_catalog_query
+from config.conditional import ConditionalGetMixin, latest
 
 
 class CourseListView(APIView):
@@ -22,15 +30,20 @@ class CourseListView(APIView):
     permission_classes = [AllowAny]
     
     def get(self, request):
-        """Get all courses with optional filters"""
+        """
+        Get all courses with optional filters
+        search runs a relevance-ranked text search (one page of the best matches);
+        short inputs and partial words match the start of the title instead
+        """
         try:
             # Get query parameters
             category = request.query_params.get('category')
             difficulty = request.query_params.get('difficulty')
             is_featured = request.query_params.get('featured')
-            search = request.query_params.get('search')
-            skip = int(request.query_params.get('skip', 0))
-            limit = int(request.query_params.get('limit', 20))
+            search = (request.query_params.get('search') or '').strip()
+            min_price = request.query_params.get('min_price')
+            max_price = request.query_params.get('max_price')
+            cursor, limit = get_page_params(request.query_params, default_limit=20)
             
             # Build filters - use 'published' which is the actual field name in DB
             filters = {'published': True}
@@ -41,20 +54,42 @@ class CourseListView(APIView):
                 filters['level'] = difficulty
             if is_featured:
                 filters['is_featured'] = is_featured.lower() == 'true'
-            if search:
-                filters['$or'] = [
-                    {'title': {'$regex': search, '$options': 'i'}},
-                    {'description': {'$regex': search, '$options': 'i'}}
-                ]
-            
-            courses = Course.find_all(filters, skip, limit)
+            try:
+                price = {}
+                if min_price:
+                    price['$gte'] = float(min_price)
+                if max_price:
+                    price['$lte'] = float(max_price)
+            except ValueError:
+                return Response({
+                    'error': 'min_price and max_price must be numbers'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if price:
+                filters['price'] = price
+            
+            search_mode = None
+            if not search:
+                courses, next_cursor = Course.find_page(filters, limit, cursor)
+            else:
+                courses, next_cursor = [], None
+                # Text search isn't paged, so a cursor always continues a prefix search
+                for search_mode in (('prefix',) if cursor else search_modes(search)):
+                    if search_mode == 'text':
+                        courses = Course.search(search, filters, limit)
+                    else:
+                        courses, next_cursor = Course.find_page_by_title_prefix(search, filters, limit, cursor)
+                    if courses:
+                        break
+            
+            # Get instructor details for each course (one batched query)
+            users = get_user_loader(request)
+            users.prime(course.instructor_id for course in courses)
             
-            # Get instructor details for each course
             courses_data = []
             for course in courses:
                 course_dict = course.to_dict()
                 if course.instructor_id:
-                    instructor = User.find_by_id(course.instructor_id)
+                    instructor = users.load(course.instructor_id)
                     if instructor:
                         course_dict['instructor'] = {
                             'id': str(instructor.id),
@@ -66,9 +101,13 @@ class CourseListView(APIView):
             
             return Response({
                 'count': len(courses_data),
-                'courses': courses_data
+                'courses': courses_data,
+                'next_cursor': next_cursor,
+                'search_mode': search_mode
             }, status=status.HTTP_200_OK)
             
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({
                 'error': 'Failed to fetch courses',
@@ -80,9 +119,8 @@ class CourseListView(APIView):
         try:
             # Check if user is instructor
             user_id = str(request.user.id)
-            user = User.find_by_id(user_id)
             
-            if not user or user.role not in ['instructor', 'admin']:
+            if get_request_role(request) not in ['instructor', 'admin']:
                 return Response({
                     'error': 'Only instructors can create courses'
                 }, status=status.HTTP_403_FORBIDDEN)
@@ -109,10 +147,20 @@ class CourseListView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class CourseDetailView(APIView):
+class CourseDetailView(ConditionalGetMixin, APIView):
     """Get, update, or delete a specific course"""
     permission_classes = [AllowAny]
     
+    def get_validators(self, request, course_id):
+        """Course version (cached) and its latest review change"""
+        course = Course.find_by_id(course_id)
+        if not course:
+            return None
+        reviews_updated_at = Review.find_latest_update(course.id)
+        parts = (str(course.id), course.updated_at, course.enrolled_count, course.rating,
+                 course.reviews_count, reviews_updated_at)
+        return parts, latest(course.updated_at, reviews_updated_at)
+    
     def get(self, request, course_id):
         """Get course details"""
         try:
@@ -172,6 +220,7 @@ class CourseDetailView(APIView):
             
             if serializer.is_valid():
                 course.update(**serializer.validated_data)
+                StudentSummary.course_changed(course_id)
                 
                 return Response({
                     'message': 'Course updated successfully',
@@ -226,8 +275,7 @@ class EnrollCourseView(APIView):
             student_id = str(request.user.id)
             
             # Check if user is an instructor
-            user = User.find_by_id(student_id)
-            if user and user.role == 'instructor':
+            if get_request_role(request) == 'instructor':
                 return Response({
                     'error': 'Instructors cannot enroll in courses. You can only create and manage courses.'
                 }, status=status.HTTP_403_FORBIDDEN)
@@ -253,7 +301,8 @@ class EnrollCourseView(APIView):
             )
             
             # Update course enrolled count
-            course.update(enrolled_count=course.enrolled_count + 1)
+            Course.increment_enrolled_count(course.id)
+            StudentSummary.course_enrolled(enrollment)
             
             return Response({
                 'message': 'Successfully enrolled in course',
@@ -277,14 +326,20 @@ class MyEnrollmentsView(APIView):
             student_id = str(request.user.id)
             enrollments = Enrollment.find_by_student(student_id)
             
+            # Course summaries and instructors for all enrollments (one query each)
+            courses = Course.find_summaries(
+                (enrollment.course_id for enrollment in enrollments),
+                users=get_user_loader(request)
+            )
+            
             enrollments_data = []
             for enrollment in enrollments:
                 enrollment_dict = enrollment.to_dict()
                 
                 # Get course details
-                course = Course.find_by_id(enrollment.course_id)
+                course = courses.get(str(enrollment.course_id))
                 if course:
-                    enrollment_dict['course'] = course.to_dict()
+                    enrollment_dict['course'] = course
                 
                 enrollments_data.append(enrollment_dict)
             
@@ -326,6 +381,7 @@ class UpdateProgressView(APIView):
                     update_data['completed_at'] = datetime.utcnow()
                 
                 enrollment.update(**update_data)
+                StudentSummary.enrollment_changed(enrollment)
                 
                 return Response({
                     'message': 'Progress updated successfully',
@@ -350,12 +406,15 @@ class CourseReviewsView(APIView):
         try:
             reviews = Review.find_by_course(course_id)
             
+            users = get_user_loader(request)
+            users.prime(review.student_id for review in reviews)
+            
             reviews_data = []
             for review in reviews:
                 review_dict = review.to_dict()
                 
                 # Get student details
-                student = User.find_by_id(review.student_id)
+                student = users.load(review.student_id)
                 if student:
                     review_dict['student'] = {
                         'id': str(student.id),
@@ -382,8 +441,7 @@ class CourseReviewsView(APIView):
             student_id = str(request.user.id)
             
             # Check if enrolled
-            enrollment = Enrollment.find_one(student_id, course_id)
-            if not enrollment:
+            if not is_enrolled(student_id, course_id):
                 return Response({
                     'error': 'Must be enrolled to review this course'
                 }, status=status.HTTP_403_FORBIDDEN)
@@ -395,18 +453,9 @@ class CourseReviewsView(APIView):
                 review_data['student_id'] = ObjectId(student_id)
                 review_data['course_id'] = ObjectId(course_id)
                 
+                # Course rating and reviews_count are updated from the running aggregate
                 review = Review.create(**review_data)
                 
-                # Update course rating
-                all_reviews = Review.find_by_course(course_id)
-                avg_rating = sum(r.rating for r in all_reviews) / len(all_reviews)
-                
-                course = Course.find_by_id(course_id)
-                course.update(
-                    rating=avg_rating,
-                    reviews_count=len(all_reviews)
-                )
-                
                 return Response({
                     'message': 'Review created successfully',
                     'review': review.to_dict()
@@ -431,13 +480,16 @@ class FeaturedCoursesView(APIView):
             limit = int(request.query_params.get('limit', 6))
             courses = Course.find_featured(limit)
             
+            users = get_user_loader(request)
+            users.prime(course.instructor_id for course in courses)
+            
             courses_data = []
             for course in courses:
                 course_dict = course.to_dict()
                 
                 # Get instructor details
                 if course.instructor_id:
-                    instructor = User.find_by_id(course.instructor_id)
+                    instructor = users.load(course.instructor_id)
                     if instructor:
                         course_dict['instructor'] = {
                             'id': str(instructor.id),
@@ -459,6 +511,85 @@ class FeaturedCoursesView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class CourseCatalogView(APIView):
+    """
+    A page of published courses with facet counts (category, level, language,
+    price band, rating band) from one $facet aggregation, cached per filter set
+    """
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        try:
+            cursor, limit = get_page_params(request.query_params, default_limit=20)
+            filters = normalize_filters(request.query_params)
+            key = cache_key(filters, limit, cursor)
+            
+            data = catalog_cache.get(key)
+            if data is None:
+                result = run_catalog_query(filters, limit, cursor)
+                courses = [Course(**course) for course in result['courses']]
+                
+                users = get_user_loader(request)
+                users.prime(course.instructor_id for course in courses)
+                
+                courses_data = []
+                for course in courses:
+                    course_dict = course.to_dict()
+                    if course.instructor_id:
+                        instructor = users.load(course.instructor_id)
+                        if instructor:
+                            course_dict['instructor'] = {
+                                'id': str(instructor.id),
+                                'name': f"{instructor.first_name} {instructor.last_name}",
+                                'profile_image': instructor.profile_image
+                            }
+                    courses_data.append(course_dict)
+                
+                data = {
+                    'count': len(courses_data),
+                    'total': result['total'],
+                    'courses': courses_data,
+                    'next_cursor': result['next_cursor'],
+                    'facets': result['facets'],
+                    'search_mode': result['search_mode'],
+                    'filters': {name: value for name, value in filters.items() if value is not None}
+                }
+                catalog_cache.set(key, data)
+            
+            return Response(data, status=status.HTTP_200_OK)
+            
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({
+                'error': 'Failed to fetch catalog',
+                'detail': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class CourseAutocompleteView(APIView):
+    """Published course titles starting with ?q= (for search-as-you-type)"""
+    permission_classes = [AllowAny]
+    
+    def get(self, request):
+        try:
+            query = (request.query_params.get('q') or '').strip()
+            if not query:
+                return Response({'count': 0, 'suggestions': []}, status=status.HTTP_200_OK)
+            
+            suggestions = Course.autocomplete(query, limit=AUTOCOMPLETE_LIMIT)
+            return Response({
+                'count': len(suggestions),
+                'suggestions': suggestions
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            return Response({
+                'error': 'Failed to fetch suggestions',
+                'detail': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class InstructorCoursesView(APIView):
     """Get courses by instructor"""
     permission_classes = [AllowAny]
@@ -482,10 +613,19 @@ class InstructorCoursesView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class CourseModulesView(APIView):
+class CourseModulesView(ConditionalGetMixin, APIView):
     """Get modules for a course (public view)"""
     permission_classes = [AllowAny]
     
+    def get_validators(self, request, course_id):
+        from courses.extended_models import Module
+        
+        if not Course.find_by_id(course_id):
+            return None
+        modules = Module.find_by_course(course_id)
+        parts = (str(course_id), [(str(module.id), module.updated_at) for module in modules])
+        return parts, latest(*[module.updated_at for module in modules])
+    
     def get(self, request, course_id):
         """Get all modules for a course"""
         try:
@@ -514,10 +654,19 @@ class CourseModulesView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class ModuleLessonsView(APIView):
+class ModuleLessonsView(ConditionalGetMixin, APIView):
     """Get lessons for a module (public view - titles only unless enrolled)"""
     permission_classes = [AllowAny]
     
+    def get_validators(self, request, module_id):
+        from courses.extended_models import Module, Lesson
+        
+        if not Module.find_by_id(module_id):
+            return None
+        lessons = Lesson.find_by_module(module_id)
+        parts = (str(module_id), [(str(lesson.id), lesson.updated_at) for lesson in lessons])
+        return parts, latest(*[lesson.updated_at for lesson in lessons])
+    
     def get(self, request, module_id):
         """Get all lessons for a module"""
         try:
@@ -546,9 +695,22 @@ class ModuleLessonsView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class LessonDetailView(APIView):
+class LessonDetailView(ConditionalGetMixin, APIView):
     """Get lesson details (requires enrollment)"""
     permission_classes = [IsAuthenticated]
+    cache_control = {'private': True, 'no_cache': True}
+    
+    def get_validators(self, request, lesson_id):
+        """Lesson version, only for callers allowed to see it"""
+        from courses.extended_models import Lesson, Module
+        
+        lesson = Lesson.find_by_id(lesson_id)
+        module = Module.find_by_id(str(lesson.module_id)) if lesson else None
+        if not module:
+            return None
+        if not lesson.is_free_preview and not is_enrolled(str(request.user.id), str(module.course_id)):
+            return None
+        return (str(lesson.id), lesson.updated_at), lesson.updated_at
     
     def get(self, request, lesson_id):
         """Get lesson content"""
@@ -573,8 +735,7 @@ class LessonDetailView(APIView):
             student_id = str(request.user.id)
             course_id = str(module.course_id)
             
-            enrollment = Enrollment.find_one(student_id, course_id)
-            if not enrollment and not lesson.is_free_preview:
+            if not lesson.is_free_preview and not is_enrolled(student_id, course_id):
                 return Response({
                     'error': 'You must be enrolled to access this lesson'
                 }, status=status.HTTP_403_FORBIDDEN)
@@ -589,3 +750,73 @@ class LessonDetailView(APIView):
                 'error': 'Failed to fetch lesson',
                 'detail': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class CoursePageBundleView(APIView):
+    """Everything the course page needs in one response (public, enrollment state if logged in)"""
+    permission_classes = [AllowAny]
+    
+    def get(self, request, course_id):
+        """Get course, modules with lessons and quiz ids, enrollment and progress"""
+        try:
+            from courses.extended_models import Module, Lesson
+            from courses.models_progress import StudentProgress
+            
+            student_id = None
+            if request.user and request.user.is_authenticated:
+                student_id = str(request.user.id)
+            
+            bundle = Course.find_page_bundle(course_id, student_id=student_id)
+            if not bundle:
+                return Response({
+                    'error': 'Course not found'
+                }, status=status.HTTP_404_NOT_FOUND)
+            
+            modules_data = bundle.pop('modules', [])
+            instructors = bundle.pop('instructor', [])
+            reviews = bundle.pop('reviews', [])
+            enrollments = bundle.pop('enrollment', [])
+            progress_records = bundle.pop('progress', [])
+            
+            course_dict = Course(**bundle).to_dict()
+            if instructors:
+                instructor = instructors[0]
+                course_dict['instructor'] = {
+                    'id': str(instructor['_id']),
+                    'name': f"{instructor.get('first_name', '')} {instructor.get('last_name', '')}",
+                    'email': instructor.get('email'),
+                    'bio': instructor.get('bio', ''),
+                    'profile_image': instructor.get('profile_image', '')
+                }
+            course_dict['reviews'] = [Review(**review).to_dict() for review in reviews]
+            
+            modules = []
+            for module_data in modules_data:
+                lessons = []
+                for lesson_data in module_data.pop('lessons', []):
+                    quizzes = lesson_data.pop('quiz', [])
+                    lesson_dict = Lesson(**lesson_data).to_dict()
+                    lesson_dict['quiz_id'] = str(quizzes[0]['_id']) if quizzes else None
+                    lesson_dict['quiz_published'] = bool(quizzes and quizzes[0].get('is_published'))
+                    lessons.append(lesson_dict)
+                
+                module_dict = Module(**module_data).to_dict()
+                module_dict['lessons'] = lessons
+                modules.append(module_dict)
+            
+            enrollment = Enrollment(**enrollments[0]).to_dict() if enrollments else None
+            progress = StudentProgress(**progress_records[0]).to_dict() if progress_records else None
+            
+            return Response({
+                'course': course_dict,
+                'modules': modules,
+                'is_enrolled': enrollment is not None,
+                'enrollment': enrollment,
+                'progress': progress
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            return Response({
+                'error': 'Failed to fetch course page',
+                'detail': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
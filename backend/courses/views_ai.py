@@ -9,21 +9,17 @@ from rest_framework import status
 from courses.extended_models import Lesson, Quiz, Assignment
 from courses.models import Course
 from courses.ai_helpers import generate_quiz_questions, generate_assignment_questions
-from users.models import User
+from users.permissions import IsInstructor
+from courses.permissions import IsCourseOwner
 
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructor])
 def generate_quiz_ai(request, lesson_id):
     """
     Generate quiz questions using AI based on lesson content
     Instructor only
     """
-    user = User.find_by_id(str(request.user.id))
-    if not user or user.role != 'instructor':
-        return Response({'error': 'Only instructors can generate quizzes'}, 
-                       status=status.HTTP_403_FORBIDDEN)
-    
     # Verify lesson exists
     lesson = Lesson.find_by_id(lesson_id)
     if not lesson:
@@ -70,17 +66,12 @@ def generate_quiz_ai(request, lesson_id):
 
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructor])
 def create_quiz_from_ai(request, lesson_id):
     """
     Create a quiz from AI-generated questions
     Instructor only
     """
-    user = User.find_by_id(str(request.user.id))
-    if not user or user.role != 'instructor':
-        return Response({'error': 'Only instructors can create quizzes'}, 
-                       status=status.HTTP_403_FORBIDDEN)
-    
     # Verify lesson exists
     lesson = Lesson.find_by_id(lesson_id)
     if not lesson:
@@ -98,9 +89,10 @@ def create_quiz_from_ai(request, lesson_id):
                        status=status.HTTP_400_BAD_REQUEST)
     
     # Create quiz
+    course_id = lesson.get_course_id()
     quiz_data = {
         'lesson_id': str(lesson_id),
-        'course_id': str(lesson.course_id),
+        'course_id': str(course_id) if course_id else None,
         'instructor_id': str(str(request.user.id)),
         'title': title,
         'description': description,
@@ -120,26 +112,17 @@ def create_quiz_from_ai(request, lesson_id):
 
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructor, IsCourseOwner])
 def generate_assignment_ai(request, course_id):
     """
     Generate assignment questions using AI based on course content
     Instructor only
     """
-    user = User.find_by_id(str(request.user.id))
-    if not user or user.role != 'instructor':
-        return Response({'error': 'Only instructors can generate assignments'}, 
-                       status=status.HTTP_403_FORBIDDEN)
-    
-    # Verify course exists and instructor owns it
+    # Course ownership is checked by IsCourseOwner
     course = Course.find_by_id(course_id)
     if not course:
         return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    if str(course.instructor_id) != str(str(request.user.id)):
-        return Response({'error': 'You do not have permission to create assignments for this course'}, 
-                       status=status.HTTP_403_FORBIDDEN)
-    
     # Get parameters from request
     assignment_type = request.data.get('assignment_type', 'written')
     num_questions = request.data.get('num_questions', 5)
@@ -165,26 +148,17 @@ def generate_assignment_ai(request, course_id):
 
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructor, IsCourseOwner])
 def create_assignment_from_ai(request, course_id):
     """
     Create an assignment from AI-generated content
     Instructor only
     """
-    user = User.find_by_id(str(request.user.id))
-    if not user or user.role != 'instructor':
-        return Response({'error': 'Only instructors can create assignments'}, 
-                       status=status.HTTP_403_FORBIDDEN)
-    
-    # Verify course exists and instructor owns it
+    # Course ownership is checked by IsCourseOwner
     course = Course.find_by_id(course_id)
     if not course:
         return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    if str(course.instructor_id) != str(str(request.user.id)):
-        return Response({'error': 'You do not have permission to create assignments for this course'}, 
-                       status=status.HTTP_403_FORBIDDEN)
-    
     # Get assignment data from request
     title = request.data.get('title', f'Assignment: {course.title}')
     description = request.data.get('description', '')
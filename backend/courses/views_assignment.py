@@ -9,29 +9,18 @@ from datetime import datetime
 from bson import ObjectId
 
 from courses.extended_models import Assignment, AssignmentSubmission, QuizAttempt, Quiz
-from courses.models import Course
 from courses.serializers import AssignmentSerializer, AssignmentSubmissionSerializer, GradeAssignmentSerializer
-from users.models import User
+from users.loaders import get_user_loader
+from users.permissions import IsInstructor, get_request_role
+from courses.permissions import IsCourseOwner
+from courses.summaries import StudentSummary
+from config.pagination import InvalidCursor, get_page_params
 
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructor, IsCourseOwner])
 def create_assignment(request, course_id):
     """Create an assignment for a course (Instructor only)"""
-    user = User.find_by_id(str(request.user.id))
-    if not user or user.role != 'instructor':
-        return Response({'error': 'Only instructors can create assignments'}, 
-                       status=status.HTTP_403_FORBIDDEN)
-    
-    # Verify course exists and instructor owns it
-    course = Course.find_by_id(course_id)
-    if not course:
-        return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
-    
-    if str(course.instructor_id) != str(str(request.user.id)):
-        return Response({'error': 'You do not have permission to create assignments for this course'}, 
-                       status=status.HTTP_403_FORBIDDEN)
-    
     serializer = AssignmentSerializer(data=request.data)
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -47,14 +36,9 @@ def create_assignment(request, course_id):
 
 
 @api_view(['GET', 'PUT', 'DELETE'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructor])
 def manage_assignment(request, assignment_id):
     """Get, update, or delete an assignment (Instructor only)"""
-    user = User.find_by_id(str(request.user.id))
-    if not user or user.role != 'instructor':
-        return Response({'error': 'Only instructors can manage assignments'}, 
-                       status=status.HTTP_403_FORBIDDEN)
-    
     assignment = Assignment.find_by_id(assignment_id)
     if not assignment:
         return Response({'error': 'Assignment not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -88,8 +72,7 @@ def get_course_assignments(request, course_id):
     assignments = Assignment.find_by_course(course_id)
     
     # For students, only show published assignments
-    user = User.find_by_id(str(request.user.id))
-    is_instructor = user and user.role == 'instructor'
+    is_instructor = get_request_role(request) == 'instructor'
     
     if not is_instructor:
         assignments = [a for a in assignments if a.is_published]
@@ -110,14 +93,12 @@ def get_assignment_detail(request, assignment_id):
         return Response({'error': 'Assignment not found'}, status=status.HTTP_404_NOT_FOUND)
     
     if not assignment.is_published:
-        user = User.find_by_id(str(request.user.id))
-        if not user or user.role != 'instructor' or str(assignment.instructor_id) != str(str(request.user.id)):
+        if get_request_role(request) != 'instructor' or str(assignment.instructor_id) != str(str(request.user.id)):
             return Response({'error': 'This assignment is not published yet'}, 
                            status=status.HTTP_400_BAD_REQUEST)
     
     # Check if student is instructor
-    user = User.find_by_id(str(request.user.id))
-    is_instructor = user and user.role == 'instructor'
+    is_instructor = get_request_role(request) == 'instructor'
     
     assignment_data = assignment.to_dict()
     
@@ -254,14 +235,9 @@ def submit_assignment(request, assignment_id):
 
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructor])
 def grade_assignment(request, submission_id):
     """Grade an assignment submission (Instructor only)"""
-    user = User.find_by_id(str(request.user.id))
-    if not user or user.role != 'instructor':
-        return Response({'error': 'Only instructors can grade assignments'}, 
-                       status=status.HTTP_403_FORBIDDEN)
-    
     submission = AssignmentSubmission.find_by_id(submission_id)
     if not submission:
         return Response({'error': 'Submission not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -296,18 +272,26 @@ def grade_assignment(request, submission_id):
         graded_by=ObjectId(str(request.user.id)),
         graded_at=datetime.utcnow()
     )
+    StudentSummary.assignment_graded(
+        submission.student_id, submission.course_id or assignment.course_id,
+        submission.assignment_id, passed
+    )
     
     return Response(submission.to_dict())
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructor])
 def get_assignment_submissions(request, assignment_id):
-    """Get all submissions for an assignment (Instructor only)"""
-    user = User.find_by_id(str(request.user.id))
-    if not user or user.role != 'instructor':
-        return Response({'error': 'Only instructors can view all submissions'}, 
-                       status=status.HTTP_403_FORBIDDEN)
+    """
+    Get the submissions for an assignment (Instructor only)
+    Statistics cover every submission; the submissions themselves are paged with
+    ?cursor=&limit= (latest first) and grouped by student within the page
+    """
+    try:
+        cursor, limit = get_page_params(request.query_params, default_limit=50)
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
     assignment = Assignment.find_by_id(assignment_id)
     if not assignment:
@@ -317,44 +301,35 @@ def get_assignment_submissions(request, assignment_id):
         return Response({'error': 'You do not have permission to view these submissions'}, 
                        status=status.HTTP_403_FORBIDDEN)
     
-    submissions = AssignmentSubmission.find_by_assignment(assignment_id)
-    
-    # Calculate statistics
-    graded_submissions = [s for s in submissions if s.status == 'graded']
-    if graded_submissions:
-        avg_score = sum(s.percentage for s in graded_submissions) / len(graded_submissions)
-        pass_rate = sum(1 for s in graded_submissions if s.passed) / len(graded_submissions) * 100
-    else:
-        avg_score = 0
-        pass_rate = 0
+    submissions, next_cursor = AssignmentSubmission.find_page_by_assignment(assignment_id, limit, cursor)
+    stats = AssignmentSubmission.get_assignment_stats(assignment_id)
+    avg_score = stats['average_score']
+    pass_rate = stats['pass_rate']
+    student_ids = {str(submission.student_id) for submission in submissions}
+    bests = AssignmentSubmission.get_student_bests(assignment_id, student_ids) if student_ids else {}
+    users = get_user_loader(request)
+    users.prime(student_ids)
     
-    # Group by student
+    # Group by student (best score / validation cover all their graded submissions)
     student_submissions = {}
     for submission in submissions:
         student_id = str(submission.student_id)
         if student_id not in student_submissions:
-            student = User.find_by_id(student_id)
+            student = users.load(student_id)
+            best = bests.get(student_id, {})
             student_submissions[student_id] = {
                 'student_id': student_id,
                 'student_name': f"{student.first_name} {student.last_name}" if student else "Unknown",
                 'submissions': [],
-                'best_score': 0,
-                'validated': False
+                'best_score': best.get('best_score', 0),
+                'validated': best.get('validated', False)
             }
         
-        submission_dict = submission.to_dict()
-        student_submissions[student_id]['submissions'].append(submission_dict)
-        
-        if submission.status == 'graded':
-            if submission.percentage > student_submissions[student_id]['best_score']:
-                student_submissions[student_id]['best_score'] = submission.percentage
-            
-            if submission.passed:
-                student_submissions[student_id]['validated'] = True
+        student_submissions[student_id]['submissions'].append(submission.to_dict())
     
     # AI recommendations for assignment improvement
     ai_recommendations = []
-    if graded_submissions:
+    if stats['graded_count']:
         if avg_score < 50:
             ai_recommendations.append("Consider making the assignment easier or providing more guidance")
         elif avg_score > 90:
@@ -368,14 +343,15 @@ def get_assignment_submissions(request, assignment_id):
     
     return Response({
         'assignment_id': assignment_id,
-        'total_submissions': len(submissions),
-        'unique_students': len(student_submissions),
-        'graded_count': len(graded_submissions),
-        'pending_count': len([s for s in submissions if s.status == 'submitted']),
+        'total_submissions': stats['total_submissions'],
+        'unique_students': stats['unique_students'],
+        'graded_count': stats['graded_count'],
+        'pending_count': stats['pending_count'],
         'average_score': round(avg_score, 2),
         'pass_rate': round(pass_rate, 2),
         'student_submissions': list(student_submissions.values()),
-        'ai_recommendations': ai_recommendations
+        'ai_recommendations': ai_recommendations,
+        'next_cursor': next_cursor
     })
 
 
@@ -401,9 +377,8 @@ def get_submission_detail(request, submission_id):
         return Response({'error': 'Submission not found'}, status=status.HTTP_404_NOT_FOUND)
     
     # Check permission
-    user = User.find_by_id(str(request.user.id))
     is_owner = str(submission.student_id) == str(str(request.user.id))
-    is_instructor = user and user.role == 'instructor'
+    is_instructor = get_request_role(request) == 'instructor'
     
     if not is_owner and not is_instructor:
         return Response({'error': 'You do not have permission to view this submission'}, 
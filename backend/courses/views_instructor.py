@@ -7,30 +7,33 @@ from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.response import Response
 from rest_framework import status
 from bson import ObjectId
-from .models import Course, Enrollment, Review
+from .models import Course
 from .extended_models import Module, Lesson, Quiz, Progress
+from .permissions import IsCourseOwner, user_owns_course, course_owner_index, get_course_owner_id
+from .summaries import StudentSummary
 from users.models import User
+from users.permissions import IsInstructorOrAdmin
+from config.local_cache import LocalTTLCache
+from django.conf import settings
 
+# Short-lived per-instructor cache of the course dashboard
+INSTRUCTOR_DASHBOARD_CACHE_TTL = getattr(settings, 'INSTRUCTOR_DASHBOARD_CACHE_TTL', 30)
+instructor_dashboard_cache = LocalTTLCache(ttl=INSTRUCTOR_DASHBOARD_CACHE_TTL, max_size=1024)
 
-def is_instructor_or_admin(user):
-    """Check if user has instructor or admin role"""
-    # user is an AuthenticatedUser object with role attribute
-    role = getattr(user, 'role', 'student')
-    return role in ['instructor', 'admin']
+
+def invalidate_instructor_dashboard(course_id):
+    """Drop the cached dashboard of the course's instructor after a course/module change"""
+    owner_id = get_course_owner_id(course_id)
+    if owner_id:
+        instructor_dashboard_cache.discard(owner_id)
 
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructorOrAdmin])
 def create_course(request):
     """Create a new course (instructors only)"""
     user = request.user
     
-    # Check if user is instructor or admin
-    if not is_instructor_or_admin(user):
-        return Response({
-            'error': 'Access denied. Instructor privileges required.'
-        }, status=status.HTTP_403_FORBIDDEN)
-    
     try:
         # Get course data
         title = request.data.get('title')
@@ -59,6 +62,7 @@ def create_course(request):
             preview_video=preview_video,
             published=False  # Start as draft
         )
+        instructor_dashboard_cache.discard(str(user.id))
         
         return Response({
             'message': 'Course created successfully',
@@ -72,51 +76,23 @@ def create_course(request):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructorOrAdmin])
 def get_instructor_courses(request):
     """Get all courses created by the instructor"""
     user = request.user
     
-    # Check if user is instructor or admin
-    if not is_instructor_or_admin(user):
-        return Response({
-            'error': 'Access denied. Instructor privileges required.'
-        }, status=status.HTTP_403_FORBIDDEN)
-    
     try:
-        # Debug: Print user ID
-        print(f"🔍 Fetching courses for instructor ID: {user.id}")
-        
-        # Get all courses by this instructor
-        courses = Course.find_by_instructor(str(user.id))
-        
-        print(f"📚 Found {len(courses)} courses for instructor {user.id}")
-        
-        # Get enrollment counts for each course
-        courses_with_stats = []
-        for course in courses:
-            course_dict = course.to_dict()
-            print(f"  - Course: {course_dict['title']} (instructor_id: {course_dict.get('instructor_id')})")
-            
-            # Get enrollment count
-            enrollments = Enrollment.find_by_course(course_dict['id'])
-            course_dict['enrollment_count'] = len(enrollments)
-            
-            # Get module count
-            modules = Module.find_by_course(course_dict['id'])
-            course_dict['module_count'] = len(modules)
-            
-            # Get average rating
-            reviews = Review.find_by_course(course_dict['id'])
-            if reviews:
-                avg_rating = sum(r.rating for r in reviews) / len(reviews)
-                course_dict['average_rating'] = round(avg_rating, 1)
-                course_dict['review_count'] = len(reviews)
-            else:
-                course_dict['average_rating'] = 0
-                course_dict['review_count'] = 0
-            
-            courses_with_stats.append(course_dict)
+        instructor_id = str(user.id)
+        
+        # Courses with enrollment/module counts and ratings, from one aggregation
+        courses_with_stats = instructor_dashboard_cache.get(instructor_id)
+        if courses_with_stats is None:
+            courses_with_stats = []
+            for entry in Course.find_instructor_dashboard(instructor_id):
+                course_dict = entry.pop('course').to_dict()
+                course_dict.update(entry)
+                courses_with_stats.append(course_dict)
+            instructor_dashboard_cache.set(instructor_id, courses_with_stats)
         
         return Response({
             'courses': courses_with_stats,
@@ -131,31 +107,17 @@ def get_instructor_courses(request):
 
 
 @api_view(['GET', 'PUT', 'DELETE'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructorOrAdmin, IsCourseOwner])
 def manage_course(request, course_id):
     """Get, update, or delete a specific course"""
-    user = request.user
-    
-    # Check if user is instructor or admin
-    if not is_instructor_or_admin(user):
-        return Response({
-            'error': 'Access denied. Instructor privileges required.'
-        }, status=status.HTTP_403_FORBIDDEN)
-    
     try:
-        # Get the course
+        # Get the course (ownership checked by IsCourseOwner)
         course = Course.find_by_id(course_id)
         if not course:
             return Response({
                 'error': 'Course not found'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # Check if user owns this course (unless admin)
-        if user.role != 'admin' and course.instructor_id != str(user.id):
-            return Response({
-                'error': 'You do not have permission to manage this course'
-            }, status=status.HTTP_403_FORBIDDEN)
-        
         if request.method == 'GET':
             # Get course with modules and lessons
             course_dict = course.to_dict()
@@ -201,6 +163,8 @@ def manage_course(request, course_id):
                 update_data['published'] = request.data['published']
             
             course.update(**update_data)
+            invalidate_instructor_dashboard(course_id)
+            StudentSummary.course_changed(course_id)
             
             return Response({
                 'message': 'Course updated successfully',
@@ -209,7 +173,9 @@ def manage_course(request, course_id):
         
         elif request.method == 'DELETE':
             # Delete course and all related data
+            invalidate_instructor_dashboard(course_id)
             course.delete()
+            course_owner_index.discard(str(course_id))
             
             # Delete all modules and lessons for this course
             modules = Module.find_by_course(course_id)
@@ -232,32 +198,12 @@ def manage_course(request, course_id):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructorOrAdmin, IsCourseOwner])
 def get_course_modules(request, course_id):
     """Get all modules with their lessons for a course"""
-    user = request.user
-    
-    # Check if user is instructor or admin
-    if not is_instructor_or_admin(user):
-        return Response({
-            'error': 'Access denied. Instructor privileges required.'
-        }, status=status.HTTP_403_FORBIDDEN)
-    
     try:
         print(f"🔍 Fetching modules for course: {course_id}")
         
-        # Verify course exists and user owns it
-        course = Course.find_by_id(course_id)
-        if not course:
-            return Response({
-                'error': 'Course not found'
-            }, status=status.HTTP_404_NOT_FOUND)
-        
-        if str(course.instructor_id) != str(user.id) and user.role != 'admin':
-            return Response({
-                'error': 'You do not have permission to access this course'
-            }, status=status.HTTP_403_FORBIDDEN)
-        
         # Get all modules for this course
         modules = Module.find_by_course(course_id)
         print(f"📚 Found {len(modules)} modules")
@@ -287,30 +233,10 @@ def get_course_modules(request, course_id):
 
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructorOrAdmin, IsCourseOwner])
 def create_module(request, course_id):
     """Create a new module in a course"""
-    user = request.user
-    
-    # Check if user is instructor or admin
-    if not is_instructor_or_admin(user):
-        return Response({
-            'error': 'Access denied. Instructor privileges required.'
-        }, status=status.HTTP_403_FORBIDDEN)
-    
     try:
-        # Verify course exists and user owns it
-        course = Course.find_by_id(course_id)
-        if not course:
-            return Response({
-                'error': 'Course not found'
-            }, status=status.HTTP_404_NOT_FOUND)
-        
-        if user.role != 'admin' and course.instructor_id != str(user.id):
-            return Response({
-                'error': 'You do not have permission to add modules to this course'
-            }, status=status.HTTP_403_FORBIDDEN)
-        
         # Get module data
         title = request.data.get('title')
         description = request.data.get('description', '')
@@ -332,6 +258,7 @@ def create_module(request, course_id):
             duration_minutes=int(duration_minutes),
             published=False
         )
+        invalidate_instructor_dashboard(course_id)
         
         return Response({
             'message': 'Module created successfully',
@@ -345,17 +272,9 @@ def create_module(request, course_id):
 
 
 @api_view(['GET', 'PUT', 'DELETE'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructorOrAdmin])
 def manage_module(request, module_id):
     """Get, update, or delete a specific module"""
-    user = request.user
-    
-    # Check if user is instructor or admin
-    if not is_instructor_or_admin(user):
-        return Response({
-            'error': 'Access denied. Instructor privileges required.'
-        }, status=status.HTTP_403_FORBIDDEN)
-    
     try:
         # Get the module
         module = Module.find_by_id(module_id)
@@ -367,8 +286,7 @@ def manage_module(request, module_id):
         module_dict = module.to_dict()
         
         # Verify user owns the course (unless admin)
-        course = Course.find_by_id(module_dict['course_id'])
-        if user.role != 'admin' and course.instructor_id != str(user.id):
+        if not user_owns_course(request, module_dict['course_id']):
             return Response({
                 'error': 'You do not have permission to manage this module'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -412,6 +330,7 @@ def manage_module(request, module_id):
                 lesson.delete()
             
             module.delete()
+            invalidate_instructor_dashboard(module_dict['course_id'])
             
             return Response({
                 'message': 'Module deleted successfully'
@@ -424,18 +343,10 @@ def manage_module(request, module_id):
 
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructorOrAdmin])
 @parser_classes([MultiPartParser, FormParser, JSONParser])
 def create_lesson(request, module_id):
     """Create a new lesson in a module"""
-    user = request.user
-    
-    # Check if user is instructor or admin
-    if not is_instructor_or_admin(user):
-        return Response({
-            'error': 'Access denied. Instructor privileges required.'
-        }, status=status.HTTP_403_FORBIDDEN)
-    
     try:
         # Verify module exists
         module = Module.find_by_id(module_id)
@@ -447,8 +358,7 @@ def create_lesson(request, module_id):
         module_dict = module.to_dict()
         
         # Verify user owns the course
-        course = Course.find_by_id(module_dict['course_id'])
-        if user.role != 'admin' and course.instructor_id != str(user.id):
+        if not user_owns_course(request, module_dict['course_id']):
             return Response({
                 'error': 'You do not have permission to add lessons to this module'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -535,17 +445,9 @@ def create_lesson(request, module_id):
 
 
 @api_view(['GET', 'PUT', 'DELETE'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructorOrAdmin])
 def manage_lesson(request, lesson_id):
     """Get, update, or delete a specific lesson"""
-    user = request.user
-    
-    # Check if user is instructor or admin
-    if not is_instructor_or_admin(user):
-        return Response({
-            'error': 'Access denied. Instructor privileges required.'
-        }, status=status.HTTP_403_FORBIDDEN)
-    
     try:
         # Get the lesson
         lesson = Lesson.find_by_id(lesson_id)
@@ -557,8 +459,7 @@ def manage_lesson(request, lesson_id):
         lesson_dict = lesson.to_dict()
         
         # Verify user owns the course
-        course = Course.find_by_id(lesson_dict['course_id'])
-        if user.role != 'admin' and course.instructor_id != str(user.id):
+        if not user_owns_course(request, lesson_dict['course_id']):
             return Response({
                 'error': 'You do not have permission to manage this lesson'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -13,6 +13,14 @@ from courses.serializers_progress import (
 from courses.models import Course, Enrollment
 from courses.extended_models import Lesson, Quiz, Assignment
 from users.models import User
+from users.loaders import get_user_loader
+from courses.permissions import IsEnrolled, is_enrolled
+from courses.summaries import StudentSummary
+from courses.heartbeats import (
+    record_heartbeat, get_lesson_course_ids,
+    HEARTBEAT_MAX_DELTA_SECONDS, HEARTBEAT_MAX_EVENTS
+)
+from bson import ObjectId
 
 
 @api_view(['GET'])
@@ -63,67 +71,61 @@ def get_course_status(request, course_id):
     Returns which lessons are completed and which quizzes/assignments are available
     """
     try:
-        from bson import ObjectId
         student_id = str(request.user.id)
         
-        # Get course
-        course = Course.find_by_id(course_id)
-        if not course:
+        # Course, modules, lessons, quizzes, progress and assignments in one pipeline
+        outline = Course.find_status_outline(course_id, student_id)
+        if not outline:
             return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        # Get progress
-        progress = StudentProgress.find_by_student_and_course(student_id, course_id)
-        
-        # Get all modules and lessons
-        from courses.extended_models import Module, Lesson, Quiz, Assignment
-        modules = Module.find_by_course(course_id)
+        progress = outline['progress'][0] if outline['progress'] else {}
+        completed_ids = {str(lid) for lid in progress.get('lessons_completed', [])}
         
         lessons_data = []
-        for module in modules:
-            lessons = Lesson.find_by_module(str(module.id))
-            for lesson in lessons:
-                lesson_id_str = str(lesson.id)
-                is_completed = ObjectId(lesson.id) in (progress.lessons_completed if progress else [])
+        for module in outline['modules']:
+            module_id_str = str(module['_id'])
+            for lesson in module['lessons']:
+                lesson_id_str = str(lesson['_id'])
+                is_completed = lesson_id_str in completed_ids
                 
-                # Get quiz for this lesson if it exists
-                quiz = Quiz.find_by_lesson(lesson_id_str)
-                can_take_quiz = is_completed and quiz is not None and quiz.is_published
+                # Quiz for this lesson if it exists
+                quiz = lesson['quiz'][0] if lesson['quiz'] else None
+                can_take_quiz = is_completed and quiz is not None and quiz.get('is_published', False)
                 
                 lessons_data.append({
                     'id': lesson_id_str,
-                    'title': lesson.title,
-                    'module_id': str(module.id),
+                    'title': lesson.get('title'),
+                    'module_id': module_id_str,
                     'completed': is_completed,
                     'can_take_quiz': can_take_quiz,
-                    'quiz_id': str(quiz.id) if quiz else None,
-                    'duration_minutes': getattr(lesson, 'duration_minutes', 0)
+                    'quiz_id': str(quiz['_id']) if quiz else None,
+                    'duration_minutes': lesson.get('duration_minutes', 0)
                 })
         
         # Check if all lessons are completed
         all_lessons_completed = all(l['completed'] for l in lessons_data) if lessons_data else False
         
-        # Get assignments for this course
-        assignments = Assignment.find_by_course(course_id)
-        published_assignments = [a for a in assignments if a.is_published]
+        # Published assignments for this course
+        published_assignments = outline['assignments']
         
         # Assignment is available only if all lessons are completed
         can_take_assignment = all_lessons_completed and len(published_assignments) > 0
         
         return Response({
             'course_id': course_id,
-            'course_title': course.title,
+            'course_title': outline.get('title'),
             'lessons': lessons_data,
             'course_completed': all_lessons_completed,
             'can_take_assignment': can_take_assignment,
             'assignments': [
                 {
-                    'id': str(a.id),
-                    'title': a.title,
+                    'id': str(a['_id']),
+                    'title': a.get('title'),
                     'available': can_take_assignment
                 }
                 for a in published_assignments
             ],
-            'completion_percentage': progress.completion_percentage if progress else 0
+            'completion_percentage': progress.get('completion_percentage', 0)
         })
         
     except Exception as e:
@@ -174,21 +176,24 @@ def get_all_student_progress(request):
 
         # Fetch enrollments to ensure every course the student is taking appears
         enrollments = Enrollment.find_by_student(student_id)
-        enriched_progress = []
-        processed_course_ids = set()
+        enrollments_by_course = {str(enrollment.course_id): enrollment for enrollment in enrollments}
+
+        # Every course needed - enrolled or with a standalone progress record - in one query
+        courses = Course.find_summaries(set(enrollments_by_course) | set(progress_map))
 
-        for enrollment in enrollments:
-            course_id = str(enrollment.course_id)
-            processed_course_ids.add(course_id)
+        # Enrolled courses first, then progress entries without an enrollment (edge cases)
+        course_ids = list(enrollments_by_course)
+        course_ids += [course_id for course_id in progress_map if course_id not in enrollments_by_course]
 
-            course = Course.find_by_id(course_id)
-            course_title = course.title if course else 'Course'
-            course_thumbnail = getattr(course, 'thumbnail_url', None) if course else None
+        enriched_progress = []
+        for course_id in course_ids:
+            enrollment = enrollments_by_course.get(course_id)
+            course = courses.get(course_id)
 
             base_entry = progress_map.get(course_id, {
                 'progress_id': None,
                 'course_id': course_id,
-                'enrollment_id': str(enrollment.id) if enrollment.id else None,
+                'enrollment_id': str(enrollment.id) if enrollment and enrollment.id else None,
                 'completion_percentage': 0.0,
                 'time_spent_minutes': 0,
                 'lessons_completed': [],
@@ -199,11 +204,11 @@ def get_all_student_progress(request):
 
             entry = {
                 **base_entry,
-                'course_title': course_title,
-                'course_thumbnail': course_thumbnail,
-                'enrolled_at': enrollment.enrolled_at.isoformat() if enrollment.enrolled_at else None,
-                'enrollment_progress': float(enrollment.progress or 0),
-                'certificate_issued': bool(enrollment.certificate_issued),
+                'course_title': course['title'] if course else 'Course',
+                'course_thumbnail': (course['thumbnail'] or None) if course else None,
+                'enrolled_at': enrollment.enrolled_at.isoformat() if enrollment and enrollment.enrolled_at else None,
+                'enrollment_progress': float(enrollment.progress or 0) if enrollment else 0.0,
+                'certificate_issued': bool(enrollment.certificate_issued) if enrollment else False,
             }
 
             entry['lessons_completed_count'] = len(entry['lessons_completed'] or [])
@@ -213,29 +218,6 @@ def get_all_student_progress(request):
 
             enriched_progress.append(entry)
 
-        # Include standalone progress entries that may not have an active enrollment (edge cases)
-        for course_id, progress_entry in progress_map.items():
-            if course_id in processed_course_ids:
-                continue
-
-            course = Course.find_by_id(course_id)
-            course_title = course.title if course else 'Course'
-            course_thumbnail = getattr(course, 'thumbnail_url', None) if course else None
-
-            entry = {
-                **progress_entry,
-                'course_title': course_title,
-                'course_thumbnail': course_thumbnail,
-                'enrolled_at': None,
-                'enrollment_progress': 0.0,
-                'certificate_issued': False,
-                'lessons_completed_count': len(progress_entry['lessons_completed'] or []),
-                'quizzes_completed_count': len(progress_entry['quizzes_completed'] or []),
-                'assignments_completed_count': len(progress_entry['assignments_completed'] or []),
-                'time_spent_hours': round(progress_entry['time_spent_minutes'] / 60, 2) if progress_entry['time_spent_minutes'] else 0
-            }
-            enriched_progress.append(entry)
-
         total_minutes = sum(entry['time_spent_minutes'] for entry in enriched_progress)
         total_lessons = sum(entry['lessons_completed_count'] for entry in enriched_progress)
         total_quizzes = sum(entry['quizzes_completed_count'] for entry in enriched_progress)
@@ -264,6 +246,24 @@ def get_all_student_progress(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_learning_summary(request):
+    """
+    Get the logged-in student's learning dashboard from the materialized summary
+    (one document read; see courses.summaries)
+    """
+    try:
+        summary = StudentSummary.get(request.user.id)
+        return Response(StudentSummary.to_response(summary))
+
+    except Exception as e:
+        return Response({
+            'error': 'Failed to fetch learning summary',
+            'detail': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def update_lesson_progress(request, lesson_id):
@@ -289,47 +289,33 @@ def update_lesson_progress(request, lesson_id):
                 return Response({'error': 'Module not found'}, status=status.HTTP_404_NOT_FOUND)
             course_id = str(module.course_id)
         
-        # Get or create progress
-        progress = StudentProgress.find_by_student_and_course(student_id, course_id)
+        # Percentage is based only on lessons for simplicity - total from the course counters
+        content_counts = Course.get_content_counts(course_id) or {}
+        total_lessons = content_counts.get('lessons', 0)
+        time_spent_minutes = request.data.get('time_spent_minutes', 0) or 0
+        
+        # Mark lesson complete, add time spent and recompute percentage in one update
+        progress = StudentProgress.record_lesson_completion(
+            student_id, course_id, lesson_id, total_lessons,
+            time_spent_minutes=time_spent_minutes
+        )
         if not progress:
-            # Create new progress record
+            # First completion in this course - create the record
             enrollment = Enrollment.find_one(student_id, course_id)
             if not enrollment:
                 return Response({'error': 'Not enrolled in this course'}, 
                               status=status.HTTP_403_FORBIDDEN)
             
-            progress = StudentProgress.create(
-                student_id=student_id,
-                course_id=course_id,
+            progress = StudentProgress.record_lesson_completion(
+                student_id, course_id, lesson_id, total_lessons,
+                time_spent_minutes=time_spent_minutes,
                 enrollment_id=str(enrollment.id)
             )
         
-        # Mark lesson complete
-        progress.mark_lesson_complete(lesson_id)
-        
-        # Update time spent if provided
-        time_spent_minutes = request.data.get('time_spent_minutes', 0)
-        if time_spent_minutes:
-            current_time = getattr(progress, 'time_spent_minutes', 0) or 0
-            progress.update(time_spent_minutes=current_time + time_spent_minutes)
-        
-        # Recalculate completion percentage - based only on lessons for simplicity
-        from bson import ObjectId
-
-        # Count total lessons in the course
-        total_lessons = Lesson.get_collection().count_documents({'course_id': str(course_id)})
-        
-        # Calculate percentage based on lessons completed vs total lessons
-        if total_lessons > 0:
-            completed_percentage = (len(progress.lessons_completed) / total_lessons) * 100
-            progress.update(completion_percentage=round(completed_percentage, 2))
-        else:
-            progress.update(completion_percentage=0.0)
-        
         # Update enrollment progress to match StudentProgress
-        enrollment = Enrollment.find_one(student_id, course_id)
-        if enrollment:
-            enrollment.update(progress=progress.completion_percentage)
+        if progress.enrollment_id:
+            Enrollment.set_progress(progress.enrollment_id, progress.completion_percentage)
+        StudentSummary.progress_changed(student_id, course_id, progress)
         
         return Response({
             'message': 'Lesson marked as completed',
@@ -348,6 +334,67 @@ def update_lesson_progress(request, lesson_id):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+def record_learning_heartbeats(request):
+    """
+    Record a batch of heartbeats from the lesson player
+    Body: {"events": [{"lesson_id": "...", "seconds": 15, "position": 312.5}, ...]}
+    Events are buffered in-process and written in bulk, so they reach
+    progress records after a short delay
+    """
+    try:
+        student_id = str(request.user.id)
+        events = request.data.get('events')
+        if not isinstance(events, list):
+            return Response({'error': 'events must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(events) > HEARTBEAT_MAX_EVENTS:
+            return Response({
+                'error': f'At most {HEARTBEAT_MAX_EVENTS} events per batch'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Parse and validate events
+        parsed = []
+        for event in events:
+            if not isinstance(event, dict):
+                continue
+            lesson_id = str(event.get('lesson_id') or '')
+            try:
+                seconds = min(max(int(event.get('seconds') or 0), 0), HEARTBEAT_MAX_DELTA_SECONDS)
+                position = event.get('position')
+                position = max(float(position), 0.0) if position is not None else None
+            except (TypeError, ValueError):
+                continue
+            if ObjectId.is_valid(lesson_id) and (seconds or position is not None):
+                parsed.append((lesson_id, seconds, position))
+        
+        # Resolve courses and check enrollment once per course
+        lesson_courses = get_lesson_course_ids({lesson_id for lesson_id, _, _ in parsed})
+        enrolled = {
+            course_id: is_enrolled(student_id, course_id)
+            for course_id in set(lesson_courses.values())
+        }
+        
+        accepted = 0
+        for lesson_id, seconds, position in parsed:
+            course_id = lesson_courses.get(lesson_id)
+            if course_id and enrolled.get(course_id):
+                record_heartbeat(student_id, lesson_id, course_id, seconds, position)
+                accepted += 1
+        
+        return Response({
+            'accepted': accepted,
+            'rejected': len(events) - accepted
+        }, status=status.HTTP_202_ACCEPTED)
+        
+    except Exception as e:
+        print(f"❌ Error in record_learning_heartbeats: {str(e)}")
+        return Response({
+            'error': 'Failed to record heartbeats',
+            'detail': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsEnrolled])
 def submit_course_review(request, course_id):
     """
     Submit or update a course review
@@ -361,13 +408,6 @@ def submit_course_review(request, course_id):
         if not course:
             return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        # Check if student is enrolled
-        enrollment = Enrollment.find_one(student_id, course_id)
-        if not enrollment:
-            return Response({
-                'error': 'You must be enrolled in this course to review it'
-            }, status=status.HTTP_403_FORBIDDEN)
-        
         # Validate data
         serializer = CourseReviewSerializer(data=request.data)
         if not serializer.is_valid():
@@ -391,7 +431,7 @@ def submit_course_review(request, course_id):
                 'review': existing_review.to_dict()
             })
         else:
-            # Create new review
+            # Create new review (course average_rating/total_reviews follow the aggregate)
             review = CourseReview.create(
                 student_id=student_id,
                 course_id=course_id,
@@ -400,13 +440,6 @@ def submit_course_review(request, course_id):
                 would_recommend=serializer.validated_data.get('would_recommend', True)
             )
             
-            # Update course average rating
-            rating_stats = CourseReview.get_course_average_rating(course_id)
-            course.update(
-                average_rating=rating_stats['average_rating'],
-                total_reviews=rating_stats['total_reviews']
-            )
-            
             return Response({
                 'message': 'Review submitted successfully',
                 'review': review.to_dict()
@@ -427,11 +460,14 @@ def get_course_reviews(request, course_id):
     try:
         reviews = CourseReview.find_by_course(course_id)
         
-        # Enrich with student names
+        # Enrich with student names (one batched query)
+        users = get_user_loader(request)
+        users.prime(review.student_id for review in reviews)
+        
         enriched_reviews = []
         for review in reviews:
             review_dict = review.to_dict()
-            student = User.find_by_id(str(review.student_id))
+            student = users.load(review.student_id)
             if student:
                 review_dict['student_name'] = f"{student.first_name} {student.last_name}"
             enriched_reviews.append(review_dict)
@@ -452,7 +488,7 @@ def get_course_reviews(request, course_id):
 
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsEnrolled])
 def submit_instructor_review(request, instructor_id, course_id):
     """
     Submit or update an instructor review
@@ -476,13 +512,6 @@ def submit_instructor_review(request, instructor_id, course_id):
                 'error': 'This instructor does not teach this course'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Check if student is enrolled
-        enrollment = Enrollment.find_one(student_id, course_id)
-        if not enrollment:
-            return Response({
-                'error': 'You must be enrolled in this course to review the instructor'
-            }, status=status.HTTP_403_FORBIDDEN)
-        
         # Validate data
         serializer = InstructorReviewSerializer(data=request.data)
         if not serializer.is_valid():
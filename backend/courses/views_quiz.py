@@ -10,18 +10,17 @@ from bson import ObjectId
 
 from courses.extended_models import Quiz, QuizAttempt, Lesson
 from courses.serializers import QuizSerializer, QuizAttemptSerializer
-from users.models import User
+from users.loaders import get_user_loader
+from users.permissions import IsInstructor, get_request_role
+from courses.permissions import is_enrolled
+from courses.summaries import StudentSummary
+from config.pagination import InvalidCursor, get_page_params
 
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructor])
 def create_quiz(request, lesson_id):
     """Create a quiz for a lesson (Instructor only)"""
-    user = User.find_by_id(str(request.user.id))
-    if not user or user.role != 'instructor':
-        return Response({'error': 'Only instructors can create quizzes'}, 
-                       status=status.HTTP_403_FORBIDDEN)
-    
     # Verify lesson exists
     lesson = Lesson.find_by_id(lesson_id)
     if not lesson:
@@ -35,7 +34,9 @@ def create_quiz(request, lesson_id):
     quiz_data = serializer.validated_data
     quiz_data['instructor_id'] = str(request.user.id)
     quiz_data['lesson_id'] = str(lesson_id)
-    quiz_data['course_id'] = str(lesson.course_id)
+    # Lessons may only reference their course through the module
+    course_id = lesson.get_course_id()
+    quiz_data['course_id'] = str(course_id) if course_id else None
     
     quiz = Quiz.create(**quiz_data)
     
@@ -43,14 +44,9 @@ def create_quiz(request, lesson_id):
 
 
 @api_view(['GET', 'PUT', 'DELETE'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructor])
 def manage_quiz(request, quiz_id):
     """Get, update, or delete a quiz (Instructor only)"""
-    user = User.find_by_id(str(request.user.id))
-    if not user or user.role != 'instructor':
-        return Response({'error': 'Only instructors can manage quizzes'}, 
-                       status=status.HTTP_403_FORBIDDEN)
-    
     quiz = Quiz.find_by_id(quiz_id)
     if not quiz:
         return Response({'error': 'Quiz not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -95,8 +91,7 @@ def get_lesson_quiz(request, lesson_id):
                        status=status.HTTP_404_NOT_FOUND)
     
     # Check if student is instructor
-    user = User.find_by_id(str(request.user.id))
-    is_instructor = user and user.role == 'instructor'
+    is_instructor = get_request_role(request) == 'instructor'
     
     # For students, check if they are enrolled in the course
     if not is_instructor:
@@ -110,9 +105,7 @@ def get_lesson_quiz(request, lesson_id):
             course_id = str(module.course_id)
         
         # Check enrollment - allow quiz access if enrolled
-        from courses.models import Enrollment
-        enrollment = Enrollment.find_one(str(request.user.id), course_id)
-        if not enrollment:
+        if not is_enrolled(request.user.id, course_id):
             return Response({'error': 'Not enrolled in this course'}, status=status.HTTP_403_FORBIDDEN)
         
         # Optional: Check if lesson is completed (commented out for now to allow testing)
@@ -168,8 +161,7 @@ def check_lesson_quiz_availability(request, lesson_id):
         quiz_data = quiz.to_dict()
         
         # Don't show correct answers to students
-        user = User.find_by_id(str(request.user.id))
-        is_instructor = user and user.role == 'instructor'
+        is_instructor = get_request_role(request) == 'instructor'
         
         if not is_instructor:
             for question in quiz_data.get('questions', []):
@@ -248,6 +240,7 @@ def submit_quiz(request, quiz_id):
     }
     
     attempt = QuizAttempt.create(**attempt_data)
+    StudentSummary.quiz_submitted(request.user.id, quiz.course_id, quiz_id, passed)
     
     # Get ranking
     all_attempts = QuizAttempt.find_by_quiz(quiz_id)
@@ -275,13 +268,17 @@ def submit_quiz(request, quiz_id):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAuthenticated, IsInstructor])
 def get_quiz_attempts(request, quiz_id):
-    """Get all attempts for a quiz (Instructor only)"""
-    user = User.find_by_id(str(request.user.id))
-    if not user or user.role != 'instructor':
-        return Response({'error': 'Only instructors can view all attempts'}, 
-                       status=status.HTTP_403_FORBIDDEN)
+    """
+    Get the attempts for a quiz (Instructor only)
+    Statistics cover every attempt; the attempts themselves are paged with
+    ?cursor=&limit= (latest first) and grouped by student within the page
+    """
+    try:
+        cursor, limit = get_page_params(request.query_params, default_limit=50)
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
     quiz = Quiz.find_by_id(quiz_id)
     if not quiz:
@@ -291,47 +288,38 @@ def get_quiz_attempts(request, quiz_id):
         return Response({'error': 'You do not have permission to view these attempts'}, 
                        status=status.HTTP_403_FORBIDDEN)
     
-    attempts = QuizAttempt.find_by_quiz(quiz_id)
+    attempts, next_cursor = QuizAttempt.find_page_by_quiz(quiz_id, limit, cursor)
+    stats = QuizAttempt.get_quiz_stats(quiz_id)
+    student_ids = {str(attempt.student_id) for attempt in attempts}
+    bests = QuizAttempt.get_student_bests(quiz_id, student_ids) if student_ids else {}
+    users = get_user_loader(request)
+    users.prime(student_ids)
     
-    # Calculate statistics
-    completed_attempts = [a for a in attempts if a.completed_at]
-    if completed_attempts:
-        avg_score = sum(a.percentage for a in completed_attempts) / len(completed_attempts)
-        pass_rate = sum(1 for a in completed_attempts if a.passed) / len(completed_attempts) * 100
-    else:
-        avg_score = 0
-        pass_rate = 0
-    
-    # Group by student
+    # Group by student (best score / validation cover all their attempts)
     student_attempts = {}
     for attempt in attempts:
         student_id = str(attempt.student_id)
         if student_id not in student_attempts:
-            student = User.find_by_id(student_id)
+            student = users.load(student_id)
+            best = bests.get(student_id, {})
             student_attempts[student_id] = {
                 'student_id': student_id,
                 'student_name': f"{student.first_name} {student.last_name}" if student else "Unknown",
                 'attempts': [],
-                'best_score': 0,
-                'validated': False
+                'best_score': best.get('best_score', 0),
+                'validated': best.get('validated', False)
             }
         
-        attempt_dict = attempt.to_dict()
-        student_attempts[student_id]['attempts'].append(attempt_dict)
-        
-        if attempt.percentage > student_attempts[student_id]['best_score']:
-            student_attempts[student_id]['best_score'] = attempt.percentage
-        
-        if attempt.passed:
-            student_attempts[student_id]['validated'] = True
+        student_attempts[student_id]['attempts'].append(attempt.to_dict())
     
     return Response({
         'quiz_id': quiz_id,
-        'total_attempts': len(attempts),
-        'unique_students': len(student_attempts),
-        'average_score': round(avg_score, 2),
-        'pass_rate': round(pass_rate, 2),
-        'student_attempts': list(student_attempts.values())
+        'total_attempts': stats['total_attempts'],
+        'unique_students': stats['unique_students'],
+        'average_score': round(stats['average_score'], 2),
+        'pass_rate': round(stats['pass_rate'], 2),
+        'student_attempts': list(student_attempts.values()),
+        'next_cursor': next_cursor
     })
 
 
@@ -355,8 +343,7 @@ def get_course_quizzes(request, course_id):
     quizzes = Quiz.find_by_course(course_id)
     
     # For students, hide correct answers
-    user = User.find_by_id(str(request.user.id))
-    is_instructor = user and user.role == 'instructor'
+    is_instructor = get_request_role(request) == 'instructor'
     
     quiz_list = []
     for quiz in quizzes:
@@ -0,0 +1,73 @@
+"""
+In-process cache of the user fields needed to authenticate API requests
+Bounded LRU with a TTL; entries are dropped when User.update/User.delete runs.
+With AUTH_USER_CACHE_SHARED_INVALIDATION on, invalidations are also published
+through the Django cache so other workers drop their copy (needs a shared
+cache backend such as Redis or Memcached).
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from config.local_cache import LocalTTLCache
+
+# User fields kept for authentication and role checks
+AUTH_USER_FIELDS = ('email', 'username', 'role', 'is_active')
+
+AUTH_USER_CACHE_TTL = getattr(settings, 'AUTH_USER_CACHE_TTL', 60)
+AUTH_USER_CACHE_SIZE = getattr(settings, 'AUTH_USER_CACHE_SIZE', 2048)
+AUTH_USER_CACHE_SHARED_INVALIDATION = getattr(settings, 'AUTH_USER_CACHE_SHARED_INVALIDATION', False)
+
+INVALIDATION_KEY = 'auth_user_invalidated:{}'
+
+
+class AuthUserCache(LocalTTLCache):
+    """TTL/LRU cache of auth user snapshots keyed by user id"""
+
+    def __init__(self, ttl=AUTH_USER_CACHE_TTL, max_size=AUTH_USER_CACHE_SIZE,
+                 shared_invalidation=AUTH_USER_CACHE_SHARED_INVALIDATION):
+        super().__init__(ttl=ttl, max_size=max_size)
+        self.shared_invalidation = shared_invalidation
+
+    def get(self, user_id, default=None):
+        """Get cached snapshot dict or default if missing, expired or invalidated"""
+        key = str(user_id)
+        entry = self.get_entry(key)
+        if entry is None:
+            return default
+        stored_at, data = entry
+
+        if self.shared_invalidation:
+            invalidated_at = cache.get(INVALIDATION_KEY.format(key))
+            if invalidated_at and invalidated_at >= stored_at:
+                self.discard(key)
+                return default
+
+        return data
+
+    def set(self, user_id, data):
+        super().set(str(user_id), data)
+
+    def discard(self, user_id):
+        """Drop the local entry only"""
+        super().discard(str(user_id))
+
+    def invalidate(self, user_id):
+        """Drop the entry here and, if enabled, signal other workers"""
+        key = str(user_id)
+        self.discard(key)
+        if self.shared_invalidation:
+            try:
+                cache.set(INVALIDATION_KEY.format(key), time.time(), timeout=self.ttl)
+            except Exception as e:
+                print(f"⚠️ Could not publish auth cache invalidation for {key}: {str(e)}")
+
+
+auth_user_cache = AuthUserCache()
+
+
+def invalidate_auth_user(user_id):
+    """Invalidate cached auth data for a user (called on User.update/delete)"""
+    if user_id:
+        auth_user_cache.invalidate(user_id)
@@ -4,12 +4,14 @@ Custom JWT Authentication Backend
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from users.models import User
+from users.auth_cache import auth_user_cache, AUTH_USER_FIELDS
 
 
 class AuthenticatedUser:
     """
     Simple user wrapper for DRF authentication
     Makes MongoDB User compatible with DRF's permission system
+    Only the auth fields (AUTH_USER_FIELDS) are loaded on the wrapped user
     """
     def __init__(self, user):
         self.user = user
@@ -32,13 +34,22 @@ class CustomJWTAuthentication(JWTAuthentication):
     """Custom JWT authentication that works with MongoDB User model"""
     
     def get_user(self, validated_token):
-        """Get user from MongoDB using the user_id in the token"""
+        """Get user from the auth cache, falling back to MongoDB, using the user_id in the token"""
         try:
             user_id = validated_token.get('user_id')
             if not user_id:
                 raise AuthenticationFailed('Token contained no recognizable user identification')
             
-            user = User.find_by_id(user_id)
+            user_data = auth_user_cache.get(user_id)
+            if user_data is not None:
+                user = User(**user_data)
+            else:
+                user = User.find_by_id(user_id, fields=AUTH_USER_FIELDS)
+                if user:
+                    auth_user_cache.set(user_id, {
+                        '_id': user.id,
+                        **{field: getattr(user, field) for field in AUTH_USER_FIELDS}
+                    })
             
             if not user:
                 raise AuthenticationFailed('User not found')
@@ -46,6 +57,11 @@ class CustomJWTAuthentication(JWTAuthentication):
             if not user.is_active:
                 raise AuthenticationFailed('User is inactive')
             
+            # Tokens carry the role as a signed claim; a role change invalidates them
+            token_role = validated_token.get('role')
+            if token_role and token_role != user.role:
+                raise AuthenticationFailed('User role has changed, please log in again')
+            
             # Return an AuthenticatedUser wrapper that's compatible with DRF
             return AuthenticatedUser(user)
             
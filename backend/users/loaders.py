@@ -0,0 +1,76 @@
+"""
+Request-scoped batch loading of users
+List views queue the user ids they need, resolve them with a single $in query
+and reuse the results for the rest of the request instead of calling
+User.find_by_id once per row.
+"""
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from users.models import User
+
+# Fields needed to render users next to other objects (never password/2FA/reset data)
+PUBLIC_FIELDS = ('username', 'email', 'first_name', 'last_name', 'role', 'bio', 'profile_image')
+
+
+class UserLoader:
+    """Batching, memoizing User loader (one instance per request)"""
+
+    def __init__(self, fields=PUBLIC_FIELDS):
+        self.fields = fields
+        self._cache = {}
+        self._pending = set()
+
+    @staticmethod
+    def _key(user_id):
+        return str(user_id) if user_id else None
+
+    def prime(self, user_ids):
+        """Queue user ids to be fetched by the next load"""
+        for user_id in user_ids:
+            key = self._key(user_id)
+            if key and key not in self._cache:
+                self._pending.add(key)
+
+    def dispatch(self):
+        """Fetch all queued user ids with one query"""
+        if not self._pending:
+            return
+
+        keys, self._pending = self._pending, set()
+        object_ids = []
+        for key in keys:
+            # Unknown/invalid ids are memoized as missing too
+            self._cache[key] = None
+            try:
+                object_ids.append(ObjectId(key))
+            except (InvalidId, TypeError):
+                continue
+
+        if not object_ids:
+            return
+
+        projection = {field: 1 for field in self.fields}
+        for user_data in User.get_collection().find({'_id': {'$in': object_ids}}, projection):
+            self._cache[str(user_data['_id'])] = User(**user_data)
+
+    def load(self, user_id):
+        """Get one user (None if not found), fetching it with anything queued"""
+        key = self._key(user_id)
+        if not key:
+            return None
+        if key not in self._cache:
+            self._pending.add(key)
+            self.dispatch()
+        return self._cache.get(key)
+
+
+def get_user_loader(request):
+    """Get the UserLoader attached to this request (created on first use)"""
+    # DRF wraps the Django request; keep the loader on the underlying one
+    request = getattr(request, '_request', request)
+    loader = getattr(request, '_user_loader', None)
+    if loader is None:
+        loader = UserLoader()
+        request._user_loader = loader
+    return loader
@@ -2,15 +2,22 @@
 User MongoDB Model
 """
 from datetime import datetime
-from bson import ObjectId
+from pymongo import IndexModel, ASCENDING
 import bcrypt
 from config.mongodb import get_collection
+from config.ids import to_object_id
+from users.auth_cache import invalidate_auth_user
 
 
 class User:
     """User model for MongoDB"""
     
     COLLECTION_NAME = 'users'
+    INDEXES = [
+        IndexModel([('email', ASCENDING)], unique=True),
+        IndexModel([('username', ASCENDING)]),
+        IndexModel([('reset_password_token', ASCENDING)]),
+    ]
     
     # Role enum
     ROLE_STUDENT = 'student'
@@ -107,12 +114,11 @@ class User:
         return cls(**kwargs)
     
     @classmethod
-    def find_by_id(cls, user_id):
-        """Find user by ID"""
+    def find_by_id(cls, user_id, fields=None):
+        """Find user by ID (fields limits the loaded fields)"""
         collection = cls.get_collection()
-        if isinstance(user_id, str):
-            user_id = ObjectId(user_id)
-        user_data = collection.find_one({'_id': user_id})
+        projection = {field: 1 for field in fields} if fields else None
+        user_data = collection.find_one({'_id': to_object_id(user_id)}, projection)
         return cls(**user_data) if user_data else None
     
     @classmethod
@@ -156,11 +162,14 @@ class User:
         # Update current instance
         for key, value in kwargs.items():
             setattr(self, key, value)
+        
+        invalidate_auth_user(self.id)
     
     def delete(self):
         """Delete user"""
         collection = self.get_collection()
         collection.delete_one({'_id': self.id})
+        invalidate_auth_user(self.id)
     
     def to_dict(self, include_password=False):
         """Convert user to dictionary"""
@@ -0,0 +1,40 @@
+"""
+Role-based DRF permission classes
+Roles come from the signed 'role' claim issued with the JWT (see users.views),
+falling back to the authenticated user's stored role for tokens issued without it.
+"""
+from rest_framework.permissions import BasePermission
+
+
+def get_request_role(request):
+    """Get the caller's role from the token claim or the authenticated user"""
+    token = getattr(request, 'auth', None)
+    role = token.get('role') if token is not None and hasattr(token, 'get') else None
+    return role or getattr(request.user, 'role', None)
+
+
+def is_admin(request):
+    return get_request_role(request) == 'admin'
+
+
+class IsInstructor(BasePermission):
+    """Allow instructors only"""
+    message = 'Access denied. Instructor privileges required.'
+    roles = ('instructor',)
+
+    def has_permission(self, request, view):
+        return bool(
+            request.user and request.user.is_authenticated
+            and get_request_role(request) in self.roles
+        )
+
+
+class IsInstructorOrAdmin(IsInstructor):
+    """Allow instructors and admins"""
+    roles = ('instructor', 'admin')
+
+
+class IsAdmin(IsInstructor):
+    """Allow admins only"""
+    message = 'Access denied. Admin privileges required.'
+    roles = ('admin',)
@@ -54,6 +54,7 @@ class RegisterView(APIView):
                 refresh = RefreshToken()
                 refresh['user_id'] = str(user.id)
                 refresh['email'] = user.email
+                refresh['role'] = user.role
                 
                 print(f"🔑 JWT tokens generated")
                 print("="*80 + "\n")
@@ -147,6 +148,7 @@ class LoginView(APIView):
             refresh = RefreshToken()
             refresh['user_id'] = str(user.id)
             refresh['email'] = user.email
+            refresh['role'] = user.role
             
             print(f"✅ SUCCESS: Login completed!")
             print(f"🔑 Access Token: {str(refresh.access_token)[:50]}...")
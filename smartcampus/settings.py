@@ -171,3 +171,9 @@ DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'SmartCampus <noreply@
 # Backend API URL for authentication
 BACKEND_API_URL = os.environ.get('BACKEND_API_URL', 'http://localhost:8001/api')
 
+
+# Access tokens are refreshed only when they expire within this many seconds
+TOKEN_REFRESH_LEEWAY_SECONDS = int(os.environ.get('TOKEN_REFRESH_LEEWAY_SECONDS', 60))
+
+# GET responses kept per worker for ETag/Last-Modified revalidation (0 disables)
+BACKEND_API_CONDITIONAL_CACHE_SIZE = int(os.environ.get('BACKEND_API_CONDITIONAL_CACHE_SIZE', 256))